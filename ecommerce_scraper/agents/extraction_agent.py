@@ -7,29 +7,20 @@ from ..config.settings import settings
 from ..config.sites import get_site_config_by_vendor, SiteConfig
 from ..schemas.agent_outputs import ExtractionResult
 from ..ai_logging.error_logger import get_error_logger
-
-# Optional Selenium fallback from crewai-tools
-try:
-    from crewai_tools import SeleniumScrapingTool  # type: ignore
-    _SELENIUM_AVAILABLE = True
-except Exception:
-    SeleniumScrapingTool = None  # type: ignore
-    _SELENIUM_AVAILABLE = False
+# Optional Selenium fallback (pooled drivers, started on first use)
+from ..tools.selenium_fallback_tool import SeleniumFallbackTool
+from ..utils.webdriver_pool import selenium_available
 
 
 class ExtractionAgent:
     """Specialized agent for StandardizedProduct data extraction with feedback loop support."""
 
     def __init__(self, stagehand_tool=None, verbose: bool = True, tools: List = None, llm: Optional[LLM] = None):
-        """Initialize the extraction agent with StagehandTool + SeleniumScrapingTool."""
+        """Initialize the extraction agent with StagehandTool + SeleniumFallbackTool."""
         # Handle both old (tools, llm) and new (stagehand_tool, verbose) calling patterns
         supplemental_tools: List[Any] = []
-        if _SELENIUM_AVAILABLE:
-            try:
-                if SeleniumScrapingTool is not None:
-                    supplemental_tools.append(SeleniumScrapingTool())
-            except Exception:
-                pass
+        if settings.enable_selenium_fallback and selenium_available():
+            supplemental_tools.append(SeleniumFallbackTool())
 
         # Build final tool list to ensure Crew surfaces all supplemental tools
         final_tools: List[Any] = []
@@ -83,9 +74,9 @@ class ExtractionAgent:
         # If no LLM provided, respect configured model for consistency
         if llm is None and settings.openai_api_key:
             try:
-                from crewai import LLM as CrewLLM
+                from ..utils.agent_llm import build_agent_llm
                 model_name = settings.agent_model_name
-                agent_config["llm"] = CrewLLM(model=model_name)
+                agent_config["llm"] = build_agent_llm(model_name)
             except Exception:
                 pass
 
@@ -116,6 +107,12 @@ class ExtractionAgent:
         others = ", ".join([n for n in names if n != stagehand])
         return {"stagehand": stagehand, "others": others, "selenium": selenium}
 
+    def _search_step(self, product_query: str, search_url: Optional[str]) -> str:
+        """On-site search instruction: one goto to the known search URL, else the search box."""
+        if search_url:
+            return f'navigate directly to the search results at {search_url} instead of typing into the search box'
+        return f'perform one on-site search for "{product_query}"'
+
     def get_agent(self) -> Agent:
         """Get the CrewAI agent instance."""
         return self.agent
@@ -127,7 +124,8 @@ class ExtractionAgent:
                                             product_query: str,
                                             retailer: str,
                                             retailer_url: str,
-                                            session_id: str = None):
+                                            session_id: str = None,
+                                            search_url: Optional[str] = None):
         """
         Create a task for targeted product search extraction focusing on core fields.
 
@@ -146,6 +144,7 @@ class ExtractionAgent:
             retailer: Name of the retailer website
             retailer_url: URL to navigate to for extraction
             session_id: Optional session identifier for tracking
+            search_url: The retailer's search results URL for the query (known retailers only)
 
         Returns:
             CrewAI Task configured for product extraction with schema validation
@@ -153,6 +152,7 @@ class ExtractionAgent:
         from crewai import Task
 
         names = self._tools_summary()
+        search_step = self._search_step(product_query, search_url)
         task_description = f"""
         Goal: Extract name, website, url, price for "{product_query}" from {retailer} at {retailer_url}.
 
@@ -164,8 +164,8 @@ class ExtractionAgent:
 
         Procedure:
         1) Navigate to {retailer_url}. If the page is an error/soft-404/404/5xx (e.g., "Looking for something?", "Page not found", "not a functioning page"), immediately return products=[] and extraction_successful=false.
-        2) Observe to classify page. If not a product page, perform one on-site search for "{product_query}" and open the best match; if none found, return empty products.
-        3) On a product page, extract fields. Prefer {names["stagehand"]} extract then use the product page url for the url field; if observe/act cannot locate elements or the page is highly dynamic, use Selenium fallback to perform the interaction and complete extraction.
+        2) Observe to classify page. If not a product page, {search_step} and open the best match; if none found, return empty products. When several candidate product links look plausible, check them in one call with operation="extract_many" (urls=[...], instruction, schema) instead of opening each.
+        3) On a product page, extract fields. Prefer {names["stagehand"]} extract then use the product page url for the url field; if observe/act cannot locate elements or the page is highly dynamic, use the Selenium fallback to read the page content (optionally a css_element) and complete extraction.
 
         Constraints:
         - One on-site search attempt; no crawling multiple pages
@@ -218,7 +218,8 @@ class ExtractionAgent:
                                                retailer_url: str,
                                                validation_feedback: Dict[str, Any],
                                                attempt_number: int = 1,
-                                               session_id: str = None):
+                                               session_id: str = None,
+                                               search_url: Optional[str] = None):
         """
         Create a task for feedback-enhanced product extraction that uses validation feedback to improve results.
 
@@ -246,6 +247,7 @@ class ExtractionAgent:
             validation_feedback: Feedback from previous validation attempt
             attempt_number: Current retry attempt number
             session_id: Optional session identifier for tracking
+            search_url: The retailer's search results URL for the query (known retailers only)
 
         Returns:
             CrewAI Task configured for feedback-enhanced extraction
@@ -264,6 +266,7 @@ class ExtractionAgent:
         improvements_text = "\n".join(f"- {imp}" for imp in extraction_improvements) if extraction_improvements else "- Focus on core product fields"
         refinements_text = "\n".join(f"- {ref}" for ref in search_refinements) if search_refinements else "- Use original search query"
 
+        search_step = self._search_step(product_query, search_url)
         task_description = f"""
         Goal (retry #{attempt_number}): Extract product fields for "{product_query}" from {retailer} at {retailer_url}, applying prior feedback.
 
@@ -273,12 +276,12 @@ class ExtractionAgent:
         - Improvements: {improvements_text}
         - Search refinements: {refinements_text}
 
-        Tools (order): Stagehand → SeleniumScrapingTool (fallback only if needed).
+        Tools (order): Stagehand → selenium_scraping_tool (fallback only if needed).
 
         Procedure:
         1) Navigate to {retailer_url}. If error/soft-404/404/5xx (“Looking for something?”, “Page not found”, “not a functioning page”), return products=[] and extraction_successful=false.
         2) Apply the feedback above while classifying/searching:
-           - If not a product page, perform one on-site search for "{product_query}" (using refined terms if given).
+           - If not a product page, {search_step} (using refined terms if given).
            - Open the best match; if none, return empty products.
         3) Extract fields on product page and use the product page url for the url field. Prefer Stagehand extract; use Selenium only if observe/act is unreliable or the page is highly dynamic.
 
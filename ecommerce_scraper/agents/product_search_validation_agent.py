@@ -14,13 +14,9 @@ from ..ai_logging.error_logger import get_error_logger
 
 logger = logging.getLogger(__name__)
 
-# Optional Selenium fallback from crewai-tools for verification tasks
-try:
-    from crewai_tools import SeleniumScrapingTool  # type: ignore
-    _SELENIUM_AVAILABLE = True
-except Exception:
-    SeleniumScrapingTool = None  # type: ignore
-    _SELENIUM_AVAILABLE = False
+# Optional Selenium fallback for verification tasks (pooled drivers, started on first use)
+from ..tools.selenium_fallback_tool import SeleniumFallbackTool
+from ..utils.webdriver_pool import selenium_available
 
 
 class ProductSearchValidationResult(BaseModel):
@@ -45,11 +41,8 @@ class ProductSearchValidationAgent:
         
         # Selenium fallback to help validate product pages when Stagehand struggles
         supplemental_tools: List[Any] = []
-        if _SELENIUM_AVAILABLE and SeleniumScrapingTool is not None:
-            try:
-                supplemental_tools.append(SeleniumScrapingTool())
-            except Exception:
-                pass
+        if settings.enable_selenium_fallback and selenium_available():
+            supplemental_tools.append(SeleniumFallbackTool())
 
         # Handle both old (tools, llm) and new (stagehand_tool, verbose) calling patterns
         # Build final tool list ensuring consistent naming so Crew shows them to the agent
@@ -109,7 +102,7 @@ class ProductSearchValidationAgent:
 
             TOOLS AVAILABLE:
             - simplified_stagehand_tool: Navigate/observe/act/extract to open pages and verify product-page indicators
-            - SeleniumScrapingTool: Fallback browser automation to load pages and interact when Stagehand observation/act is unreliable
+            - selenium_scraping_tool: Fallback headless Chrome to load and read pages when Stagehand cannot
             - agent_capabilities_reference_tool: Get detailed information about ResearchAgent and ExtractionAgent capabilities for targeted feedback generation
             """,
             "verbose": verbose,
@@ -125,9 +118,9 @@ class ProductSearchValidationAgent:
         # If no LLM provided, align with configured model
         if llm is None and settings.openai_api_key:
             try:
-                from crewai import LLM as CrewLLM
+                from ..utils.agent_llm import build_agent_llm
                 model_name = settings.agent_model_name
-                agent_config["llm"] = CrewLLM(model=model_name)
+                agent_config["llm"] = build_agent_llm(model_name)
             except Exception:
                 pass
 
@@ -178,14 +171,14 @@ class ProductSearchValidationAgent:
 
         TOOLS:
         - Primary: {names["stagehand"]} (navigate → observe → act → extract)
-        - Fallback (only if present): {names["selenium"]} for loading and interactions when observe/act is unreliable
+        - Fallback (only if present): {names["selenium"]} for loading and reading the page when observe/act is unreliable
        
         VALIDATION WORKFLOW:
         **MANDATORY TOOL USAGE**: You MUST attempt to load and inspect the page using tools. Do NOT claim a URL is inaccessible or invalid without attempting the following with {names["stagehand"]}; if two attempts fail, use {names["selenium"]} when available.
       
         PROCEDURE:
         1. **Navigate**: Use {names["stagehand"]} with operation="navigate" to open {retailer_url} if not already at the target URL.
-        2. **Handle popups (allowed actions only)**: If cookie/consent/geo banners block the page (common on Amazon UK), use operation="act" to accept/close, then continue. You may also scroll or expand collapsed sections. 
+        2. **Handle popups (allowed actions only)**: Known cookie banners are dismissed automatically on navigate. If cookie/consent/geo banners still block the page (common on Amazon UK), use operation="dismiss_popups" first and operation="act" to accept/close only if that fails, then continue. You may also scroll or expand collapsed sections. 
         3. **Observe**: Use operation="observe" to confirm product-page indicators: distinct title, GBP price (with £), and a primary CTA (e.g., Add to Basket).
         4. **Optional extract**: If needed, use operation="extract" with a simple schema to read name and price.
         5. **Validate** each product against the search query.
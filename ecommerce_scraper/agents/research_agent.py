@@ -61,9 +61,9 @@ class ResearchAgent:
         # If no LLM provided, align with configured model for consistency
         if llm is None and settings.openai_api_key:
             try:
-                from crewai import LLM as CrewLLM
+                from ..utils.agent_llm import build_agent_llm
                 model_name = settings.agent_model_name
-                agent_config["llm"] = CrewLLM(model=model_name)
+                agent_config["llm"] = build_agent_llm(model_name)
             except Exception as e:
                 # Log but continue with default agent (tools-only)
                 self.error_logger.error(f"Failed to configure LLM for ResearchAgent: {e}", exc_info=True)
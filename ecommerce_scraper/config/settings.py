@@ -5,15 +5,20 @@ import logging
 from pathlib import Path
 from typing import Optional, Dict, Any
 from pydantic_settings import BaseSettings
-from pydantic import Field, field_validator
+from pydantic import Field, field_validator, model_validator
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
     
-    # Browserbase Configuration
-    browserbase_api_key: str = Field(..., env="BROWSERBASE_API_KEY")
-    browserbase_project_id: str = Field(..., env="BROWSERBASE_PROJECT_ID")
+    # Browser Backend Configuration
+    browser_backend: str = Field("BROWSERBASE", env="BROWSER_BACKEND")  # BROWSERBASE or LOCAL (headless Chromium)
+    local_browser_pool_size: int = Field(2, env="LOCAL_BROWSER_POOL_SIZE")  # concurrent local Chromium instances
+    local_browser_cdp_url: Optional[str] = Field(None, env="LOCAL_BROWSER_CDP_URL")  # attach instead of launching
+
+    # Browserbase Configuration (required unless BROWSER_BACKEND=LOCAL)
+    browserbase_api_key: Optional[str] = Field(None, env="BROWSERBASE_API_KEY")
+    browserbase_project_id: Optional[str] = Field(None, env="BROWSERBASE_PROJECT_ID")
     
     # LLM Configuration
     openai_api_key: Optional[str] = Field(None, env="OPENAI_API_KEY")
@@ -27,6 +32,58 @@ class Settings(BaseSettings):
     stagehand_headless: bool = Field(True, env="STAGEHAND_HEADLESS")
     stagehand_verbose: int = Field(1, env="STAGEHAND_VERBOSE")
     stagehand_dom_settle_timeout_ms: int = Field(5000, env="STAGEHAND_DOM_SETTLE_TIMEOUT_MS")
+    enable_action_cache: bool = Field(True, env="ENABLE_ACTION_CACHE")  # replay resolved act/observe selectors
+    enable_selector_recipes: bool = Field(True, env="ENABLE_SELECTOR_RECIPES")  # learned name/price selectors
+    extract_many_concurrency: int = Field(4, env="EXTRACT_MANY_CONCURRENCY")  # parallel tabs per extract_many call (local browser; Browserbase runs them in turn)
+    extract_many_max_urls: int = Field(10, env="EXTRACT_MANY_MAX_URLS")
+    enable_dom_pruning: bool = Field(True, env="ENABLE_DOM_PRUNING")  # scope extract to the product region
+    dom_pruning_min_tokens: int = Field(1500, env="DOM_PRUNING_MIN_TOKENS")  # smaller pages are sent whole
+    tool_output_max_tokens: int = Field(2000, env="TOOL_OUTPUT_MAX_TOKENS")  # cap on tool results fed back to agents
+    enable_session_memo: bool = Field(True, env="ENABLE_SESSION_MEMO")  # reuse observe/extract on an unchanged DOM
+    enable_consent_dismissal: bool = Field(True, env="ENABLE_CONSENT_DISMISSAL")  # rule-based cookie banner dismissal
+    enable_storage_vault: bool = Field(True, env="ENABLE_STORAGE_VAULT")  # reuse cookies/localStorage per retailer
+    storage_vault_ttl_hours: float = Field(168.0, env="STORAGE_VAULT_TTL_HOURS")
+    enable_retailer_macros: bool = Field(True, env="ENABLE_RETAILER_MACROS")  # replay recorded agent trajectories
+    enable_adaptive_readiness: bool = Field(True, env="ENABLE_ADAPTIVE_READINESS")  # wait for content, not fixed times
+    readiness_min_wait_seconds: float = Field(1.0, env="READINESS_MIN_WAIT_SECONDS")
+    readiness_max_wait_seconds: float = Field(10.0, env="READINESS_MAX_WAIT_SECONDS")  # cap until a domain has samples
+
+    # Request Blocking (Stagehand navigation)
+    enable_request_blocking: bool = Field(True, env="ENABLE_REQUEST_BLOCKING")
+    blocked_resource_types: str = Field("image,media,font", env="BLOCKED_RESOURCE_TYPES")  # comma-separated
+    block_tracker_domains: bool = Field(True, env="BLOCK_TRACKER_DOMAINS")  # analytics/ad domains
+
+    # Fetch Ladder (plain HTTP -> Scrappey -> Stagehand agent, learned per domain)
+    enable_fetch_ladder: bool = Field(True, env="ENABLE_FETCH_LADDER")
+    fetch_http_timeout_seconds: float = Field(10.0, env="FETCH_HTTP_TIMEOUT_SECONDS")
+    fetch_tier_reprobe_hours: float = Field(72.0, env="FETCH_TIER_REPROBE_HOURS")  # retry cheaper tiers after this
+    enable_product_api_discovery: bool = Field(True, env="ENABLE_PRODUCT_API_DISCOVERY")  # learn internal JSON endpoints
+    product_api_max_responses: int = Field(40, env="PRODUCT_API_MAX_RESPONSES")  # JSON responses kept per page
+    enable_snapshot_archive: bool = Field(True, env="ENABLE_SNAPSHOT_ARCHIVE")  # keep fetched HTML for re-extraction
+    snapshot_retention_days: int = Field(30, env="SNAPSHOT_RETENTION_DAYS")  # older snapshots are compacted away; 0 keeps all
+
+    # Direct Site Search (SiteConfig.search_url_pattern instead of agent-driven search)
+    enable_direct_site_search: bool = Field(True, env="ENABLE_DIRECT_SITE_SEARCH")
+    site_search_min_score: float = Field(0.6, env="SITE_SEARCH_MIN_SCORE")  # 0..1 query/name token match
+    site_search_scrappey_fallback: bool = Field(False, env="SITE_SEARCH_SCRAPPEY_FALLBACK")  # Scrappey after any HTTP miss, not only known-blocked search pages
+
+    # Research Sources (Perplexity and/or parallel site search on known retailers)
+    research_sources: str = Field("perplexity,site_search,sitemap", env="RESEARCH_SOURCES")  # comma-separated
+    fanout_retailers: str = Field("", env="FANOUT_RETAILERS")  # SITE_CONFIGS keys; empty = every retailer with a search URL
+    fanout_max_workers: int = Field(8, env="FANOUT_MAX_WORKERS")
+    fanout_first_k: int = Field(3, env="FANOUT_FIRST_K")  # start extraction once this many confident candidates arrive
+    fanout_min_score: float = Field(0.8, env="FANOUT_MIN_SCORE")  # site search score counted as confident
+
+    # Sitemap Index (product URLs from retailers' sitemaps; python -m ecommerce_scraper.utils.sitemap_index refresh)
+    sitemap_timeout_seconds: float = Field(60.0, env="SITEMAP_TIMEOUT_SECONDS")  # per sitemap file
+    sitemap_max_urls_per_retailer: int = Field(2_000_000, env="SITEMAP_MAX_URLS_PER_RETAILER")
+
+    # Selenium Fallback (pooled headless Chrome; needs the selenium package)
+    enable_selenium_fallback: bool = Field(True, env="ENABLE_SELENIUM_FALLBACK")
+    selenium_pool_size: int = Field(2, env="SELENIUM_POOL_SIZE")  # concurrent drivers
+    selenium_driver_max_uses: int = Field(25, env="SELENIUM_DRIVER_MAX_USES")  # retire a driver after this many calls
+    selenium_acquire_timeout_seconds: float = Field(30.0, env="SELENIUM_ACQUIRE_TIMEOUT_SECONDS")
+    selenium_page_load_timeout_seconds: float = Field(30.0, env="SELENIUM_PAGE_LOAD_TIMEOUT_SECONDS")
     
     # Scraping Configuration
     default_delay_between_requests: int = Field(2, env="DEFAULT_DELAY_BETWEEN_REQUESTS")
@@ -40,6 +97,36 @@ class Settings(BaseSettings):
     # Performance Configuration
     enable_caching: bool = Field(True, env="ENABLE_CACHING")
     cache_ttl_seconds: int = Field(3600, env="CACHE_TTL_SECONDS")  # 1 hour default
+    cache_dir: str = Field("cache", env="CACHE_DIR")  # persistent cross-run stores
+
+    # Latency Budget Configuration
+    search_deadline_seconds: float = Field(600.0, env="SEARCH_DEADLINE_SECONDS")  # 0 disables the deadline
+    min_step_seconds: float = Field(20.0, env="MIN_STEP_SECONDS")
+    llm_timeout_seconds: float = Field(120.0, env="LLM_TIMEOUT_SECONDS")
+
+    # Request Hedging (Perplexity and agent LLM calls; opt-in)
+    enable_request_hedging: bool = Field(False, env="ENABLE_REQUEST_HEDGING")
+    hedge_quantile: float = Field(0.95, env="HEDGE_QUANTILE")
+    hedge_max_rate: float = Field(0.1, env="HEDGE_MAX_RATE")  # max hedges per call
+    hedge_min_samples: int = Field(10, env="HEDGE_MIN_SAMPLES")
+
+    # Circuit Breakers and Retry Budgets (per dependency)
+    circuit_failure_threshold: int = Field(5, env="CIRCUIT_FAILURE_THRESHOLD")
+    circuit_reset_timeout_seconds: float = Field(30.0, env="CIRCUIT_RESET_TIMEOUT_SECONDS")
+    circuit_half_open_max_calls: int = Field(1, env="CIRCUIT_HALF_OPEN_MAX_CALLS")
+    retry_budget_ratio: float = Field(0.2, env="RETRY_BUDGET_RATIO")  # retries earned per first attempt (also caps flow max_retries)
+    retry_budget_min_tokens: float = Field(3.0, env="RETRY_BUDGET_MIN_TOKENS")
+
+    # Retailer Health Scoring (persistent, per domain)
+    enable_retailer_health: bool = Field(True, env="ENABLE_RETAILER_HEALTH")
+    retailer_skip_threshold: float = Field(0.15, env="RETAILER_SKIP_THRESHOLD")  # smoothed pass rate
+    retailer_health_min_attempts: int = Field(4, env="RETAILER_HEALTH_MIN_ATTEMPTS")
+    retailer_skip_hours: float = Field(24.0, env="RETAILER_SKIP_HOURS")  # re-probe skipped domains after this
+
+    # Negative Cache (dead URLs, blocked and comparison domains; cross-run)
+    enable_negative_cache: bool = Field(True, env="ENABLE_NEGATIVE_CACHE")
+    negative_cache_ttl_hours: float = Field(72.0, env="NEGATIVE_CACHE_TTL_HOURS")
+    negative_cache_blocked_ttl_hours: float = Field(12.0, env="NEGATIVE_CACHE_BLOCKED_TTL_HOURS")
 
     # Logging Configuration
     log_level: str = Field("INFO", env="LOG_LEVEL")
@@ -54,12 +141,30 @@ class Settings(BaseSettings):
     # Perplexity Configuration
     perplexity_api_key: str = Field("", env="PERPLEXITY_API_KEY")
     
-    @field_validator('browserbase_api_key', 'browserbase_project_id')
+    @field_validator('browser_backend')
     @classmethod
-    def validate_required_fields(cls, v, info):
-        if not v:
-            raise ValueError(f"{info.field_name} is required")
-        return v
+    def validate_browser_backend(cls, v):
+        valid_backends = ['BROWSERBASE', 'LOCAL']
+        if v.upper() not in valid_backends:
+            raise ValueError(f"browser_backend must be one of {valid_backends}")
+        return v.upper()
+
+    @field_validator('research_sources')
+    @classmethod
+    def validate_research_sources(cls, v):
+        valid_sources = ['perplexity', 'site_search', 'sitemap']
+        sources = [s.strip().lower() for s in v.split(',') if s.strip()]
+        if not sources or any(s not in valid_sources for s in sources):
+            raise ValueError(f"research_sources must be a comma-separated subset of {valid_sources}")
+        return ','.join(sources)
+
+    @model_validator(mode='after')
+    def validate_required_fields(self):
+        if self.browser_backend == 'BROWSERBASE':
+            for field_name in ('browserbase_api_key', 'browserbase_project_id'):
+                if not getattr(self, field_name):
+                    raise ValueError(f"{field_name} is required when browser_backend is BROWSERBASE")
+        return self
 
     @field_validator('log_level')
     @classmethod
@@ -33,6 +33,10 @@ class SiteConfig:
     delay_between_requests: int = 2
     max_retries: int = 3
     respect_robots_txt: bool = True
+
+    # Request blocking overrides (see utils.request_blocking)
+    allow_resource_types: List[str] = None  # e.g. ["image"] when prices render as images
+    allow_request_domains: List[str] = None  # tracker/tag domains the page needs to render
     
     # Site-specific selectors (optional hints)
     selectors: Dict[str, str] = None
@@ -48,6 +52,10 @@ class SiteConfig:
             self.navigation_instructions = {}
         if self.extraction_instructions is None:
             self.extraction_instructions = {}
+        if self.allow_resource_types is None:
+            self.allow_resource_types = []
+        if self.allow_request_domains is None:
+            self.allow_request_domains = []
 
 
 # Site configurations
@@ -135,6 +143,7 @@ SITE_CONFIGS = {
         selectors={
             "search_box": "#twotabsearchtextbox",
             "search_button": "#nav-search-submit-button",
+            "cookie_accept": "#sp-cc-accept",
             "product_title": "#productTitle",
             "price_current": ".a-price-whole",
             "price_original": ".a-price.a-text-price .a-offscreen",
@@ -275,6 +284,7 @@ SITE_CONFIGS = {
         selectors={
             "search_box": "#gh-ac",
             "search_button": "#gh-btn",
+            "cookie_accept": "#gdpr-banner-accept",
             "product_title": "#x-title-label-lbl",
             "price_current": ".notranslate",
             "condition": "#u_kp_1 .u-flL",
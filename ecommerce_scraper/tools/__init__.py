@@ -3,5 +3,6 @@
 from .simplified_stagehand_tool import SimplifiedStagehandTool
 from .perplexity_retailer_research_tool import PerplexityRetailerResearchTool
 from .scrappey_tool import ScrappeyTool
+from .selenium_fallback_tool import SeleniumFallbackTool
 
-__all__ = ["SimplifiedStagehandTool", "PerplexityRetailerResearchTool", "ScrappeyTool"]
+__all__ = ["SimplifiedStagehandTool", "PerplexityRetailerResearchTool", "ScrappeyTool", "SeleniumFallbackTool"]
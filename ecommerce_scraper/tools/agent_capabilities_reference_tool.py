@@ -9,6 +9,8 @@ from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool
 
+from ..utils.tool_output import compact_json
+
 
 class AgentCapabilitiesInput(BaseModel):
     """Input schema for agent capabilities reference."""
@@ -69,8 +71,7 @@ class AgentCapabilitiesReferenceTool(BaseTool):
             if capability_type and capability_type.lower() != "all":
                 capabilities_data = self._filter_by_capability_type(capabilities_data, capability_type)
             
-            import json
-            return json.dumps(capabilities_data, indent=2)
+            return compact_json(capabilities_data)
             
         except Exception as e:
             return f"Error getting agent capabilities: {str(e)}"
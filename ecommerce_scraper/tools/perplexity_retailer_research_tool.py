@@ -27,9 +27,23 @@ import time
 import random
 
 from ..ai_logging.error_logger import get_error_logger
+from ..config.settings import settings
+from ..utils.deadline import DeadlineExceeded, cap_timeout, current_deadline
+from ..utils.hedging import get_hedger
+from ..utils.negative_cache import get_negative_cache
+from ..utils.tool_output import compact_json
+from ..utils.resilience import PERPLEXITY, get_circuit_breaker, get_retry_budget
 
 logger = logging.getLogger(__name__)
 
+# Rate limits and server errors are retried with backoff
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _answered(resp: requests.Response) -> bool:
+    """Whether Perplexity actually answered (a latency sample / hedge winner), not 429/5xx."""
+    return resp.status_code not in RETRY_STATUS_CODES
+
 
 class RetailerResearchInput(BaseModel):
     """Input schema for retailer research."""
@@ -74,6 +88,8 @@ class PerplexityRetailerResearchTool(BaseTool):
         self._model = os.getenv("PERPLEXITY_MODEL") or "llama-3.1-sonar-large-128k-online"
         # store last response metadata (usage/citations/search_results)
         self._last_response_meta: Dict[str, Any] = {}
+        # Opt-in hedging of slow requests (no-op unless ENABLE_REQUEST_HEDGING)
+        self._hedger = get_hedger("perplexity")
 
     def _run(
         self,
@@ -118,8 +134,10 @@ class PerplexityRetailerResearchTool(BaseTool):
                 max_retailers
             )
 
-    # Info logging removed
-            return json.dumps(structured_result, indent=2)
+            if structured_result.get("retailers"):
+                # The parsed list carries the same data; keep the raw text only when parsing failed
+                structured_result.pop("ai_search_response", None)
+            return compact_json(structured_result)
 
         except Exception as e:
             self._logger.error(f"[PERPLEXITY] Retailer research failed: {e}")
@@ -186,6 +204,12 @@ If you encounter any issues or limitations during your search, such as the produ
 
 Remember, your final output should only include the retailer information in the specified format, along with any necessary explanations about your findings. Do not include any of your search process or internal thoughts in the final response."""
 
+        # Known dead links and unusable domains from previous runs
+        if settings.enable_negative_cache:
+            exclusions = get_negative_cache().exclusion_prompt()
+            if exclusions:
+                prompt = f"{prompt}\n\n{exclusions}"
+
         return prompt
 
     def _call_perplexity_api(
@@ -306,26 +330,56 @@ Provide accurate, up-to-date information and ensure all URLs lead directly to pr
             raise
 
     def _post_with_retries(self, url: str, *, headers: Dict[str, str], json: Dict[str, Any], timeout: int, max_retries: int = 3) -> Dict[str, Any]:
-        """POST helper with exponential backoff for 429/5xx per best practices."""
+        """POST helper with exponential backoff for 429/5xx per best practices.
+
+        Attempts go through the Perplexity circuit breaker (an open circuit fails
+        fast with ``CircuitOpenError``) and retries draw from the shared Perplexity
+        retry budget, so the response_format/model fallbacks in
+        ``_call_perplexity_api`` cannot multiply into a retry storm.
+        """
+        breaker = get_circuit_breaker(PERPLEXITY)
+        budget = get_retry_budget(PERPLEXITY)
+        budget.record_request()
         attempt = 0
         last_exc: Optional[Exception] = None
         while attempt <= max_retries:
+            breaker.before_call()
             try:
-                resp = requests.post(url, headers=headers, json=json, timeout=timeout)
+                # Never let a single request outlive the active query deadline
+                request_timeout = cap_timeout(timeout, "perplexity request")
+                resp = self._hedger.call(
+                    requests.post, url, headers=headers, json=json, timeout=request_timeout, accept=_answered
+                )
                 # Retry on 429/5xx
-                if resp.status_code in {429, 500, 502, 503, 504}:
-                    raise requests.HTTPError(f"HTTP {resp.status_code}: {resp.text}")
+                if resp.status_code in RETRY_STATUS_CODES:
+                    raise requests.HTTPError(f"HTTP {resp.status_code}: {resp.text}", response=resp)
                 resp.raise_for_status()
+                breaker.record_success()
                 return resp.json()
+            except DeadlineExceeded:
+                raise
+            except requests.HTTPError as exc:
+                status_code = getattr(exc.response, "status_code", None)
+                if status_code is not None and status_code < 500 and status_code != 429:
+                    # Client errors mean the service is up; let the caller adjust the payload
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                last_exc = exc
             except Exception as exc:  # noqa: BLE001
+                breaker.record_failure()
                 last_exc = exc
-                if attempt == max_retries:
-                    break
-                # Exponential backoff with jitter
-                sleep_s = (2 ** attempt) + random.uniform(0, 0.25)
-                # Warning removed per logging policy
-                time.sleep(sleep_s)
-                attempt += 1
+            if attempt == max_retries or not budget.try_acquire():
+                break
+            # Exponential backoff with jitter
+            sleep_s = (2 ** attempt) + random.uniform(0, 0.25)
+            deadline = current_deadline()
+            if deadline is not None and deadline.remaining() <= sleep_s:
+                # No budget left for another attempt; surface the last failure
+                break
+            # Warning removed per logging policy
+            time.sleep(sleep_s)
+            attempt += 1
         # Exhausted retries
         if last_exc:
             raise last_exc
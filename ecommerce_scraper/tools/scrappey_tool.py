@@ -1,6 +1,5 @@
 """Scrappey-based extraction tool for reliable ecommerce product data extraction."""
 
-import json
 import logging
 import requests
 from typing import Any, Dict, List, Optional, Union
@@ -9,6 +8,19 @@ from pydantic import BaseModel, Field
 
 from ..config.settings import settings
 from ..schemas.product_search_extraction import ProductSearchExtraction
+from ..utils.deadline import cap_timeout
+from ..utils.readiness import get_ready_times
+from ..utils.url_utils import extract_domain
+from ..utils.tool_output import compact_json
+from ..utils.resilience import SCRAPPEY, CircuitOpenError, get_circuit_breaker
+
+
+def _provider_failure(exc: requests.exceptions.RequestException) -> bool:
+    """Whether a request error is Scrappey's (connection, timeout, 429/5xx) rather than ours."""
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    status_code = getattr(exc.response, "status_code", None)
+    return status_code is not None and (status_code == 429 or status_code >= 500)
 
 
 class ScrappeyInput(BaseModel):
@@ -85,19 +97,7 @@ class ScrappeyTool(BaseTool):
                 wait_time=wait_time
             )
 
-            # Set up headers for Scrappey API
-            headers = {
-                'Content-Type': 'application/json'
-            }
-
-            # Build URL with API key parameter
-            url_with_key = f"{self.base_url}?key={self.api_key}"
-
-            # Execute Scrappey request
-            response = requests.post(url_with_key, json=payload, headers=headers, timeout=60)
-            response.raise_for_status()
-
-            result = response.json()
+            result = self._post(payload)
             
             # Process and format the result
             formatted_result = self._process_result(result, extraction_type, vendor, category)
@@ -105,6 +105,8 @@ class ScrappeyTool(BaseTool):
         # Info logging removed
             return formatted_result
 
+        except CircuitOpenError as e:
+            return f"Scrappey unavailable: {str(e)}"
         except requests.exceptions.RequestException as e:
             error_msg = f"Scrappey API request failed: {str(e)}"
             self._logger.error(error_msg)
@@ -114,6 +116,43 @@ class ScrappeyTool(BaseTool):
             self._logger.error(error_msg)
             return error_msg
 
+    def fetch_html(self, url: str, wait_time: Optional[int] = None) -> str:
+        """Rendered HTML of any page through Scrappey ('' when the response has none).
+
+        Raises CircuitOpenError / RequestException like ``_run``'s request.
+        """
+        payload = self._build_payload(url, "", "", "products", True, wait_time)
+        # The wait selectors match listing pages; the readiness wait bounds any page
+        payload.pop('waitForSelector', None)
+        result = self._post(payload)
+        html_content = (result.get('solution') or {}).get('response') or result.get('data')
+        return html_content if isinstance(html_content, str) else ""
+
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a request to Scrappey (fails fast while the Scrappey circuit is open)."""
+        # Set up headers for Scrappey API
+        headers = {
+            'Content-Type': 'application/json'
+        }
+
+        # Build URL with API key parameter
+        url_with_key = f"{self.base_url}?key={self.api_key}"
+
+        breaker = get_circuit_breaker(SCRAPPEY)
+        breaker.before_call()
+        try:
+            response = requests.post(url_with_key, json=payload, headers=headers, timeout=cap_timeout(60, "scrappey request"))
+            response.raise_for_status()
+        except requests.exceptions.RequestException as exc:
+            if _provider_failure(exc):
+                breaker.record_failure()
+            else:
+                # Client errors (a bad payload for one URL) mean Scrappey itself is up
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        return response.json()
+
     def _build_payload(self, url: str,  vendor: str, category: str,
                       extraction_type: str, use_browser: bool, wait_time: Optional[int]) -> Dict[str, Any]:
         """Build Scrappey API request payload based on extraction type."""
@@ -123,7 +162,7 @@ class ScrappeyTool(BaseTool):
             'cmd': 'request.get',
             'url': url,
             'renderType': 'html',  # Render full HTML with JavaScript
-            'wait': (wait_time or 10) * 1000,  # Wait time in milliseconds (default 10 seconds)
+            'wait': self._wait_ms(url, wait_time),  # Wait time in milliseconds
             'waitForSelector': self._get_wait_selector(vendor),  # Wait for specific elements
             'blockResources': ['image', 'media', 'font'],  # Block unnecessary resources for faster loading
             'userAgent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
@@ -131,6 +170,14 @@ class ScrappeyTool(BaseTool):
 
         return payload
 
+    def _wait_ms(self, url: str, wait_time: Optional[int]) -> int:
+        """Explicit wait, else the domain's adaptive readiness cap (see utils.readiness)."""
+        if wait_time:
+            return wait_time * 1000
+        if not settings.enable_adaptive_readiness:
+            return 10 * 1000
+        return int(get_ready_times().cap_for(extract_domain(url)) * 1000)
+
     def _get_wait_selector(self, vendor: str) -> str:
         """Get vendor-specific selector to wait for before considering page loaded."""
         wait_selectors = {
@@ -180,18 +227,22 @@ class ScrappeyTool(BaseTool):
                     return self._extract_products_from_html(html_content, vendor, category)
                 else:
                     # Warning logs removed; return empty list
-                    return json.dumps([], indent=2)
+                    return compact_json([])
             elif extraction_type in ["navigation", "observe"]:
-                return json.dumps(result, indent=2, default=str)
+                return compact_json(result)
             else:
-                return json.dumps(result, indent=2, default=str)
+                return compact_json(result)
 
         except Exception as e:
             self._logger.error(f"Error processing Scrappey result: {e}")
-            return json.dumps(result, indent=2, default=str)
+            return compact_json(result)
 
     def _extract_products_from_html(self, html_content: str, vendor: str, category: str) -> str:
         """Extract products from HTML content using BeautifulSoup."""
+        return compact_json(self.parse_products_html(html_content, vendor, category))
+
+    def parse_products_html(self, html_content: str, vendor: str, category: str) -> List[Dict[str, Any]]:
+        """Product tiles found in listing HTML with the vendor's selectors ([] on errors)."""
         try:
             from bs4 import BeautifulSoup
 
@@ -252,14 +303,14 @@ class ScrappeyTool(BaseTool):
                     continue
 
         # Info logging removed
-            return json.dumps(products, indent=2, default=str)
+            return products
 
         except ImportError:
             self._logger.error("BeautifulSoup4 is required for HTML parsing. Install with: pip install beautifulsoup4")
-            return json.dumps([], indent=2)
+            return []
         except Exception as e:
             self._logger.error(f"Error extracting products from HTML: {e}")
-            return json.dumps([], indent=2)
+            return []
 
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text content."""
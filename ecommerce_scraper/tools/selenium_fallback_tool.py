@@ -0,0 +1,68 @@
+"""Selenium fallback tool backed by the shared WebDriver pool."""
+
+import re
+from typing import Any, List, Optional
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, field_validator
+
+from ..utils.readiness import get_ready_times
+from ..utils.telemetry import telemetry
+from ..utils.tool_output import compact_json
+from ..utils.url_utils import extract_domain
+from ..utils.webdriver_pool import get_webdriver_pool
+
+
+class SeleniumFallbackInput(BaseModel):
+    """Input schema for the Selenium fallback tool."""
+    website_url: str = Field(..., description="Page to load (http:// or https://)")
+    css_element: Optional[str] = Field(None, description="CSS selector to read; the whole page body when omitted")
+    return_html: bool = Field(False, description="Return outerHTML instead of visible text")
+
+    @field_validator("website_url")
+    @classmethod
+    def validate_website_url(cls, v: str) -> str:
+        if not re.match(r"^https?://\S+$", v or ""):
+            raise ValueError("website_url must be an http(s) URL without whitespace")
+        return v
+
+
+class SeleniumFallbackTool(BaseTool):
+    """Reads page content with a pooled headless Chrome when Stagehand struggles."""
+
+    name: str = "selenium_scraping_tool"
+    description: str = """
+    Fallback page reader using a real headless Chrome (Selenium).
+
+    Loads website_url and returns the visible text (or HTML with return_html=true)
+    of the elements matching css_element, or of the whole page body.
+    Use only when simplified_stagehand_tool cannot load or read the page.
+    """
+    args_schema: type[BaseModel] = SeleniumFallbackInput
+
+    def _run(self, website_url: str, css_element: Optional[str] = None, return_html: bool = False) -> str:
+        try:
+            with get_webdriver_pool().driver() as driver:
+                driver.get(website_url)
+                content = self._read(driver, website_url, css_element, return_html)
+            telemetry.incr("selenium_fallback.calls")
+            return compact_json(content)
+        except Exception as e:
+            telemetry.incr("selenium_fallback.errors")
+            return f"Error scraping website: {e!s}"
+
+    def _read(self, driver: Any, url: str, css_element: Optional[str], return_html: bool) -> List[str]:
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        selector = (css_element or "").strip() or "body"
+        # Wait for the content itself, bounded by the domain's learned ready time
+        try:
+            WebDriverWait(driver, get_ready_times().cap_for(extract_domain(url))).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+            )
+        except TimeoutException:
+            pass
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        return [el.get_attribute("outerHTML") if return_html else el.text for el in elements]
@@ -14,17 +14,97 @@ Key features:
 
 import json
 import asyncio
-from typing import Dict, Any, Optional, Union, Callable, Awaitable
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Union, Callable, Awaitable
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
 from ..ai_logging.error_logger import get_error_logger
 from ..config.settings import settings
+from ..utils.deadline import DeadlineExceeded, await_with_deadline, cap_timeout
+from ..utils.action_cache import get_action_cache
+from ..utils.browser_backend import get_local_browser_slots, is_local, stagehand_config_kwargs
+from ..utils.consent_dismissal import blocking_overlay, dismiss, install
+from ..utils.dom_pruning import product_region
+from ..utils.negative_cache import canonical_url
+from ..utils.popup_handler import PopupHandler
+from ..utils.page_fingerprint import is_search_results, page_fingerprint, selectors_resolve
+from ..utils.product_apis import capture_json_responses, get_product_apis
+from ..utils.readiness import get_ready_times, wait_until_ready
+from ..utils import request_blocking
+from ..utils.selector_induction import get_selector_recipes
+from ..utils.storage_vault import get_storage_vault
+from ..utils.url_utils import extract_domain
+from ..utils.resilience import BROWSERBASE, CircuitOpenError, get_circuit_breaker, get_retry_budget
+from ..utils.telemetry import telemetry
+from ..utils.tool_output import compact_json
+
+# Compiled extraction schemas keyed by a canonical hash of their definition.
+# Agents reuse a handful of schema dicts, so a small LRU covers a whole batch.
+SCHEMA_CACHE_SIZE = 128
+_schema_cache: "OrderedDict[str, type[BaseModel]]" = OrderedDict()
+_schema_cache_lock = threading.Lock()
+
+
+def schema_cache_key(schema_def: Dict[str, Any]) -> str:
+    """Canonical hash of a schema definition (key order does not matter)."""
+    canonical = json.dumps(schema_def, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+# Extract schema fields a learned selector recipe can fill: name/price from the
+# page, url/website from the address (see utils.selector_induction)
+RECIPE_FIELDS = {"name", "price", "url", "website", "image", "description"}
+RECIPE_OPTIONAL_FIELDS = {"image", "description"}
+# Instructions asking for a listing rather than the page's one product
+LIST_INSTRUCTION_RE = re.compile(r"\b(all|every|each|list|products|items|results)\b", re.I)
+
+# ObserveResult fields agents act on (backend node ids etc. are dropped)
+OBSERVATION_FIELDS = ("selector", "description", "method", "arguments")
+
+# Cheap content hash of the live DOM (URL, element count, djb2 of the visible
+# text) deciding whether memoized observe/extract results are still valid
+_DOM_HASH_JS = """
+() => {
+  const text = document.body ? document.body.innerText : '';
+  let hash = 5381;
+  for (let i = 0; i < text.length; i++) hash = ((hash << 5) + hash + text.charCodeAt(i)) | 0;
+  return [location.href, document.getElementsByTagName('*').length, text.length, hash >>> 0].join('|');
+}
+"""
+SESSION_MEMO_SIZE = 64
+
+# dismiss_popups result when nothing needed dismissing (see utils.popup_handler)
+NO_POPUPS = "No blocking popups found"
+
+# Tool arguments kept when recording trajectories (see utils.trajectory_macros)
+TRAJECTORY_KEYS = ("operation", "url", "urls", "action", "instruction", "schema", "variables")
+
+
+class _DefaultProduct(BaseModel):
+    name: str
+    price: str
+    url: Optional[str] = None
+    image: Optional[str] = None
+    description: Optional[str] = None
+
+
+class _DefaultProductList(BaseModel):
+    products: List[_DefaultProduct]
+
+
+class BrowserSessionError(Exception):
+    """Raised when the browser session cannot be recovered for an operation."""
+
 
 class SimplifiedStagehandInput(BaseModel):
     """Input schema for SimplifiedStagehandTool."""
     operation: str = Field(
-        description="Operation to perform: extract, act, observe, or navigate"
+        description="Operation to perform: extract, extract_many, act, observe, navigate, or dismiss_popups"
     )
     instruction: Optional[str] = Field(
         default=None,
@@ -42,6 +122,10 @@ class SimplifiedStagehandInput(BaseModel):
         default=None,
         description="URL to navigate to for navigate operations"
     )
+    urls: Optional[List[str]] = Field(
+        default=None,
+        description="URLs to extract from for extract_many operations"
+    )
     variables: Optional[Dict[str, Any]] = Field(
         default=None,
         description="Variables for action substitution"
@@ -50,6 +134,10 @@ class SimplifiedStagehandInput(BaseModel):
         default=False,
         description="Whether to return action suggestions for observe operations"
     )
+    force: Optional[bool] = Field(
+        default=False,
+        description="Reload even when the browser is already on the URL (navigate operations)"
+    )
 
 class SimplifiedStagehandTool(BaseTool):
     """
@@ -68,9 +156,15 @@ class SimplifiedStagehandTool(BaseTool):
 
     Available operations:
     - extract: Extract structured data using natural language instructions with flexible schemas
+    - extract_many: Run the same extract on several URLs in one call (urls + instruction + schema)
     - act: Perform atomic actions like clicking, typing, scrolling
     - observe: Identify and observe page elements
-    - navigate: Navigate to URLs
+    - navigate: Navigate to URLs (no-op when already on the URL unless force=true);
+      known cookie-consent banners are dismissed automatically
+    - dismiss_popups: Dismiss consent banners/overlays still blocking the page
+
+    Repeating observe/extract with the same instruction on an unchanged page
+    returns the earlier result without re-running the browser model.
 
     EXTRACT OPERATION WITH CUSTOM SCHEMAS:
     Supports flexible schema definitions for precise data extraction:
@@ -90,6 +184,16 @@ class SimplifiedStagehandTool(BaseTool):
       }
     }
 
+    EXTRACT_MANY OPERATION:
+    Check several candidate pages in one call instead of navigating to each:
+    {
+      "operation": "extract_many",
+      "urls": ["https://retailer.co.uk/p/1", "https://retailer.co.uk/p/2"],
+      "instruction": "Extract the product name and price",
+      "schema": {"fields": {"name": "str", "price": "str"}, "name": "Product", "is_list": false}
+    }
+    Returns one compact JSON list with {"url", "data"} or {"url", "error"} per URL.
+
     Schema field types: str, optional_str, url, optional_url, int, float
     Auto URL detection for fields containing: url, link, image, href
 
@@ -114,12 +218,25 @@ class SimplifiedStagehandTool(BaseTool):
                 raise ValueError("operation parameter is required")
 
             # Call the main dispatch method with all kwargs
-            return self._execute_operation(**kwargs)
+            result = self._execute_operation(**kwargs)
+            if self._trajectory is not None and not str(result).startswith("Error"):
+                self._trajectory.append({key: kwargs.get(key) for key in TRAJECTORY_KEYS})
+            return result
 
         except Exception as e:
             self.logger.error(f"Tool execution failed: {e}")
             return f"Error: {str(e)}"
 
+    # --- Trajectory recording (see utils.trajectory_macros) ---
+    def start_recording(self) -> None:
+        """Record successful operations until ``stop_recording``."""
+        self._trajectory = []
+
+    def stop_recording(self) -> List[Dict[str, Any]]:
+        """Stop recording and return the operations recorded so far."""
+        trajectory, self._trajectory = self._trajectory or [], None
+        return trajectory
+
     def _normalize_tool_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
         """Accept flexible inputs (JSON strings or single-item lists) and coerce to dict.
 
@@ -212,6 +329,15 @@ class SimplifiedStagehandTool(BaseTool):
                     raise ValueError("extract operation requires 'instruction' parameter")
                 return run_async(self.extract(instruction, schema))
 
+            elif operation == "extract_many":
+                urls = kwargs.get("urls") or []
+                if isinstance(urls, str):
+                    urls = json.loads(urls) if urls.strip().startswith("[") else [urls]
+                instruction = kwargs.get("instruction", "")
+                if not urls or not instruction:
+                    raise ValueError("extract_many operation requires 'urls' and 'instruction' parameters")
+                return run_async(self.extract_many(urls, instruction, kwargs.get("schema")))
+
             elif operation == "act":
                 action = kwargs.get("action", "")
                 variables = kwargs.get("variables")
@@ -235,10 +361,13 @@ class SimplifiedStagehandTool(BaseTool):
                 url = kwargs.get("url", "")
                 if not url:
                     raise ValueError("navigate operation requires 'url' parameter")
-                return run_async(self.navigate(url))
+                return run_async(self.navigate(url, force=bool(kwargs.get("force"))))
+
+            elif operation == "dismiss_popups":
+                return run_async(self.dismiss_popups())
 
             else:
-                raise ValueError(f"Unknown operation: {operation}. Supported: extract, act, observe, navigate")
+                raise ValueError(f"Unknown operation: {operation}. Supported: extract, extract_many, act, observe, navigate, dismiss_popups")
 
         except Exception as e:
             self.logger.error(f"Operation execution failed: {e}")
@@ -254,6 +383,18 @@ class SimplifiedStagehandTool(BaseTool):
     _session_initialized: bool = False
     _logger: Optional[Any] = None
     _session_reinit_count: int = 0
+    _trajectory: Optional[List[Dict[str, Any]]] = None
+    # Intra-session memo: last navigation (requested, landed URL) and
+    # observe/extract results keyed by instruction, valid for one DOM hash
+    _navigation: Optional[tuple] = None
+    _memo: Dict[str, tuple] = {}
+    # Domains whose stored browser state was restored / saved in this session
+    _vault_restored: set = set()
+    _vault_saved: set = set()
+    # JSON XHR/fetch responses of the current page (see utils.product_apis)
+    _responses: List[Dict[str, str]] = []
+    # Holds a LocalBrowserSlots slot while a local Chromium session is open
+    _holds_browser_slot: bool = False
     
     def __init__(self, log_dir: str = 'logs', **kwargs):
         """Initialize the simplified Stagehand tool."""
@@ -290,8 +431,6 @@ class SimplifiedStagehandTool(BaseTool):
                 # Get credentials and model selection from settings/env
                 import os
 
-                api_key = os.getenv('BROWSERBASE_API_KEY')
-                project_id = os.getenv('BROWSERBASE_PROJECT_ID')
                 # Resolve model API key based on configured model name
                 try:
                     model_api_key = settings.get_api_key_for_model(settings.stagehand_model_name)
@@ -299,9 +438,6 @@ class SimplifiedStagehandTool(BaseTool):
                     # Fallback to OPENAI_API_KEY for backwards compatibility
                     model_api_key = os.getenv('OPENAI_API_KEY')
 
-                if not api_key or not project_id:
-                    raise Exception("Browserbase API key and project ID are required. Set BROWSERBASE_API_KEY and BROWSERBASE_PROJECT_ID environment variables.")
-
                 if not model_api_key:
                     raise Exception("OpenAI API key is required for Stagehand operations. Set OPENAI_API_KEY environment variable.")
 
@@ -324,12 +460,12 @@ class SimplifiedStagehandTool(BaseTool):
                 else:
                     model_name = configured_model
 
+                # Browserbase credentials or local Chromium launch options (see utils.browser_backend)
                 stagehand_config = StagehandConfig(
-                    env="BROWSERBASE",
-                    api_key=api_key,  # Python API uses snake_case
-                    project_id=project_id,  # Python API uses snake_case
                     model_name=model_name,  # e.g., openai/gpt-5
                     verbose=settings.stagehand_verbose,
+                    dom_settle_timeout_ms=settings.stagehand_dom_settle_timeout_ms,
+                    **stagehand_config_kwargs(),
                 )
 
                 # CRITICAL FIX: Add session_id for session reuse if provided
@@ -342,9 +478,18 @@ class SimplifiedStagehandTool(BaseTool):
                 # Create Stagehand instance with config and model API key
                 self._stagehand = Stagehand(stagehand_config, model_api_key=model_api_key)
 
-                # Initialize following official pattern
-                await self._stagehand.init()
+                # Initialize following official pattern (bounded by the active deadline)
+                await self._acquire_local_browser()
+                try:
+                    await await_with_deadline(self._stagehand.init(), "stagehand init")
+                except BaseException:
+                    self._release_local_browser()
+                    raise
                 self._session_initialized = True
+                if settings.enable_consent_dismissal:
+                    await self._install_consent_dismissal(self._stagehand)
+                if settings.enable_product_api_discovery:
+                    capture_json_responses(self._stagehand.page, self._responses)
 
                 # Info logging removed
 
@@ -366,6 +511,8 @@ class SimplifiedStagehandTool(BaseTool):
                 else:
                     pass
 
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 self._error_logger.error(f"Failed to initialize Stagehand v0.5.0: {e}", exc_info=True)
                 raise Exception(f"Failed to initialize Stagehand v0.5.0: {e}")
@@ -434,40 +581,180 @@ class SimplifiedStagehandTool(BaseTool):
                 extraction_schema = self._create_default_schema()
 
             async def op(sh):
-                return await sh.page.extract(
-                    instruction,
-                    schema=extraction_schema
+                data = await self._memoized(
+                    sh.page,
+                    "extract",
+                    f"{instruction}|{schema_cache_key(schema or {})}",
+                    lambda: self._extract_on_page(sh.page, instruction, schema, extraction_schema),
                 )
-
-            extraction = await self._run_with_session_retry(op, "extract")
+                if data:
+                    await self._save_storage(sh)
+                    self._learn_product_api(sh.page, data)
+                return data
 
             # Handle the extraction result
-            result_data = self._process_extraction_result(extraction)
+            result_data = await self._run_with_session_retry(op, "extract")
 
             # Log extraction success
             # Info logging removed
 
-            # Return clean JSON
-            result = json.dumps(result_data, indent=2, default=str)
-            return result
+            # Return compact JSON (token-capped for the agent's context)
+            return compact_json(result_data)
 
         except Exception as error:
             error_msg = f"Failed to extract content: {str(error)}"
             self._error_logger.error(error_msg, exc_info=True)
             raise Exception(error_msg)
 
+    async def extract_many(
+        self,
+        urls: List[str],
+        instruction: str,
+        schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Run the same extraction on several URLs in one tool call.
+
+        With local Stagehand execution each URL gets its own tab, at most
+        ``settings.extract_many_concurrency`` at a time. Through the Stagehand
+        API (Browserbase), extraction runs server-side on the session's active
+        page, so URLs are visited one after another on the main page instead;
+        the main page is left on the last URL and its navigation memo, cached
+        observe/extract results and captured responses are discarded.
+
+        Args:
+            urls: Pages to extract from (deduplicated, capped at ``extract_many_max_urls``)
+            instruction: Extraction instruction applied to every page
+            schema: Optional custom schema definition (see ``extract``)
+
+        Returns:
+            Compact JSON list of {"url", "data"} or {"url", "error"} per URL
+        """
+        try:
+            urls = list(dict.fromkeys(u for u in urls if isinstance(u, str) and u))
+            urls = urls[:settings.extract_many_max_urls]
+            extraction_schema = self._create_dynamic_schema(schema) if schema else self._create_default_schema()
+
+            async def extract_url(page, url):
+                try:
+                    await self._block_requests(page, url)
+                    timeout_s = cap_timeout(None, "navigate")
+                    goto_kwargs = {"timeout": int(timeout_s * 1000)} if timeout_s is not None else {}
+                    started = time.monotonic()
+                    await page.goto(url, wait_until="domcontentloaded", **goto_kwargs)
+                    await self._record_page_load(page, started)
+                    await self._wait_until_ready(page, url)
+                    data = await self._extract_on_page(page, instruction, schema, extraction_schema)
+                    return {"url": url, "data": data}
+                except DeadlineExceeded:
+                    raise
+                except Exception as error:
+                    if self._is_session_closed_error(error):
+                        raise
+                    return {"url": url, "error": str(error)[:200]}
+
+            async def op(sh):
+                if getattr(sh, "use_api", False):
+                    try:
+                        return [await extract_url(sh.page, url) for url in urls]
+                    finally:
+                        # The main page moved: what was known about it is stale
+                        self._navigation = None
+                        self._memo.clear()
+                        self._responses.clear()
+                semaphore = asyncio.Semaphore(max(1, settings.extract_many_concurrency))
+
+                async def in_tab(url):
+                    async with semaphore:
+                        page = await sh.context.new_page()
+                        try:
+                            return await extract_url(page, url)
+                        finally:
+                            try:
+                                await page.close()
+                            except Exception:
+                                pass
+
+                return await asyncio.gather(*(in_tab(url) for url in urls))
+
+            results = await self._run_with_session_retry(op, "extract_many")
+            telemetry.incr("extract_many.urls", len(urls))
+            return compact_json(results)
+
+        except Exception as error:
+            error_msg = f"Failed to extract from URLs: {str(error)}"
+            self._error_logger.error(error_msg, exc_info=True)
+            raise Exception(error_msg)
+
+    async def _extract_on_page(
+        self,
+        page: Any,
+        instruction: str,
+        schema: Optional[Dict[str, Any]],
+        extraction_schema: type[BaseModel],
+    ) -> Any:
+        """Extract from one page, answering from a learned selector recipe when possible."""
+        single_product = self._single_product_extract(instruction, schema)
+        use_recipes = settings.enable_selector_recipes and single_product and self._recipe_compatible(schema)
+        if use_recipes:
+            # Learned name/price selectors answer repeat retailers without an LLM call
+            product = await self._extract_with_recipe(page)
+            if product is not None:
+                return product
+        # Listings spread products over the page: only single-product extracts are scoped to a region
+        region = await self._product_region(page) if single_product else None
+        settle_kwargs = self._settle_kwargs(page)
+        extract_kwargs = {"selector": region["selector"]} if region else {}
+        extraction = await page.extract(
+            instruction,
+            schema=extraction_schema,
+            **extract_kwargs,
+            **settle_kwargs
+        )
+        data = self._process_extraction_result(extraction)
+        if region and (not data or (isinstance(data, dict) and not any(data.values()))):
+            # The pruned region missed the data; retry on the whole page
+            telemetry.incr("dom_pruning.fallback")
+            extraction = await page.extract(instruction, schema=extraction_schema, **settle_kwargs)
+            data = self._process_extraction_result(extraction)
+        if use_recipes:
+            await self._learn_recipe(page, data)
+        return data
+
     def _create_dynamic_schema(self, schema_def: Dict[str, Any]) -> type[BaseModel]:
         """
         Create a dynamic Pydantic schema from JSON definition.
 
+        Compiled models are cached (bounded LRU) by a canonical hash of the
+        definition, so repeated extracts with the same schema skip create_model.
+
         Args:
             schema_def: Schema definition in JSON format
 
         Returns:
             Dynamically created Pydantic model class
         """
+        key = schema_cache_key(schema_def)
+        with _schema_cache_lock:
+            cached = _schema_cache.get(key)
+            if cached is not None:
+                _schema_cache.move_to_end(key)
+        if cached is not None:
+            telemetry.incr("schema_cache.hit")
+            return cached
+        telemetry.incr("schema_cache.miss")
+
+        model = self._build_dynamic_schema(schema_def)
+        if model is not _DefaultProductList:
+            with _schema_cache_lock:
+                _schema_cache[key] = model
+                while len(_schema_cache) > SCHEMA_CACHE_SIZE:
+                    _schema_cache.popitem(last=False)
+        return model
+
+    def _build_dynamic_schema(self, schema_def: Dict[str, Any]) -> type[BaseModel]:
+        """Compile a schema definition into Pydantic models (uncached)."""
         try:
-            from typing import List, Optional
             from pydantic import create_model
 
             # Handle different schema formats
@@ -523,21 +810,8 @@ class SimplifiedStagehandTool(BaseTool):
             return self._create_default_schema()
 
     def _create_default_schema(self) -> type[BaseModel]:
-        """Create a lenient default product extraction schema (URLs as strings)."""
-        from typing import List, Optional
-        from pydantic import BaseModel
-
-        class Product(BaseModel):
-            name: str
-            price: str
-            url: Optional[str] = None
-            image: Optional[str] = None
-            description: Optional[str] = None
-
-        class ProductList(BaseModel):
-            products: List[Product]
-
-        return ProductList
+        """Return the lenient default product extraction schema (URLs as strings)."""
+        return _DefaultProductList
 
     def _process_extraction_result(self, extraction: Any) -> Any:
         """
@@ -613,10 +887,10 @@ class SimplifiedStagehandTool(BaseTool):
             # Info logging removed
 
             async def op(sh):
-                return await sh.page.act({
-                    "action": action,
-                    **({"variables": variables} if variables else {})
-                })
+                if variables:
+                    # Variable substitution needs the LLM path; never cache it
+                    return await sh.page.act({"action": action, "variables": variables})
+                return await self._act_with_cache(sh.page, action)
 
             await self._run_with_session_retry(op, "act")
             
@@ -647,12 +921,14 @@ class SimplifiedStagehandTool(BaseTool):
             # Official v0.5.0 API pattern: Simple string parameter
             # Based on our successful test: await page.observe(instruction)
             async def op(sh):
-                return await sh.page.observe(instruction)
+                return await self._memoized(
+                    sh.page, "observe", instruction, lambda: self._observe_with_cache(sh.page, instruction)
+                )
 
             observations = await self._run_with_session_retry(op, "observe")
 
             # Format result as JSON string
-            result = f"Observations: {json.dumps(observations, default=str)}"
+            result = f"Observations: {compact_json(observations, fields=OBSERVATION_FIELDS)}"
             # Info logging removed
 
             return result
@@ -662,27 +938,51 @@ class SimplifiedStagehandTool(BaseTool):
             self._error_logger.error(error_msg, exc_info=True)
             raise Exception(error_msg)
     
-    async def navigate(self, url: str) -> str:
+    async def navigate(self, url: str, force: bool = False) -> str:
         """
         Navigate to a URL.
         
         Following official pattern: await page.goto(url, {waitUntil: 'domcontentloaded'})
+        Navigating to the page the browser is already on is a no-op unless ``force``.
         
         Args:
             url: URL to navigate to
+            force: Reload even when already on ``url``
             
         Returns:
             Navigation confirmation with session info
         """
         try:
             # Info logging removed
+            already_there = False
 
             async def op(sh):
+                nonlocal already_there
+                if not force and self._is_current_url(sh.page, url):
+                    already_there = True
+                    telemetry.incr("session_memo.navigate.hit")
+                    return sh
+                await self._restore_storage(sh, url)
+                await self._block_requests(sh.page, url)
+                self._responses.clear()
                 # Direct API call following official pattern (Python naming convention)
-                await sh.page.goto(url, wait_until="domcontentloaded")
+                timeout_s = cap_timeout(None, "navigate")
+                goto_kwargs = {"timeout": int(timeout_s * 1000)} if timeout_s is not None else {}
+                started = time.monotonic()
+                await sh.page.goto(url, wait_until="domcontentloaded", **goto_kwargs)
+                await self._record_page_load(sh.page, started)
+                await self._wait_until_ready(sh.page, url)
+                self._navigation = (canonical_url(url), sh.page.url)
+                self._memo.clear()
+                dismissed.extend(await self._dismiss_consent(sh.page))
+                if dismissed:
+                    self._storage_went_stale(url)
                 return sh
 
+            dismissed: List[str] = []
             stagehand = await self._run_with_session_retry(op, "navigate")
+            if already_there:
+                return f"Already on: {url} (pass force=true to reload)"
 
             # Return session info following official pattern (prefer snake_case)
             session_id = (
@@ -691,6 +991,8 @@ class SimplifiedStagehandTool(BaseTool):
                 or getattr(stagehand, 'browserbaseSessionID', 'unknown')
             )
             result = f"Navigated to: {url}\nSession: {session_id}"
+            if dismissed:
+                result += f"\nDismissed: {', '.join(dismissed)}"
             
             # Info logging removed
             
@@ -703,6 +1005,37 @@ class SimplifiedStagehandTool(BaseTool):
     
 
     
+    async def dismiss_popups(self) -> str:
+        """
+        Dismiss consent banners and overlays on the current page.
+
+        Known consent platforms and retailer overlays are dismissed by selector
+        (see utils.consent_dismissal); a single LLM ``act`` is used only when an
+        unknown overlay still covers the page.
+
+        Returns:
+            Summary of what was dismissed
+        """
+        try:
+            async def op(sh):
+                dismissed = await self._dismiss_consent(sh.page)
+                overlay = await blocking_overlay(sh.page)
+                if overlay:
+                    telemetry.incr("consent.llm_escalations")
+                    await self._act_with_cache(sh.page, PopupHandler.create_popup_dismissal_command("general"))
+                return dismissed, overlay
+
+            dismissed, overlay = await self._run_with_session_retry(op, "dismiss_popups")
+            lines = [f"Dismissed: {', '.join(dismissed)}"] if dismissed else []
+            if overlay:
+                lines.append(f"Dismissed overlay via act: {overlay}")
+            return "\n".join(lines) or NO_POPUPS
+
+        except Exception as error:
+            error_msg = f"Failed to dismiss popups: {str(error)}"
+            self._error_logger.error(error_msg, exc_info=True)
+            raise Exception(error_msg)
+
     def get_session_id(self) -> Optional[str]:
         """Get the current Browserbase session ID."""
         return self.session_id
@@ -717,9 +1050,307 @@ class SimplifiedStagehandTool(BaseTool):
             except Exception as e:
                 self.logger.warning(f"Error closing Stagehand session: {e}")
             finally:
+                self._release_local_browser()
                 self._stagehand = None
                 self._session_initialized = False
                 self.session_id = None
+                self._navigation = None
+                self._memo.clear()
+                self._responses.clear()
+                self._vault_restored.clear()
+                self._vault_saved.clear()
+
+    # --- Selector recipe helpers ---
+    def _single_product_extract(self, instruction: str, schema: Optional[Dict[str, Any]]) -> bool:
+        """Whether the extract asks for the page's one product (``is_list: false``), not a listing."""
+        if not schema or schema.get('is_list', True):
+            return False
+        return not LIST_INSTRUCTION_RE.search(instruction or "")
+
+    def _recipe_compatible(self, schema: Optional[Dict[str, Any]]) -> bool:
+        """Whether a learned name/price recipe can answer an extract with this schema."""
+        if not schema:
+            return True
+        fields = schema.get('fields')
+        if not isinstance(fields, dict) or not {"name", "price"} <= set(fields):
+            return False
+        for field_name, field_type in fields.items():
+            if field_name not in RECIPE_FIELDS:
+                return False
+            if field_name in RECIPE_OPTIONAL_FIELDS and not str(field_type).startswith('optional'):
+                return False
+        return True
+
+    async def _extract_with_recipe(self, page: Any) -> Optional[Dict[str, Any]]:
+        try:
+            product = await get_selector_recipes().extract(page)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+            return None
+        if product is not None:
+            product["website"] = extract_domain(product["url"])
+        return product
+
+    async def _learn_recipe(self, page: Any, data: Any) -> None:
+        """Induce selectors when the LLM extracted exactly one product (a product page)."""
+        if isinstance(data, list):
+            if len(data) != 1:
+                return
+            data = data[0]
+        if not isinstance(data, dict):
+            return
+        try:
+            await get_selector_recipes().induce(page, data)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+
+    # --- Product API helpers ---
+    def _learn_product_api(self, page: Any, data: Any) -> None:
+        """Remember the JSON endpoint behind a single extracted product (see utils.product_apis)."""
+        if not settings.enable_product_api_discovery or not self._responses:
+            return
+        if isinstance(data, list):
+            if len(data) != 1:
+                return
+            data = data[0]
+        if not isinstance(data, dict):
+            return
+        try:
+            get_product_apis().learn(page.url, self._responses, data)
+        except Exception as error:
+            self.logger.warning(f"Could not learn product API: {error}")
+
+    # --- Consent dismissal helpers ---
+    async def _install_consent_dismissal(self, stagehand: Any) -> None:
+        try:
+            await install(stagehand.context)
+        except Exception as e:
+            self.logger.warning(f"Could not install consent dismissal script: {e}")
+
+    async def _dismiss_consent(self, page: Any) -> List[str]:
+        """Rule-based sweep of known consent banners; never fails the calling operation."""
+        if not settings.enable_consent_dismissal:
+            return []
+        try:
+            return await dismiss(page)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+            return []
+
+    # --- Request blocking helpers ---
+    async def _block_requests(self, page: Any, url: str) -> None:
+        """Install the resource/tracker block list for ``url`` (see utils.request_blocking)."""
+        if not settings.enable_request_blocking:
+            return
+        try:
+            await request_blocking.apply(page, url)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+            self.logger.warning(f"Could not install request blocking: {error}")
+
+    async def _record_page_load(self, page: Any, started: float) -> None:
+        try:
+            await request_blocking.record_page_load(page, time.monotonic() - started)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+
+    # --- Page readiness helpers ---
+    async def _wait_until_ready(self, page: Any, url: str) -> None:
+        """Wait for product content or network quiet (see utils.readiness)."""
+        if not settings.enable_adaptive_readiness:
+            return
+        try:
+            await wait_until_ready(page, url)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+            self.logger.warning(f"Readiness wait failed: {error}")
+
+    def _settle_kwargs(self, page: Any) -> Dict[str, Any]:
+        """Per-call DOM settle timeout, capped by the domain's learned ready time."""
+        if not settings.enable_adaptive_readiness:
+            return {}
+        try:
+            cap_s = get_ready_times().cap_for(extract_domain(page.url))
+        except Exception:
+            return {}
+        return {"dom_settle_timeout_ms": min(settings.stagehand_dom_settle_timeout_ms, int(cap_s * 1000))}
+
+    # --- Local browser slot helpers ---
+    async def _acquire_local_browser(self) -> None:
+        """Wait for a local Chromium slot before launching (no-op on Browserbase)."""
+        if not is_local() or self._holds_browser_slot:
+            return
+        if not await get_local_browser_slots().acquire(timeout=cap_timeout(None, "local browser slot")):
+            raise Exception("No local browser available; raise LOCAL_BROWSER_POOL_SIZE")
+        self._holds_browser_slot = True
+
+    def _release_local_browser(self) -> None:
+        if self._holds_browser_slot:
+            self._holds_browser_slot = False
+            get_local_browser_slots().release()
+
+    # --- Storage vault helpers ---
+    async def _restore_storage(self, sh: Any, url: str) -> None:
+        """Load saved cookies/localStorage for the URL's domain once per session."""
+        domain = extract_domain(url)
+        if not settings.enable_storage_vault or not domain or domain in self._vault_restored:
+            return
+        self._vault_restored.add(domain)
+        try:
+            await get_storage_vault().restore(sh.context, domain)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+            self.logger.warning(f"Could not restore storage state for {domain}: {error}")
+
+    async def _save_storage(self, sh: Any) -> None:
+        """Save the current domain's storage state after a successful extraction."""
+        domain = extract_domain(sh.page.url or "")
+        if not settings.enable_storage_vault or not domain or domain in self._vault_saved:
+            return
+        try:
+            if await get_storage_vault().save(sh.context, domain):
+                self._vault_saved.add(domain)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+            self.logger.warning(f"Could not save storage state for {domain}: {error}")
+
+    def _storage_went_stale(self, url: str) -> None:
+        """Banners reappeared on a restored domain: drop the entry and re-save on success."""
+        domain = extract_domain(url)
+        if domain in self._vault_restored and get_storage_vault().get(domain) is not None:
+            get_storage_vault().invalidate(domain)
+            telemetry.incr("storage_vault.stale")
+        self._vault_saved.discard(domain)
+
+    # --- Intra-session memo helpers ---
+    def _is_current_url(self, page: Any, url: str) -> bool:
+        """Whether the page is on ``url``, directly or via the redirect of the last navigate."""
+        current = page.url or ""
+        if not current or current == "about:blank":
+            return False
+        if canonical_url(current) == canonical_url(url):
+            return True
+        return self._navigation == (canonical_url(url), current)
+
+    async def _dom_hash(self, page: Any) -> Optional[str]:
+        try:
+            return await page.evaluate(_DOM_HASH_JS)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+            return None
+
+    async def _memoized(self, page: Any, kind: str, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Serve a repeated observe/extract on an unchanged DOM from the session memo."""
+        if not settings.enable_session_memo:
+            return await compute()
+        dom_hash = await self._dom_hash(page)
+        memo_key = f"{kind}|{key}"
+        entry = self._memo.get(memo_key)
+        if dom_hash and entry and entry[0] == dom_hash:
+            telemetry.incr(f"session_memo.{kind}.hit")
+            return entry[1]
+        telemetry.incr(f"session_memo.{kind}.miss")
+        result = await compute()
+        if dom_hash:
+            if len(self._memo) >= SESSION_MEMO_SIZE:
+                self._memo.pop(next(iter(self._memo)))
+            self._memo[memo_key] = (dom_hash, result)
+        return result
+
+    # --- DOM pruning helpers ---
+    async def _product_region(self, page: Any) -> Optional[Dict[str, Any]]:
+        """Product region to scope extraction to (see utils.dom_pruning), or None.
+
+        Search results pages are never pruned: their products are not in one region.
+        """
+        if not settings.enable_dom_pruning or is_search_results(page.url or ""):
+            return None
+        try:
+            return await product_region(page, min_tokens=settings.dom_pruning_min_tokens)
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                raise
+            return None
+
+    # --- Action cache helpers ---
+    async def _cache_context(self, page: Any) -> Optional[tuple]:
+        """(domain, page-template fingerprint) for the action cache, or None when unavailable."""
+        if not settings.enable_action_cache:
+            return None
+        try:
+            domain = extract_domain(page.url or "")
+            return (domain, await page_fingerprint(page)) if domain else None
+        except Exception:
+            return None
+
+    async def _cached_results(self, page: Any, ctx: tuple, kind: str, instruction: str) -> Optional[list]:
+        """Cached ObserveResults whose selectors still resolve on the page."""
+        cached = get_action_cache().get(*ctx, kind, instruction)
+        if not cached:
+            return None
+        if await selectors_resolve(page, [r.get("selector") for r in cached]):
+            return cached
+        get_action_cache().invalidate(*ctx, kind, instruction)
+        telemetry.incr("action_cache.stale")
+        return None
+
+    async def _act_with_cache(self, page: Any, action: str) -> Any:
+        """Replay a cached selector for ``action``; resolve (and cache) it via observe otherwise."""
+        ctx = await self._cache_context(page)
+        if ctx is None:
+            return await page.act({"action": action})
+
+        cached = await self._cached_results(page, ctx, "act", action)
+        if cached:
+            try:
+                result = await page.act(cached[0])
+                if getattr(result, "success", True) is not False:
+                    telemetry.incr("action_cache.hit")
+                    return result
+            except Exception as error:
+                if self._is_session_closed_error(error):
+                    raise
+            get_action_cache().invalidate(*ctx, "act", action)
+            telemetry.incr("action_cache.stale")
+
+        telemetry.incr("action_cache.miss")
+        # observe + act(ObserveResult) costs the same single inference as act(str),
+        # but exposes the selector so the next call can skip the LLM
+        observed = await page.observe(action)
+        candidate = next((o for o in observed or [] if getattr(o, "method", None)), None)
+        if candidate is None:
+            return await page.act({"action": action})
+        result = await page.act(candidate)
+        if getattr(result, "success", True) is not False:
+            get_action_cache().put(*ctx, "act", action, [candidate.model_dump(exclude_none=True)])
+        return result
+
+    async def _observe_with_cache(self, page: Any, instruction: str) -> list:
+        """Observe with cached results when every cached selector still resolves."""
+        ctx = await self._cache_context(page)
+        if ctx is not None:
+            cached = await self._cached_results(page, ctx, "observe", instruction)
+            if cached:
+                telemetry.incr("action_cache.hit")
+                return cached
+            telemetry.incr("action_cache.miss")
+
+        observations = [
+            o.model_dump(exclude_none=True) if hasattr(o, "model_dump") else o
+            for o in (await page.observe(instruction) or [])
+        ]
+        if ctx is not None and observations and all(isinstance(o, dict) for o in observations):
+            get_action_cache().put(*ctx, "observe", instruction, observations)
+        return observations
 
     # --- Session retry helpers ---
     def _is_session_closed_error(self, error: Exception) -> bool:
@@ -734,37 +1365,88 @@ class SimplifiedStagehandTool(BaseTool):
             or "nonetype object has no attribute 'stream'" in msg
         )
 
-    async def _run_with_session_retry(self, op: Callable[[Any], Awaitable[Any]], op_name: str):
-        """Run an operation with a one-time session reinitialization on closed-session errors.
+    async def _attempt_operation(self, op: Callable[[Any], Awaitable[Any]], op_name: str):
+        """Run one attempt through the Browserbase circuit breaker.
 
-        - On first detection, close and recreate the Browserbase session, then retry once.
-        - If it happens again at any time afterwards, terminate the script.
+        Session initialization failures and closed-session errors count against
+        the breaker; any other error means the browser answered and counts as
+        success.
         """
+        breaker = get_circuit_breaker(BROWSERBASE)
+        breaker.before_call()
         try:
             sh = await self._get_stagehand()
-            return await op(sh)
-        except Exception as first_error:
-            if self._is_session_closed_error(first_error):
-                if self._session_reinit_count == 0:
-                    self._error_logger.error(
-                        f"{op_name}: Session closed detected. Reinitializing Browserbase session once...",
-                        exc_info=True,
-                    )
-                    # Close existing session and reset state
-                    try:
-                        await self.close()
-                    except Exception:
-                        pass
-                    self._session_reinit_count = 1
-                    # Recreate and retry once
-                    sh2 = await self._get_stagehand()
-                    return await op(sh2)
-                else:
-                    self._error_logger.error(
-                        f"{op_name}: Session closed again after one retry. Exiting.",
-                        exc_info=True,
-                    )
-                    import sys
-                    raise SystemExit(1)
-            # Not a session-closed error; re-raise
+        except DeadlineExceeded:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
             raise
+        try:
+            result = await await_with_deadline(op(sh), op_name)
+        except DeadlineExceeded:
+            breaker.release()
+            raise
+        except Exception as error:
+            if self._is_session_closed_error(error):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _run_with_session_retry(self, op: Callable[[Any], Awaitable[Any]], op_name: str):
+        """Run an operation, reinitializing the session once on closed-session errors.
+
+        - Attempts go through the Browserbase circuit breaker; an open circuit fails fast.
+        - On a closed-session error, close and recreate the Browserbase session and retry
+          once, provided the shared Browserbase retry budget allows it.
+        - Otherwise raise BrowserSessionError so the agent can move on to the next
+          step or retailer instead of the whole process exiting.
+        - Every attempt is bounded by the active deadline (see utils.deadline).
+        """
+        budget = get_retry_budget(BROWSERBASE)
+        budget.record_request()
+        try:
+            return await self._attempt_operation(op, op_name)
+        except (DeadlineExceeded, CircuitOpenError):
+            raise
+        except Exception as first_error:
+            if not self._is_session_closed_error(first_error):
+                # Not a session-closed error; re-raise
+                raise
+            if not budget.try_acquire():
+                await self._discard_session()
+                raise BrowserSessionError(
+                    f"{op_name}: Browserbase session closed and the retry budget is exhausted"
+                ) from first_error
+
+            self._error_logger.error(
+                f"{op_name}: Session closed detected. Reinitializing Browserbase session...",
+                exc_info=True,
+            )
+            await self._discard_session()
+            self._session_reinit_count += 1
+            try:
+                return await self._attempt_operation(op, op_name)
+            except (DeadlineExceeded, CircuitOpenError):
+                raise
+            except Exception as second_error:
+                if not self._is_session_closed_error(second_error):
+                    raise
+                # Start the next operation from a fresh session
+                await self._discard_session()
+                raise BrowserSessionError(
+                    f"{op_name}: Browserbase session closed again after reinitialization"
+                ) from second_error
+
+    async def _discard_session(self) -> None:
+        """Close the current session, ignoring errors from an already dead browser."""
+        try:
+            await self.close()
+        except Exception:
+            pass
+        self._release_local_browser()
+        self._stagehand = None
+        self._session_initialized = False
@@ -0,0 +1,62 @@
+"""Per-domain cache of resolved Stagehand observe/act selectors.
+
+Stagehand resolves every ``act`` ("Click Accept All") and ``observe`` call with
+an LLM pass over the DOM. The resolved ``ObserveResult`` (selector, method,
+arguments) is stable for a given retailer page template, so it is cached per
+(domain, page-template fingerprint, instruction) and replayed directly on later
+calls. Callers must check that the cached selectors still resolve and
+``invalidate`` the entry when they do not.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional
+
+from .json_store import JsonStore
+
+# Entries kept per domain; the least recently stored are evicted first
+MAX_ENTRIES_PER_DOMAIN = 100
+
+
+def _entry_key(fingerprint: str, kind: str, instruction: str) -> str:
+    normalized = " ".join(instruction.lower().split())
+    return f"{kind}|{fingerprint}|{normalized}"
+
+
+class ActionCache:
+    """Resolved ObserveResults persisted in ``action_cache.json``."""
+
+    def __init__(self, store: Optional[JsonStore] = None):
+        self._store = store or JsonStore("action_cache.json")
+
+    def get(self, domain: str, fingerprint: str, kind: str, instruction: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached ObserveResult dicts for an ``act``/``observe`` instruction, or None."""
+        entry = (self._store.load().get(domain) or {}).get(_entry_key(fingerprint, kind, instruction))
+        return entry.get("results") if entry else None
+
+    def put(self, domain: str, fingerprint: str, kind: str, instruction: str, results: List[Dict[str, Any]]) -> None:
+        if not domain or not results:
+            return
+        with self._store.transaction() as data:
+            entries = data.setdefault(domain, {})
+            entries[_entry_key(fingerprint, kind, instruction)] = {"results": results, "stored_at": time.time()}
+            if len(entries) > MAX_ENTRIES_PER_DOMAIN:
+                oldest = sorted(entries, key=lambda k: entries[k].get("stored_at", 0))
+                for key in oldest[: len(entries) - MAX_ENTRIES_PER_DOMAIN]:
+                    del entries[key]
+
+    def invalidate(self, domain: str, fingerprint: str, kind: str, instruction: str) -> None:
+        with self._store.transaction() as data:
+            (data.get(domain) or {}).pop(_entry_key(fingerprint, kind, instruction), None)
+
+
+_cache: Optional[ActionCache] = None
+
+
+def get_action_cache() -> ActionCache:
+    """Return the process-wide action cache."""
+    global _cache
+    if _cache is None:
+        _cache = ActionCache()
+    return _cache
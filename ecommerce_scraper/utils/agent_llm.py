@@ -0,0 +1,54 @@
+"""Agent LLM construction shared by the CrewAI agents.
+
+Every agent builds its LLM through ``build_agent_llm`` so that latency guards
+apply uniformly: each call's timeout is capped to the active deadline (see
+``utils.deadline``), an already expired budget fails fast instead of starting
+another inference, slow calls can be hedged (see ``utils.hedging``), and calls
+fail fast while the LLM provider's circuit is open (see ``utils.resilience``).
+"""
+
+from typing import Any, Optional
+
+from crewai import LLM
+
+from ..config.settings import settings
+from .deadline import DeadlineExceeded, current_deadline
+from .hedging import get_hedger
+from .resilience import LLM_PROVIDER, get_circuit_breaker
+
+
+class ScraperLLM(LLM):
+    """CrewAI LLM whose calls honour the active deadline, may be hedged and are circuit-guarded."""
+
+    def __init__(self, model: str, **kwargs: Any):
+        kwargs.setdefault("timeout", settings.llm_timeout_seconds)
+        super().__init__(model=model, **kwargs)
+
+    def call(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        breaker = get_circuit_breaker(LLM_PROVIDER)
+        breaker.before_call()
+        deadline = current_deadline()
+        try:
+            llm = self
+            if deadline is not None:
+                # A per-call copy: the shared instance's timeout would race with
+                # concurrent and hedged calls
+                llm = self.model_copy(update={"timeout": deadline.cap(self.timeout, "agent LLM call")})
+            result = get_hedger("llm").call(super(ScraperLLM, llm).call, messages, *args, **kwargs)
+        except DeadlineExceeded:
+            breaker.release()
+            raise
+        except Exception:
+            if deadline is not None and deadline.expired():
+                # Our own budget cut the call short; not the provider's fault
+                breaker.release()
+            else:
+                breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+
+
+def build_agent_llm(model_name: Optional[str] = None) -> LLM:
+    """Create the LLM used by CrewAI agents (defaults to ``settings.agent_model_name``)."""
+    return ScraperLLM(model=model_name or settings.agent_model_name)
@@ -0,0 +1,116 @@
+"""Browser backend selection for Stagehand sessions.
+
+``BROWSER_BACKEND=BROWSERBASE`` (default) runs each session in a Browserbase
+cloud browser. ``LOCAL`` drives headless Chromium on this machine through
+Stagehand's local mode (Playwright). The tool interface stays the same
+(navigate/act/observe/extract), but page actions skip the round trip to a
+remote browser, there is no session-creation call, and Browserbase keys are
+not needed. It suits development and high-volume refresh runs against
+friendly sites.
+
+``LocalBrowserSlots`` caps local Chromium instances at
+``local_browser_pool_size``. It is a counting limit, not a pool of warm
+browsers: each session still launches its own Chromium after getting a slot,
+and gives the slot back on close. ``LOCAL_BROWSER_CDP_URL`` attaches to an
+already running Chromium instead of launching one.
+
+Usage:
+    config = StagehandConfig(model_name=..., **stagehand_config_kwargs())
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Dict, Optional
+
+from ..config.settings import settings
+from .telemetry import telemetry
+
+BROWSERBASE_BACKEND = "BROWSERBASE"
+LOCAL_BACKEND = "LOCAL"
+
+# Flags for headless Chromium in containers and CI
+LOCAL_CHROMIUM_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--no-first-run",
+    "--no-default-browser-check",
+]
+
+
+def backend() -> str:
+    """The configured backend, BROWSERBASE or LOCAL."""
+    return (settings.browser_backend or BROWSERBASE_BACKEND).upper()
+
+
+def is_local() -> bool:
+    return backend() == LOCAL_BACKEND
+
+
+def stagehand_config_kwargs() -> Dict[str, Any]:
+    """Backend-specific ``StagehandConfig`` arguments."""
+    if is_local():
+        launch_options: Dict[str, Any] = {
+            "headless": settings.stagehand_headless,
+            "args": LOCAL_CHROMIUM_ARGS,
+        }
+        if settings.local_browser_cdp_url:
+            launch_options["cdp_url"] = settings.local_browser_cdp_url
+        return {"env": LOCAL_BACKEND, "local_browser_launch_options": launch_options}
+
+    if not settings.browserbase_api_key or not settings.browserbase_project_id:
+        raise ValueError(
+            "Browserbase API key and project ID are required. Set BROWSERBASE_API_KEY and "
+            "BROWSERBASE_PROJECT_ID environment variables, or BROWSER_BACKEND=LOCAL."
+        )
+    return {
+        "env": BROWSERBASE_BACKEND,
+        "api_key": settings.browserbase_api_key,
+        "project_id": settings.browserbase_project_id,
+    }
+
+
+class LocalBrowserSlots:
+    """Bounds how many local Chromium instances run at once across threads."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait (without blocking the event loop) for a free browser slot."""
+        if self._slots.acquire(blocking=False):
+            return True
+        telemetry.incr("browser_slots.waits")
+        wait = timeout if timeout is not None else -1
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._slots.acquire, True, wait))
+        try:
+            return await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The waiting thread may still get the slot; nobody will release it then
+            acquiring.add_done_callback(self._release_if_acquired)
+            raise
+
+    def _release_if_acquired(self, acquiring: "asyncio.Future[bool]") -> None:
+        if not acquiring.cancelled() and acquiring.exception() is None and acquiring.result():
+            self.release()
+
+    def release(self) -> None:
+        try:
+            self._slots.release()
+        except ValueError:
+            pass
+
+
+_slots: Optional[LocalBrowserSlots] = None
+_slots_lock = threading.Lock()
+
+
+def get_local_browser_slots() -> LocalBrowserSlots:
+    """Return the process-wide local browser slots."""
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = LocalBrowserSlots(settings.local_browser_pool_size)
+        return _slots
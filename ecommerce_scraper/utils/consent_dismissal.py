@@ -0,0 +1,146 @@
+"""Rule-based dismissal of cookie-consent banners and known retailer overlays.
+
+Consent management platforms render the same buttons on every site that uses
+them, so they can be dismissed by selector without an LLM. ``install`` adds one
+init script to the browser context: on every page it clicks the first visible
+accept button of a known platform (OneTrust, Cookiebot, Didomi, TrustArc,
+Quantcast, Usercentrics) or a retailer-specific overlay from
+``SiteConfig.selectors`` (``cookie_accept`` / ``popup_close``), and keeps
+watching DOM mutations for banners injected late.
+
+``dismiss`` runs the same sweep once on the current page and reports what was
+dismissed; ``blocking_overlay`` detects a modal or fixed overlay that is still
+covering the page, which callers escalate to the LLM (``act``).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, List, Optional, Tuple
+
+from ..config.sites import SITE_CONFIGS
+from .telemetry import telemetry
+
+# (platform, accept/close selector), most specific first
+CONSENT_RULES: List[Tuple[str, str]] = [
+    ("OneTrust", "#onetrust-accept-btn-handler"),
+    ("OneTrust", "#accept-recommended-btn-handler"),
+    ("Cookiebot", "#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll"),
+    ("Cookiebot", "#CybotCookiebotDialogBodyButtonAccept"),
+    ("Didomi", "#didomi-notice-agree-button"),
+    ("TrustArc", "#truste-consent-button"),
+    ("TrustArc", ".trustarc-agree-btn"),
+    ("Quantcast", "#qc-cmp2-ui button[mode='primary']"),
+    ("Quantcast", ".qc-cmp2-summary-buttons button[mode='primary']"),
+    ("Usercentrics", "[data-testid='uc-accept-all-button']"),
+]
+
+# Clicks the first visible match of each rule once; returns the rule names clicked
+_SWEEP_JS = """
+(rules) => {
+  const visible = el => {
+    const rect = el.getBoundingClientRect();
+    const style = getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+  };
+  const clicked = [];
+  for (const [name, selector] of rules) {
+    let el = null;
+    try { el = document.querySelector(selector); } catch (e) { continue; }
+    if (!el || el.__autoDismissed || !visible(el)) continue;
+    el.__autoDismissed = true;
+    el.click();
+    clicked.push(name);
+  }
+  window.__consentDismissed = (window.__consentDismissed || []).concat(clicked);
+  return clicked;
+}
+"""
+
+_TAKE_DISMISSED_JS = """
+() => {
+  const dismissed = window.__consentDismissed || [];
+  window.__consentDismissed = [];
+  return dismissed;
+}
+"""
+
+# Installed on every document: sweep on load, then on DOM mutations for 30s
+_INIT_TEMPLATE = """
+(() => {
+  if (window.__consentDismisser) return;
+  window.__consentDismisser = true;
+  const rules = %(rules)s;
+  const sweep = %(sweep)s;
+  let timer = null;
+  const start = () => {
+    sweep(rules);
+    const observer = new MutationObserver(() => {
+      clearTimeout(timer);
+      timer = setTimeout(() => sweep(rules), 50);
+    });
+    observer.observe(document.documentElement, { childList: true, subtree: true });
+    setTimeout(() => observer.disconnect(), 30000);
+  };
+  if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', start);
+  else start();
+})();
+"""
+
+# A visible modal dialog, or a fixed element covering a third of the viewport
+_OVERLAY_JS = """
+() => {
+  const area = innerWidth * innerHeight;
+  const visible = el => {
+    const rect = el.getBoundingClientRect();
+    const style = getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none'
+      && style.opacity !== '0';
+  };
+  const describe = el => (el.innerText || el.getAttribute('aria-label') || el.tagName).replace(/\\s+/g, ' ').trim().slice(0, 120);
+  for (const el of document.querySelectorAll('dialog[open], [aria-modal="true"], [role="dialog"], [role="alertdialog"]')) {
+    if (visible(el)) return describe(el);
+  }
+  for (const el of document.body ? document.body.querySelectorAll('div, section, aside, iframe') : []) {
+    const style = getComputedStyle(el);
+    if (style.position !== 'fixed' || !visible(el)) continue;
+    const rect = el.getBoundingClientRect();
+    if ((rect.width * rect.height) / area >= 0.33 && parseInt(style.zIndex || '0', 10) > 0) return describe(el);
+  }
+  return null;
+}
+"""
+
+
+def consent_rules() -> List[Tuple[str, str]]:
+    """Platform rules plus retailer overlay selectors from the site configs."""
+    rules = list(CONSENT_RULES)
+    for config in SITE_CONFIGS.values():
+        for key in ("cookie_accept", "popup_close"):
+            selector = (config.selectors or {}).get(key)
+            if selector:
+                rules.append((config.name, selector))
+    return rules
+
+
+def init_script() -> str:
+    return _INIT_TEMPLATE % {"rules": json.dumps(consent_rules()), "sweep": _SWEEP_JS.strip()}
+
+
+async def install(context: Any) -> None:
+    """Auto-dismiss known banners on every page opened in ``context``."""
+    await context.add_init_script(script=init_script())
+
+
+async def dismiss(page: Any) -> List[str]:
+    """Sweep the current page once; names of everything dismissed since the last call."""
+    await page.evaluate(_SWEEP_JS, consent_rules())
+    dismissed = await page.evaluate(_TAKE_DISMISSED_JS) or []
+    for name in dismissed:
+        telemetry.incr(f"consent.dismissed.{name}")
+    return list(dict.fromkeys(dismissed))
+
+
+async def blocking_overlay(page: Any) -> Optional[str]:
+    """Text of a modal/overlay still covering the page, or None."""
+    return await page.evaluate(_OVERLAY_JS)
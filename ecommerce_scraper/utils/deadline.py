@@ -0,0 +1,180 @@
+"""Deadline budgets for bounding the latency of a product search.
+
+A single ``Deadline`` is created per query and split into child deadlines for
+each flow step. The active deadline travels in a context variable, so tools
+deep in the call stack (Stagehand page operations, Perplexity HTTP calls,
+agent LLM calls) can cap their own timeouts without every signature having to
+carry the budget.
+
+Usage:
+  deadline = Deadline(300, label="query")
+  step = deadline.child(60, label="research")
+  result = run_with_deadline(crew.kickoff, step)
+
+  # inside a tool
+  timeout = cap_timeout(30, "perplexity request")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+
+# Seconds a cancelled call gets to notice and stop before it is reported as abandoned
+ABANDON_GRACE_SECONDS = 2.0
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an operation runs past its deadline budget.
+
+    ``worker`` is set by ``run_with_deadline`` when the abandoned call is still
+    running; state it shares (browser page, tool caches) must not be reused
+    until that thread exits.
+    """
+
+    def __init__(self, *args: Any, worker: Optional[threading.Thread] = None):
+        super().__init__(*args)
+        self.worker = worker
+
+
+class Deadline:
+    """A monotonic time budget that can be split into child budgets and cancelled.
+
+    Child deadlines never outlive their parent, and cancelling (or expiring) a
+    parent expires all of its children.
+    """
+
+    def __init__(self, seconds: float, label: str = "query", parent: Optional["Deadline"] = None):
+        self.label = label
+        self.budget = max(0.0, float(seconds))
+        self.parent = parent
+        self._expires_at = time.monotonic() + self.budget
+        if parent is not None:
+            self._expires_at = min(self._expires_at, parent._expires_at)
+        self._cancelled = threading.Event()
+
+    def child(self, seconds: float, label: str) -> "Deadline":
+        """Create a child deadline capped by this deadline's remaining time."""
+        return Deadline(seconds, label=label, parent=self)
+
+    def remaining(self) -> float:
+        """Seconds left before expiry (0.0 once expired or cancelled)."""
+        if self.cancelled:
+            return 0.0
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def cancelled(self) -> bool:
+        if self._cancelled.is_set():
+            return True
+        return self.parent.cancelled if self.parent is not None else False
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def cancel(self) -> None:
+        """Expire this deadline immediately; in-flight work aborts at its next check."""
+        self._cancelled.set()
+
+    def check(self, operation: str = "") -> None:
+        """Raise ``DeadlineExceeded`` if the budget is spent."""
+        if self.expired():
+            what = f" during {operation}" if operation else ""
+            raise DeadlineExceeded(f"Deadline '{self.label}' exceeded{what}")
+
+    def cap(self, timeout: Optional[float], operation: str = "") -> float:
+        """Return ``timeout`` capped to the remaining budget, raising if nothing is left."""
+        self.check(operation)
+        remaining = self.remaining()
+        if timeout is None:
+            return remaining
+        return min(float(timeout), remaining)
+
+    def __repr__(self) -> str:
+        return f"Deadline(label={self.label!r}, remaining={self.remaining():.1f}s)"
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "ecommerce_scraper_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline active in this context, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Make ``deadline`` the active deadline for the enclosed block."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def cap_timeout(timeout: Optional[float], operation: str = "") -> Optional[float]:
+    """Cap ``timeout`` (seconds) to the active deadline; unchanged when none is active."""
+    deadline = current_deadline()
+    if deadline is None:
+        return timeout
+    return deadline.cap(timeout, operation)
+
+
+def check_deadline(operation: str = "") -> None:
+    """Raise ``DeadlineExceeded`` if the active deadline (if any) is spent."""
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.check(operation)
+
+
+async def await_with_deadline(awaitable: Awaitable[Any], operation: str = "") -> Any:
+    """Await ``awaitable`` under the active deadline, cancelling it on expiry."""
+    timeout = cap_timeout(None, operation)
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=timeout)
+    except asyncio.TimeoutError as exc:
+        raise DeadlineExceeded(f"{operation or 'operation'} timed out after {timeout:.1f}s") from exc
+
+
+def run_with_deadline(fn: Callable[..., Any], deadline: Deadline, *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking callable under ``deadline`` and stop waiting once it expires.
+
+    The callable runs in a daemon thread with ``deadline`` as its active
+    deadline, so nested tools see the budget. On expiry the deadline is
+    cancelled (making in-flight tool calls fail fast at their next check) and
+    ``DeadlineExceeded`` is raised to the caller. A thread that has not stopped
+    within ``ABANDON_GRACE_SECONDS`` is attached as the exception's ``worker``.
+    """
+    deadline.check(getattr(fn, "__name__", "call"))
+    ctx = contextvars.copy_context()
+    outcome: dict = {}
+
+    def target() -> None:
+        try:
+            with deadline_scope(deadline):
+                outcome["result"] = fn(*args, **kwargs)
+        except BaseException as exc:  # noqa: BLE001 - re-raised in caller thread
+            outcome["error"] = exc
+
+    worker = threading.Thread(target=ctx.run, args=(target,), name=f"deadline-{deadline.label}", daemon=True)
+    worker.start()
+    worker.join(deadline.remaining())
+    if worker.is_alive():
+        deadline.cancel()
+        worker.join(ABANDON_GRACE_SECONDS)
+        raise DeadlineExceeded(
+            f"Deadline '{deadline.label}' exceeded after {deadline.budget:.1f}s",
+            worker=worker if worker.is_alive() else None,
+        )
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
@@ -0,0 +1,126 @@
+"""DOM pruning: scope LLM extraction to the product region of a page.
+
+Stagehand's extract sends the page's accessibility tree to the LLM, including
+headers, mega-menus, footers and recommendation carousels. ``product_region``
+finds the main product container and returns an XPath that ``page.extract``
+accepts as ``selector`` so only that subtree is sent. Candidates, in order:
+
+1. a ``product_container`` hint in ``SiteConfig.selectors``;
+2. a schema.org Product microdata element;
+3. the common ancestor of the title and price elements (``SiteConfig.selectors``
+   ``product_title`` / ``price_current``, else the first ``h1`` and the first
+   price-like text after it), widened while it holds a small share of the page
+   text (text density), so images and descriptions next to the buy box stay in;
+4. the ``main`` landmark.
+
+Sizes are approximate token counts (visible text length / 4), reported to
+telemetry as ``dom_pruning.tokens_before`` / ``dom_pruning.tokens_after``.
+
+Only single-product extracts are pruned: list extracts and search results
+pages hold their products in many places and see the whole page.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from ..config.sites import get_site_config
+from .telemetry import telemetry
+
+# Characters of visible text per token (rough, model independent)
+CHARS_PER_TOKEN = 4
+
+_REGION_JS = """
+(hints) => {
+  const body = document.body;
+  if (!body) return null;
+  const textLen = el => (el.innerText || '').length;
+  const total = textLen(body);
+  const query = sel => { try { return sel ? document.querySelector(sel) : null; } catch (e) { return null; } };
+  const xpath = el => {
+    const parts = [];
+    for (let node = el; node && node.nodeType === 1; node = node.parentElement) {
+      let index = 1;
+      for (let sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+        if (sib.tagName === node.tagName) index++;
+      }
+      parts.unshift(node.tagName.toLowerCase() + '[' + index + ']');
+    }
+    return '/' + parts.join('/');
+  };
+  const commonAncestor = (a, b) => {
+    const seen = new Set();
+    for (let n = a; n; n = n.parentElement) seen.add(n);
+    for (let n = b; n; n = n.parentElement) if (seen.has(n)) return n;
+    return null;
+  };
+  const firstPriceAfter = start => {
+    const walker = document.createTreeWalker(body, NodeFilter.SHOW_TEXT);
+    let passed = !start;
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+      if (!passed) { if (start.contains(node)) passed = true; else continue; }
+      if (/[£$€]\\s?\\d/.test(node.nodeValue || '')) return node.parentElement;
+    }
+    return null;
+  };
+  const widen = el => {
+    // Grow while the parent still holds a small share of the page text
+    while (el.parentElement && el.parentElement !== body && textLen(el.parentElement) <= total * hints.max_share) {
+      el = el.parentElement;
+    }
+    return el;
+  };
+  const result = (el, source) => {
+    if (!el || el === body || el === document.documentElement) return null;
+    const size = textLen(el);
+    if (size < hints.min_chars || size > total * hints.max_share) return null;
+    return { selector: 'xpath=' + xpath(el), source, before: total, after: size };
+  };
+
+  let found = result(query(hints.container), 'site_container')
+    || result(document.querySelector('[itemtype*="schema.org/Product" i]'), 'microdata');
+  if (!found) {
+    const title = query(hints.title) || document.querySelector('h1');
+    const price = query(hints.price) || firstPriceAfter(title);
+    const anchor = title && price ? commonAncestor(title, price) : null;
+    if (anchor && anchor !== body) found = result(widen(anchor), 'title_price');
+  }
+  return found || result(document.querySelector('main, [role="main"]'), 'landmark') || { before: total };
+}
+"""
+
+
+def approx_tokens(chars: int) -> int:
+    return int(chars or 0) // CHARS_PER_TOKEN
+
+
+async def product_region(page: Any, min_tokens: int = 1500, max_share: float = 0.6) -> Optional[Dict[str, Any]]:
+    """XPath selector of the page's product region, or None to extract the whole page.
+
+    Pages under ``min_tokens`` are not worth pruning; regions holding more than
+    ``max_share`` of the page text are not a meaningful cut.
+    """
+    selectors = get_site_config(page.url or "").selectors or {}
+    hints = {
+        "container": selectors.get("product_container"),
+        "title": selectors.get("product_title"),
+        "price": selectors.get("price_current"),
+        "min_chars": 40,
+        "max_share": max_share,
+    }
+    region = await page.evaluate(_REGION_JS, hints)
+    if not region:
+        return None
+    before = approx_tokens(region.get("before"))
+    if before < min_tokens or not region.get("selector"):
+        telemetry.incr("dom_pruning.skipped")
+        telemetry.incr("dom_pruning.tokens_before", before)
+        telemetry.incr("dom_pruning.tokens_after", before)
+        return None
+    after = approx_tokens(region.get("after"))
+    telemetry.incr("dom_pruning.scoped")
+    telemetry.incr(f"dom_pruning.source.{region.get('source')}")
+    telemetry.incr("dom_pruning.tokens_before", before)
+    telemetry.incr("dom_pruning.tokens_after", after)
+    telemetry.observe("dom_pruning.kept_ratio", after / before if before else 1.0)
+    return {"selector": region["selector"], "source": region.get("source"), "tokens_before": before, "tokens_after": after}
@@ -0,0 +1,366 @@
+"""Tiered fetching: plain HTTP, then Scrappey, then the Stagehand agent.
+
+Most retailer product pages are server-rendered and carry their name and price
+in the initial HTML (JSON-LD, microdata or stable markup), so a browser session
+driven by an LLM agent is often unnecessary. ``fetch_products`` tries the
+cheap tiers in order:
+
+1. ``http``: a plain GET through a shared keep-alive session with compression;
+2. ``scrappey``: Scrappey's rendered HTML for anti-bot protected sites;
+3. ``browser``: nothing is fetched here; the caller hands the retailer to the
+   Stagehand extraction agent.
+
+Before the ladder, a learned internal product API for the page (see
+``utils.product_apis``) answers with a single JSON request when available.
+
+Products are parsed from the HTML without an LLM (``parse_products``); pages
+that yielded products or whose URL looks like a product page are kept in the
+snapshot archive (``utils.snapshot_archive``) for re-extraction. The
+cheapest tier that produced products is remembered per domain and URL
+template in ``fetch_tiers.json``, so later runs start there instead of
+re-trying tiers known to fail. Templates escalated past ``http`` are re-probed
+from the bottom after ``fetch_tier_reprobe_hours``; callers escalate a
+template whose tier produced products that failed validation.
+
+Usage:
+    tier, products = fetch_products(url)
+    if tier == BROWSER:
+        ...  # run the extraction agent
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from ..config.settings import settings
+from ..config.sites import SiteType, get_site_config
+from .deadline import cap_timeout
+from .json_store import JsonStore
+from .page_fingerprint import is_search_results, url_template
+from .resilience import CircuitOpenError
+from .retailer_health import parse_price
+from .selector_induction import get_selector_recipes
+from .telemetry import telemetry
+from .url_utils import extract_domain
+
+API = "api"
+HTTP = "http"
+SCRAPPEY = "scrappey"
+BROWSER = "browser"
+TIERS = (HTTP, SCRAPPEY, BROWSER)
+
+MAX_PRODUCTS = 20
+
+_ENCODINGS = "gzip, deflate" + (
+    ", br" if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi") else ""
+)
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-GB,en;q=0.9",
+    "Accept-Encoding": _ENCODINGS,
+}
+
+CURRENCY_SYMBOLS = {"GBP": "£", "USD": "$", "EUR": "€"}
+
+
+# --- HTML parsing ---
+def walk_json_ld(node: Any) -> Iterator[Dict[str, Any]]:
+    """Every JSON-LD object, descending into graphs, item lists and main entities."""
+    if isinstance(node, list):
+        for item in node:
+            yield from walk_json_ld(item)
+    elif isinstance(node, dict):
+        yield node
+        for key in ("@graph", "itemListElement", "item", "mainEntity"):
+            if key in node:
+                yield from walk_json_ld(node[key])
+
+
+def _is_product(node: Dict[str, Any]) -> bool:
+    types = node.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return any(str(t).lower() in ("product", "productgroup") for t in types)
+
+
+def format_price(value: Any, currency: Optional[str]) -> Optional[str]:
+    """Display price such as ``"£12.99"`` (GBP when no currency is given); None when unparseable."""
+    amount = parse_price(value)
+    if amount is None:
+        return None
+    symbol = CURRENCY_SYMBOLS.get((currency or "GBP").upper())
+    return f"{symbol}{amount:.2f}" if symbol else f"{amount:.2f} {currency}"
+
+
+def offer_price(offers: Any) -> Optional[str]:
+    """Display price of the first priced offer."""
+    for offer in offers if isinstance(offers, list) else [offers]:
+        if not isinstance(offer, dict):
+            continue
+        spec = offer.get("priceSpecification")
+        spec = spec[0] if isinstance(spec, list) and spec else spec
+        value = offer.get("price") or offer.get("lowPrice") or (spec or {}).get("price")
+        currency = offer.get("priceCurrency") or (spec or {}).get("priceCurrency")
+        price = format_price(value, currency)
+        if price:
+            return price
+    return None
+
+
+def as_product(name: Any, price: Optional[str], url: str) -> Optional[Dict[str, Any]]:
+    """Product record in the extraction format, or None unless name and price look real."""
+    name = " ".join(str(name or "").split())
+    if not price or not (3 <= len(name) <= 300):
+        return None
+    return {"name": name, "price": price, "url": url, "website": extract_domain(url)}
+
+
+def _json_ld_products(soup: Any, url: str) -> List[Dict[str, Any]]:
+    products = []
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or script.get_text() or "")
+        except ValueError:
+            continue
+        for node in walk_json_ld(data):
+            if not _is_product(node):
+                continue
+            product_url = node.get("url") if str(node.get("url", "")).startswith("http") else url
+            product = as_product(node.get("name"), offer_price(node.get("offers")), product_url)
+            if product:
+                products.append(product)
+    return products
+
+
+def _microdata_products(soup: Any, url: str) -> List[Dict[str, Any]]:
+    products = []
+    for scope in soup.select('[itemtype*="schema.org/Product"]'):
+        name_el = scope.select_one('[itemprop="name"]')
+        price_el = scope.select_one('[itemprop="price"], [itemprop="lowPrice"]')
+        currency_el = scope.select_one('[itemprop="priceCurrency"]')
+        if not (name_el and price_el):
+            continue
+        value = price_el.get("content") or price_el.get_text()
+        currency = currency_el.get("content") or currency_el.get_text() if currency_el else None
+        product = as_product(name_el.get("content") or name_el.get_text(), format_price(value, currency), url)
+        if product:
+            products.append(product)
+    return products
+
+
+def _selector_products(soup: Any, url: str) -> List[Dict[str, Any]]:
+    """Apply the learned selector recipe, else the SiteConfig selectors."""
+    recipe = get_selector_recipes().get(extract_domain(url), url_template(url)) or {}
+    selectors = recipe.get("selectors") or {}
+    if not selectors:
+        config = get_site_config(url)
+        if config.site_type == SiteType.GENERIC:
+            return []
+        selectors = {"name": config.selectors.get("product_title"), "price": config.selectors.get("price_current")}
+    if not (selectors.get("name") and selectors.get("price")):
+        return []
+    try:
+        name_el = soup.select_one(selectors["name"])
+        price_el = soup.select_one(selectors["price"])
+    except Exception:
+        return []
+    if not (name_el and price_el):
+        return []
+    product = as_product(
+        name_el.get("content") or name_el.get_text(),
+        format_price(price_el.get("content") or price_el.get_text(), None),
+        url,
+    )
+    return [product] if product else []
+
+
+def parse_products(html: str, url: str) -> List[Dict[str, Any]]:
+    """Products (name, price, url, website) found in static HTML, without an LLM."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for parser in (_json_ld_products, _microdata_products, _selector_products):
+        products = parser(soup, url)
+        if products:
+            unique = {(p["name"], p["price"], p["url"]): p for p in products}
+            return list(unique.values())[:MAX_PRODUCTS]
+    return []
+
+
+# --- Fetching ---
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def http_session() -> requests.Session:
+    """Shared session so repeat fetches to a retailer reuse its connection."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(HTTP_HEADERS)
+        return _session
+
+
+def fetch_http(url: str) -> str:
+    """HTML of ``url`` via a plain GET; '' for errors and non-HTML responses."""
+    timeout = cap_timeout(settings.fetch_http_timeout_seconds, "http fetch")
+    try:
+        response = http_session().get(url, timeout=timeout, allow_redirects=True)
+    except requests.exceptions.RequestException:
+        return ""
+    if response.status_code != 200 or "html" not in response.headers.get("Content-Type", ""):
+        return ""
+    return response.text
+
+
+def fetch_scrappey(url: str) -> str:
+    """Rendered HTML of ``url`` via Scrappey; '' when unavailable."""
+    from ..tools.scrappey_tool import ScrappeyTool
+
+    try:
+        return ScrappeyTool().fetch_html(url)
+    except (CircuitOpenError, requests.exceptions.RequestException, ValueError):
+        return ""
+
+
+def _product_like(url: str) -> bool:
+    """Whether ``url`` is a product page by its address (worth archiving even without parsed products)."""
+    from .sitemap_index import looks_like_product
+
+    return not is_search_results(url) and looks_like_product(url, get_site_config(url))
+
+
+def _archive(url: str, html: str, tier: str) -> None:
+    from .snapshot_archive import get_snapshot_archive
+
+    try:
+        get_snapshot_archive().put(url, html, source=tier)
+    except OSError:
+        telemetry.incr("snapshots.error")
+
+
+# --- Learned tiers ---
+class FetchTiers:
+    """Cheapest successful fetch tier per domain and URL template in ``fetch_tiers.json``.
+
+    Keyed by template so a search or category page that yields no products
+    does not send the domain's product pages to the browser.
+    """
+
+    def __init__(self, store: Optional[JsonStore] = None):
+        self._store = store or JsonStore("fetch_tiers.json")
+
+    def _entry(self, url: str) -> Dict[str, Any]:
+        templates = self._store.load().get(extract_domain(url)) or {}
+        entry = templates.get(url_template(url)) if isinstance(templates, dict) else None
+        return entry if isinstance(entry, dict) else {}
+
+    def tier(self, url: str) -> Optional[str]:
+        """The learned tier for ``url``'s template, or None."""
+        tier = self._entry(url).get("tier")
+        return tier if tier in TIERS else None
+
+    def start_tier(self, url: str) -> str:
+        """Where to start climbing: the learned tier, or ``http`` when unknown or due a re-probe."""
+        entry = self._entry(url)
+        tier = self.tier(url)
+        if tier is None:
+            return HTTP
+        if tier != HTTP and entry.get("updated_at", 0) + settings.fetch_tier_reprobe_hours * 3600 <= time.time():
+            telemetry.incr("fetch_ladder.reprobe")
+            return HTTP
+        return tier
+
+    def record(self, url: str, tier: str) -> None:
+        domain = extract_domain(url)
+        if not domain:
+            return
+        with self._store.transaction() as data:
+            templates = data.get(domain)
+            # Entries from before per-template keys hold the tier directly
+            if not isinstance(templates, dict) or "tier" in templates:
+                templates = data[domain] = {}
+            templates[url_template(url)] = {"tier": tier, "updated_at": time.time()}
+
+    def escalate(self, url: str, tier: str) -> None:
+        """``tier`` produced bad data for ``url``'s template; start above it next time."""
+        if tier in TIERS and tier != BROWSER:
+            self.record(url, TIERS[TIERS.index(tier) + 1])
+
+
+def demote(url: str, tier: str) -> None:
+    """Products from ``tier`` failed validation: drop the API template or escalate the URL template."""
+    if tier == API:
+        from .product_apis import get_product_apis
+
+        get_product_apis().invalidate(url)
+    else:
+        get_fetch_tiers().escalate(url, tier)
+
+
+def fetch_products(url: str, probe: bool = False) -> Tuple[str, List[Dict[str, Any]]]:
+    """Try the learned product API, then climb the ladder from the URL template's learned tier.
+
+    ``probe`` starts from plain HTTP whatever was learned, for URLs that just
+    proved reachable without a browser (a site-search match).
+
+    Returns (tier, products); tier is ``browser`` with no products when only the
+    Stagehand agent can handle the page.
+    """
+    if settings.enable_product_api_discovery:
+        from .product_apis import get_product_apis
+
+        started = time.monotonic()
+        products = get_product_apis().fetch(url)
+        if products:
+            telemetry.observe("fetch_ladder.api.latency_s", time.monotonic() - started)
+            return API, products
+
+    tiers = get_fetch_tiers()
+    learned = tiers.tier(url)
+    start = HTTP if probe else tiers.start_tier(url)
+    # Only a climb that started below the learned tier (first visit, re-probe) updates it
+    probing = start != learned
+    for tier in TIERS[TIERS.index(start):]:
+        if tier == BROWSER:
+            break
+        if tier == SCRAPPEY and not settings.scrappey_api_key:
+            continue
+        started = time.monotonic()
+        html = fetch_http(url) if tier == HTTP else fetch_scrappey(url)
+        # Bot walls and JS shells parse to no products and fall through
+        products = parse_products(html, url) if html else []
+        if html and settings.enable_snapshot_archive and (products or _product_like(url)):
+            _archive(url, html, tier)
+        telemetry.observe(f"fetch_ladder.{tier}.latency_s", time.monotonic() - started)
+        if products:
+            telemetry.incr(f"fetch_ladder.{tier}.hit")
+            if probing or tier != learned:
+                tiers.record(url, tier)
+            return tier, products
+        telemetry.incr(f"fetch_ladder.{tier}.miss")
+    telemetry.incr("fetch_ladder.browser")
+    if probing or learned != BROWSER:
+        tiers.record(url, BROWSER)
+    return BROWSER, []
+
+
+_fetch_tiers: Optional[FetchTiers] = None
+
+
+def get_fetch_tiers() -> FetchTiers:
+    """Return the process-wide fetch tier store."""
+    global _fetch_tiers
+    if _fetch_tiers is None:
+        _fetch_tiers = FetchTiers()
+    return _fetch_tiers
@@ -0,0 +1,174 @@
+"""Request hedging for long-tail Perplexity and agent LLM latency.
+
+A ``Hedger`` tracks the latency of successful calls to one dependency. Once it
+has enough samples, a call that is still running after the observed p95 gets a
+duplicate request and the first successful response wins. Hedging is opt-in
+(``ENABLE_REQUEST_HEDGING``) and capped at ``HEDGE_MAX_RATE`` hedges per call
+so a slow provider is not hit with double traffic.
+
+Metrics (see ``utils.telemetry``):
+  hedge.<name>.calls         calls made through the hedger
+  hedge.<name>.hedged        duplicates fired
+  hedge.<name>.hedge_won     hedges that answered before the primary
+  hedge.<name>.rate_limited  hedges skipped because of the rate cap
+  latency.<name>             successful call latency (seconds)
+
+Callers whose failures come back as values (HTTP responses with a 429 or 5xx
+status) pass ``accept``; rejected results are neither latency samples nor
+hedge winners.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ..config.settings import settings
+from .telemetry import percentile, telemetry
+
+# Shared pool for primaries and hedges; sized for a handful of concurrent calls
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+class Hedger:
+    """Fire a duplicate request after the observed latency quantile; first response wins."""
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = False,
+        quantile: float = 0.95,
+        max_hedge_rate: float = 0.1,
+        min_samples: int = 10,
+        min_delay_s: float = 0.5,
+        window: int = 200,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.quantile = quantile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.min_delay_s = min_delay_s
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._hedges = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while too few samples exist."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            delay = percentile(self._latencies, self.quantile)
+        return max(self.min_delay_s, delay or 0.0)
+
+    def _record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+        telemetry.observe(f"latency.{self.name}", seconds)
+
+    def _try_reserve_hedge(self) -> bool:
+        with self._lock:
+            if (self._hedges + 1) > self.max_hedge_rate * max(self._calls, 1):
+                return False
+            self._hedges += 1
+            return True
+
+    def _submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        # Each attempt gets its own copy of the caller's context (deadline, etc.)
+        ctx = contextvars.copy_context()
+        return _executor.submit(ctx.run, fn, *args, **kwargs)
+
+    def call(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        accept: Optional[Callable[[Any], bool]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Call ``fn(*args, **kwargs)``, hedging it when it runs past the latency quantile.
+
+        ``accept`` tells successful results from failures returned as values
+        (default: every result counts as a success).
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        accepted = accept or (lambda result: True)
+
+        with self._lock:
+            self._calls += 1
+        telemetry.incr(f"hedge.{self.name}.calls")
+
+        started = time.monotonic()
+        delay = self.hedge_delay()
+        if delay is None:
+            result = fn(*args, **kwargs)
+            if accepted(result):
+                self._record_latency(time.monotonic() - started)
+            return result
+
+        primary = self._submit(fn, *args, **kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._try_reserve_hedge():
+            if not done:
+                telemetry.incr(f"hedge.{self.name}.rate_limited")
+            result = primary.result()
+            if accepted(result):
+                self._record_latency(time.monotonic() - started)
+            return result
+
+        telemetry.incr(f"hedge.{self.name}.hedged")
+        hedge = self._submit(fn, *args, **kwargs)
+        pending = {primary, hedge}
+        first_error: Optional[BaseException] = None
+        rejected: Optional[Future] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    first_error = first_error or error
+                    continue
+                if not accepted(future.result()):
+                    # Wait for the other attempt; hand this result back if it fails too
+                    rejected = rejected or future
+                    continue
+                if future is hedge:
+                    telemetry.incr(f"hedge.{self.name}.hedge_won")
+                self._record_latency(time.monotonic() - started)
+                # The losing attempt keeps running in the background; its result is discarded
+                return future.result()
+        if rejected is not None:
+            return rejected.result()
+        raise first_error  # both attempts failed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "hedges": self._hedges,
+                "samples": len(self._latencies),
+            }
+
+
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(name: str) -> Hedger:
+    """Return the process-wide hedger for a dependency (e.g. 'perplexity', 'llm')."""
+    with _hedgers_lock:
+        hedger = _hedgers.get(name)
+        if hedger is None:
+            hedger = _hedgers[name] = Hedger(
+                name,
+                enabled=settings.enable_request_hedging,
+                quantile=settings.hedge_quantile,
+                max_hedge_rate=settings.hedge_max_rate,
+                min_samples=settings.hedge_min_samples,
+            )
+        return hedger
@@ -0,0 +1,71 @@
+"""Small JSON documents persisted across runs under ``settings.cache_dir``.
+
+Used by the cross-run stores (retailer health, negative cache, ...). Writes are
+atomic (temp file + rename) so an interrupted run never leaves a truncated
+file, and a corrupt or missing file simply loads as an empty document.
+
+Usage:
+  store = JsonStore("retailer_health.json")
+  with store.transaction() as data:
+      data.setdefault("argos.co.uk", {})["attempts"] = 3
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from ..ai_logging.error_logger import get_error_logger
+from ..config.settings import settings
+
+
+class JsonStore:
+    """A JSON object on disk with an in-memory copy and atomic saves."""
+
+    def __init__(self, filename: str, directory: Optional[str] = None):
+        self.path = Path(directory or settings.cache_dir) / filename
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._error_logger = get_error_logger("json_store")
+
+    def _read(self) -> Dict[str, Any]:
+        if self._data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                self._data = loaded if isinstance(loaded, dict) else {}
+            except FileNotFoundError:
+                self._data = {}
+            except (OSError, ValueError) as e:
+                self._error_logger.error(f"Ignoring unreadable store {self.path}: {e}")
+                self._data = {}
+        return self._data
+
+    def _write(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, separators=(",", ":"), default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # Persistence is best effort; the in-memory copy stays authoritative
+            self._error_logger.error(f"Failed to save store {self.path}: {e}")
+
+    def load(self) -> Dict[str, Any]:
+        """Return a shallow copy of the stored document."""
+        with self._lock:
+            return dict(self._read())
+
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, Any]]:
+        """Yield the live document for mutation and save it afterwards."""
+        with self._lock:
+            data = self._read()
+            yield data
+            self._write()
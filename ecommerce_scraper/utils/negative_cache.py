@@ -0,0 +1,129 @@
+"""Cross-run negative cache of dead URLs and unusable domains.
+
+Records URLs that turned out to be 404s / soft-404s and domains that blocked
+us or are price comparison sites, each with a TTL. The flow consults it before
+extraction and the Perplexity research prompt lists the active entries as
+exclusions, so dead links are not rediscovered (and re-paid for) every run.
+
+Usage:
+  cache = get_negative_cache()
+  cache.add_url("https://shop.example/p/1", "soft_404")
+  cache.add_domain("pricerunner.com", "comparison_site")
+  cache.lookup("https://www.pricerunner.com/x")   # -> "comparison_site"
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional
+
+from ..config.settings import settings
+from .json_store import JsonStore
+from .url_utils import extract_domain, normalize_url
+
+SOFT_404 = "soft_404"
+BLOCKED = "blocked"
+COMPARISON_SITE = "comparison_site"
+EXCLUDED = "excluded"
+
+# Price comparison / aggregator domains the validation agent always rejects
+COMPARISON_SITE_DOMAINS = {
+    "pricerunner.com",
+    "pricerunner.co.uk",
+    "pricespy.co.uk",
+    "idealo.co.uk",
+    "kelkoo.co.uk",
+    "shopping.com",
+    "google.com",
+    "google.co.uk",
+    "pricehunter.co.uk",
+    "camelcamelcamel.com",
+}
+
+
+def canonical_url(url: str) -> str:
+    """Canonical cache key for a URL: no tracking params, fragment or trailing slash."""
+    try:
+        normalized = normalize_url(url.strip())
+    except ValueError:
+        return url.strip()
+    return normalized.split("#", 1)[0].rstrip("/")
+
+
+def is_comparison_site(domain: str) -> bool:
+    return any(domain == d or domain.endswith("." + d) for d in COMPARISON_SITE_DOMAINS)
+
+
+class NegativeCache:
+    """TTL entries for URLs and domains persisted in ``negative_cache.json``."""
+
+    def __init__(self, store: Optional[JsonStore] = None):
+        self._store = store or JsonStore("negative_cache.json")
+
+    def _ttl_for(self, reason: str) -> float:
+        if reason == BLOCKED:
+            return settings.negative_cache_blocked_ttl_hours * 3600
+        return settings.negative_cache_ttl_hours * 3600
+
+    def _add(self, section: str, key: str, reason: str) -> None:
+        if not key:
+            return
+        now = time.time()
+        with self._store.transaction() as data:
+            entries = data.setdefault(section, {})
+            # Drop expired entries while we are writing anyway
+            for stale in [k for k, v in entries.items() if v.get("expires_at", 0) <= now]:
+                del entries[stale]
+            entries[key] = {"reason": reason, "expires_at": now + self._ttl_for(reason)}
+
+    def add_url(self, url: str, reason: str) -> None:
+        self._add("urls", canonical_url(url), reason)
+
+    def add_domain(self, domain: str, reason: str) -> None:
+        self._add("domains", domain.lower().removeprefix("www."), reason)
+
+    def _active(self, section: str) -> Dict[str, str]:
+        now = time.time()
+        entries = self._store.load().get(section) or {}
+        return {k: v.get("reason", "") for k, v in entries.items() if v.get("expires_at", 0) > now}
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Reason the URL (or its domain) is excluded, or None."""
+        domain = extract_domain(url)
+        if domain and is_comparison_site(domain):
+            return COMPARISON_SITE
+        domains = self._active("domains")
+        if domain and domain in domains:
+            return domains[domain]
+        return self._active("urls").get(canonical_url(url))
+
+    def excluded_domains(self) -> List[str]:
+        return sorted(self._active("domains"))
+
+    def excluded_urls(self) -> List[str]:
+        return sorted(self._active("urls"))
+
+    def exclusion_prompt(self, limit: int = 30) -> str:
+        """Prompt fragment listing known-bad domains and URLs; empty when none."""
+        domains = self.excluded_domains()[:limit]
+        urls = self.excluded_urls()[:limit]
+        if not domains and not urls:
+            return ""
+        lines = ["DO NOT return any of the following (known dead, blocked or comparison pages):"]
+        if domains:
+            lines.append("Excluded domains: " + ", ".join(domains))
+        if urls:
+            lines.append("Excluded URLs:")
+            lines.extend(f"- {u}" for u in urls)
+        return "\n".join(lines)
+
+
+_cache: Optional[NegativeCache] = None
+
+
+def get_negative_cache() -> NegativeCache:
+    """Return the process-wide negative cache."""
+    global _cache
+    if _cache is None:
+        _cache = NegativeCache()
+    return _cache
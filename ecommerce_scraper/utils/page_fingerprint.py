@@ -0,0 +1,88 @@
+"""Page-template fingerprints for reusing per-page knowledge.
+
+Two product pages on the same retailer usually share a template: the same URL
+shape and the same top-level DOM skeleton. ``page_fingerprint`` hashes both so
+caches (resolved action selectors, learned extraction selectors, ...) can be
+keyed by template rather than by exact URL, and invalidated when a retailer
+ships a redesign.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any, Iterable
+from urllib.parse import parse_qs, urlparse
+
+# Search result paths and query parameters used by common retailers
+# (/search/..., /s?k=, /sch/i.html?_nkw=, /CatalogSearch?keyword=, ...)
+_SEARCH_PATH_RE = re.compile(r"/(search|s|sch|catalogsearch)(/|\.|$)", re.I)
+_SEARCH_PARAMS = {"q", "query", "k", "keyword", "search", "searchterm", "text", "w", "_nkw"}
+
+# Top three levels of <body>, tag + id with digits stripped (ids like
+# "react-12" change per render). Scripts and styles are ignored.
+_SKELETON_JS = """
+() => {
+  const skip = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'LINK', 'META', 'TEMPLATE']);
+  const parts = [];
+  const walk = (el, depth) => {
+    if (!el || depth > 2) return;
+    for (const child of el.children) {
+      if (parts.length >= 300) return;
+      if (skip.has(child.tagName)) continue;
+      const id = child.id ? '#' + child.id.replace(/\\d+/g, '') : '';
+      parts.push(depth + child.tagName + id);
+      walk(child, depth + 1);
+    }
+  };
+  walk(document.body, 0);
+  return parts.join('|');
+}
+"""
+
+
+def url_template(url: str) -> str:
+    """Host, first path section and path depth, e.g. ``argos.co.uk/product/*``.
+
+    Later segments are product slugs or ids and are replaced by ``*``; the first
+    one is kept when it looks like a section name (no digits).
+    """
+    parsed = urlparse(url or "")
+    segments = [segment for segment in parsed.path.split("/") if segment]
+    template = ["*"] * len(segments)
+    if segments and not any(ch.isdigit() for ch in segments[0]):
+        template[0] = segments[0].lower()
+    return f"{(parsed.hostname or '').lower()}/{'/'.join(template)}"
+
+
+def is_search_results(url: str) -> bool:
+    """Whether ``url`` looks like a search results page rather than a single product."""
+    parsed = urlparse(url or "")
+    if _SEARCH_PATH_RE.search(parsed.path):
+        return True
+    return any(key.lower() in _SEARCH_PARAMS for key in parse_qs(parsed.query, keep_blank_values=True))
+
+
+async def dom_skeleton(page: Any) -> str:
+    """Structural skeleton of the page's top-level DOM."""
+    return await page.evaluate(_SKELETON_JS)
+
+
+async def page_fingerprint(page: Any) -> str:
+    """Short hash of the page's URL template and DOM skeleton."""
+    skeleton = await dom_skeleton(page)
+    digest = hashlib.sha1(f"{url_template(page.url)}\n{skeleton}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+async def selectors_resolve(page: Any, selectors: Iterable[str]) -> bool:
+    """True when every selector still matches at least one element."""
+    for selector in selectors:
+        if not selector:
+            return False
+        try:
+            if await page.locator(selector).count() == 0:
+                return False
+        except Exception:
+            return False
+    return True
@@ -1,6 +1,5 @@
 """Popup and banner handling utilities for ecommerce scraping."""
 
-import time
 import logging
 from typing import List, Dict, Any, Optional
 
@@ -207,68 +206,24 @@ def handle_common_popups(stagehand_tool, vendor: str = None) -> List[str]:
     """
     Handle common popups and prepare page for extraction.
 
-    This function:
-    1. Dismisses common popups (cookies, newsletter, age verification, etc.)
-    2. Verifies page accessibility
+    Known consent platforms and retailer overlays are dismissed by selector in
+    one injected script; the LLM is only asked to act when an unknown overlay
+    still blocks the page (see SimplifiedStagehandTool.dismiss_popups).
 
     Args:
-        stagehand_tool: Instance of EcommerceStagehandTool
+        stagehand_tool: Instance of SimplifiedStagehandTool
         vendor: Optional vendor name for specific handling
 
     Returns:
         List of actions taken
     """
     actions_taken = []
-    
+
     try:
-        # Wait for page to load
-        time.sleep(3)
-        
-        # Handle cookie consent (highest priority)
-        result = stagehand_tool._run(
-            operation="act",
-            action=PopupHandler.create_popup_dismissal_command("cookie")
-        )
-        if "completed" in result.lower():
-            actions_taken.append("Dismissed cookie consent")
-        
-        # Handle newsletter popup
-        result = stagehand_tool._run(
-            operation="act",
-            action=PopupHandler.create_popup_dismissal_command("newsletter")
-        )
-        if "completed" in result.lower():
-            actions_taken.append("Dismissed newsletter popup")
-        
-        # Handle age verification
-        result = stagehand_tool._run(
-            operation="act",
-            action=PopupHandler.create_popup_dismissal_command("age")
-        )
-        if "completed" in result.lower():
-            actions_taken.append("Handled age verification")
-        
-        # Handle location selection
-        result = stagehand_tool._run(
-            operation="act",
-            action=PopupHandler.create_popup_dismissal_command("location")
-        )
-        if "completed" in result.lower():
-            actions_taken.append("Selected location/country")
-        
-        # Handle promotional banners
-        result = stagehand_tool._run(
-            operation="act",
-            action=PopupHandler.create_popup_dismissal_command("promotion")
-        )
-        if "completed" in result.lower():
-            actions_taken.append("Dismissed promotional banner")
-        
-        # Verify content is accessible
-        verification = stagehand_tool._run(
-            operation="observe",
-            instruction=PopupHandler.get_verification_command()
-        )
+        result = stagehand_tool._run(operation="dismiss_popups")
+        if result.startswith("Error"):
+            raise Exception(result)
+        actions_taken.extend(line for line in result.splitlines() if line.startswith("Dismissed"))
 
     # Info logging removed; rely on error logging only
 
@@ -0,0 +1,335 @@
+"""Discovery and direct use of retailers' internal product/price JSON APIs.
+
+Many retailers render the price from an XHR/fetch call to an internal product
+endpoint. While a Stagehand page is open, ``capture_json_responses`` keeps the
+JSON bodies of its GET XHR/fetch responses. After an extraction,
+``ProductApis.learn`` looks in them for a payload holding the extracted name
+and, in the same object, a value equal to the extracted price (in pounds or
+pence) and stores a candidate:
+
+- the endpoint as a template: path segments and query values copied from the
+  page URL (product id, slug, SKU) become placeholders, so the template works
+  for every product page with the same URL template. An endpoint without
+  such a value only answers for the page it was learned on;
+- the JSON paths of the name and the price.
+
+A candidate is only trusted once it is confirmed by the next extraction
+on the same URL template: that page's own call to the templated endpoint must
+carry the newly extracted name and price at the same paths (for an
+endpoint without placeholders, a later extraction of the same page). A
+recommendations or "recently viewed" feed that happened to include the
+product fails that check and is replaced by a fresh candidate.
+
+``fetch`` later calls the endpoint over the shared keep-alive HTTP session and
+reads the product from those paths: one small JSON request instead of a page
+render plus an LLM extraction. Templates whose response no longer has the
+paths (or whose products fail validation) are invalidated.
+
+Usage:
+    products = get_product_apis().fetch(url)  # None without a usable template
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
+
+import requests
+
+from ..config.settings import settings
+from .deadline import cap_timeout
+from .fetch_ladder import as_product, format_price, http_session
+from .json_store import JsonStore
+from .negative_cache import canonical_url
+from .page_fingerprint import url_template
+from .retailer_health import parse_price
+from .telemetry import telemetry
+from .url_utils import extract_domain
+
+MAX_BODY_CHARS = 200_000
+CURRENCY_KEYS = ("currency", "currencyCode", "priceCurrency", "currency_code")
+_TOKEN_RE = re.compile(r"\W")
+
+Path = List[Any]
+
+
+# --- Capturing responses ---
+def capture_json_responses(page: Any, sink: List[Dict[str, str]]) -> None:
+    """Append ``{"url", "body"}`` of the page's JSON XHR/fetch GET responses to ``sink``."""
+
+    async def on_response(response: Any) -> None:
+        try:
+            request = response.request
+            if request.method != "GET" or request.resource_type not in ("xhr", "fetch"):
+                return
+            if response.status != 200 or "json" not in (response.headers.get("content-type") or ""):
+                return
+            if len(sink) >= settings.product_api_max_responses:
+                return
+            body = await response.text()
+            if len(body) <= MAX_BODY_CHARS:
+                sink.append({"url": response.url, "body": body})
+        except Exception:
+            pass
+
+    page.on("response", on_response)
+
+
+# --- Matching payloads to the extracted product ---
+def _walk(node: Any, path: Path) -> Iterator[Tuple[Path, Any]]:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _walk(value, path + [key])
+    elif isinstance(node, list):
+        for index, value in enumerate(node[:100]):
+            yield from _walk(value, path + [index])
+    else:
+        yield path, node
+
+
+def _resolve(node: Any, path: Path) -> Any:
+    for key in path:
+        if isinstance(node, dict) and key in node:
+            node = node[key]
+        elif isinstance(node, list) and isinstance(key, int) and key < len(node):
+            node = node[key]
+        else:
+            return None
+    return node
+
+
+def _norm(text: Any) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def _name_matches(value: Any, name: str) -> bool:
+    if not isinstance(value, str):
+        return False
+    value = _norm(value)
+    return value == name or (len(value) >= 8 and (value in name or name in value))
+
+
+def _price_scale(value: Any, price: float) -> Optional[float]:
+    """1 when ``value`` is the price, 0.01 when it is the price in pence."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    if isinstance(value, str) and len(value) > 20:
+        return None
+    amount = parse_price(value)
+    if amount is None:
+        return None
+    if abs(amount - price) < 0.005:
+        return 1.0
+    if isinstance(value, int) and value == round(price * 100):
+        return 0.01
+    return None
+
+
+def _match(payload: Any, name: str, price: float) -> Optional[Dict[str, Any]]:
+    """Name and price paths in one payload, the price closest to the name.
+
+    The price must sit in the object holding the name (directly or nested, e.g.
+    ``{"name", "price": {"value"}}``); a price elsewhere belongs to another product.
+    """
+    leaves = list(_walk(payload, []))
+    name_paths = [path for path, value in leaves if _name_matches(value, name)]
+    prices = [(path, scale) for path, value in leaves for scale in [_price_scale(value, price)] if scale]
+    best = None
+    for name_path in name_paths:
+        for price_path, scale in prices:
+            if price_path[: len(name_path) - 1] != name_path[:-1]:
+                continue
+            shared = 0
+            while shared < min(len(name_path), len(price_path)) and name_path[shared] == price_path[shared]:
+                shared += 1
+            distance = len(name_path) + len(price_path) - 2 * shared
+            if best is None or distance < best[0]:
+                best = (distance, name_path, price_path, scale)
+    if best is None:
+        return None
+    return {"name_path": best[1], "price_path": best[2], "price_scale": best[3]}
+
+
+# --- Endpoint templates ---
+def _url_tokens(url: str) -> Dict[str, str]:
+    """Page URL values that may identify the product: path segments and query values."""
+    parsed = urlparse(url)
+    tokens = {f"p{i}": segment for i, segment in enumerate(s for s in parsed.path.split("/") if s)}
+    for key, value in parse_qsl(parsed.query):
+        tokens[f"q_{_TOKEN_RE.sub('_', key)}"] = value
+    # Short or purely alphabetic values (sections, "p", "en-gb") are not identifiers
+    return {k: v for k, v in tokens.items() if (len(v) >= 4 and any(ch.isdigit() for ch in v)) or len(v) >= 12}
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def endpoint_template(api_url: str, page_url: str) -> Tuple[str, bool]:
+    """API URL with page-URL values replaced by placeholders; (template, parameterized)."""
+    by_value = {value: key for key, value in _url_tokens(page_url).items()}
+    parsed = urlparse(api_url)
+    found = False
+
+    segments = []
+    for segment in parsed.path.split("/"):
+        if segment in by_value:
+            segments.append("{%s}" % by_value[segment])
+            found = True
+        else:
+            segments.append(_escape(segment))
+    query = []
+    for key, value in parse_qsl(parsed.query, keep_blank_values=True):
+        if value in by_value:
+            query.append(f"{_escape(key)}={{{by_value[value]}}}")
+            found = True
+        else:
+            query.append(_escape(urlencode({key: value})))
+    template = urlunparse((parsed.scheme, _escape(parsed.netloc), "/".join(segments), "", "&".join(query), ""))
+    return template, found
+
+
+def _endpoint(entry: Dict[str, Any], url: str) -> Optional[str]:
+    """The entry's endpoint filled in for the page at ``url``; None when the URL lacks a value."""
+    try:
+        tokens = {k: quote(v, safe="") if k.startswith("q_") else v for k, v in _url_tokens(url).items()}
+        return entry["endpoint"].format_map(tokens)
+    except (KeyError, ValueError, IndexError):
+        return None
+
+
+class ProductApis:
+    """Learned product endpoints per domain and URL template in ``product_apis.json``."""
+
+    def __init__(self, store: Optional[JsonStore] = None):
+        self._store = store or JsonStore("product_apis.json")
+
+    def _entry(self, url: str) -> Optional[Dict[str, Any]]:
+        """Stored entry for the URL's template, confirmed or not."""
+        return (self._store.load().get(extract_domain(url)) or {}).get(url_template(url))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Confirmed endpoint usable for ``url``, or None."""
+        entry = self._entry(url)
+        if not entry or not entry.get("confirmed"):
+            return None
+        if entry.get("page") and entry["page"] != canonical_url(url):
+            return None
+        return entry
+
+    def _confirms(
+        self, entry: Dict[str, Any], page_url: str, responses: List[Dict[str, str]], name: str, price: float
+    ) -> bool:
+        """Whether this page's call to the candidate endpoint carries the product just extracted."""
+        page = canonical_url(page_url)
+        if entry.get("page"):
+            # Only answers for one page: confirm on a later visit of that page
+            if entry["page"] != page:
+                return False
+        elif entry.get("learned_on") == page:
+            return False
+        endpoint = _endpoint(entry, page_url)
+        if endpoint is None:
+            return False
+        for response in responses:
+            if canonical_url(response["url"]) != canonical_url(endpoint):
+                continue
+            try:
+                payload = json.loads(response["body"])
+            except ValueError:
+                continue
+            name_value = _resolve(payload, entry["name_path"])
+            price_value = _resolve(payload, entry["price_path"])
+            if _name_matches(name_value, name) and _price_scale(price_value, price) == entry["price_scale"]:
+                return True
+        return False
+
+    def invalidate(self, url: str) -> None:
+        domain = extract_domain(url)
+        with self._store.transaction() as data:
+            (data.get(domain) or {}).pop(url_template(url), None)
+
+    def learn(self, page_url: str, responses: List[Dict[str, str]], product: Dict[str, Any]) -> bool:
+        """Store (or confirm) the endpoint whose JSON carries ``product``'s name and price."""
+        name = _norm(product.get("name") or "")
+        price = parse_price(product.get("price"))
+        domain = extract_domain(page_url)
+        if len(name) < 3 or price is None or not domain or self.get(page_url):
+            return False
+        candidate = self._entry(page_url)
+        if candidate and not candidate.get("confirmed") and self._confirms(candidate, page_url, responses, name, price):
+            with self._store.transaction() as data:
+                entry = (data.get(domain) or {}).get(url_template(page_url))
+                if entry:
+                    entry["confirmed"] = True
+            telemetry.incr("product_api.confirmed")
+            return True
+        for response in responses:
+            try:
+                payload = json.loads(response["body"])
+            except ValueError:
+                continue
+            paths = _match(payload, name, price)
+            if paths is None:
+                continue
+            template, parameterized = endpoint_template(response["url"], page_url)
+            entry = {
+                "endpoint": template,
+                **paths,
+                "learned_on": canonical_url(page_url),
+                "learned_at": time.time(),
+                "confirmed": False,
+            }
+            if not parameterized:
+                entry["page"] = canonical_url(page_url)
+            with self._store.transaction() as data:
+                data.setdefault(domain, {})[url_template(page_url)] = entry
+            telemetry.incr("product_api.learned")
+            return True
+        return False
+
+    def fetch(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """The product at ``url`` via its learned endpoint; None without a usable template."""
+        entry = self.get(url)
+        if entry is None:
+            return None
+        endpoint = _endpoint(entry, url)
+        if endpoint is None:
+            return None
+        timeout = cap_timeout(settings.fetch_http_timeout_seconds, "product api")
+        try:
+            response = http_session().get(
+                endpoint, headers={"Accept": "application/json", "Referer": url}, timeout=timeout
+            )
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.exceptions.RequestException, ValueError):
+            telemetry.incr("product_api.error")
+            return None
+        name = _resolve(payload, entry["name_path"])
+        value = _resolve(payload, entry["price_path"])
+        amount = parse_price(value)
+        parent = _resolve(payload, entry["price_path"][:-1])
+        currency = next((parent[k] for k in CURRENCY_KEYS if isinstance(parent, dict) and isinstance(parent.get(k), str)), None)
+        product = as_product(name, format_price(amount * entry["price_scale"], currency) if amount else None, url)
+        if product is None:
+            # The payload changed shape; relearn on the next browser extraction
+            telemetry.incr("product_api.stale")
+            self.invalidate(url)
+            return None
+        telemetry.incr("product_api.hit")
+        return [product]
+
+
+_product_apis: Optional[ProductApis] = None
+
+
+def get_product_apis() -> ProductApis:
+    """Return the process-wide product API store."""
+    global _product_apis
+    if _product_apis is None:
+        _product_apis = ProductApis()
+    return _product_apis
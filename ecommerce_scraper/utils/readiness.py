@@ -0,0 +1,141 @@
+"""Adaptive page readiness: wait for product content, not a fixed time.
+
+After ``domcontentloaded`` a product page usually still renders its price and
+title from scripts. ``wait_until_ready`` returns as soon as either
+
+- the retailer's title and price selectors show text (a learned selector
+  recipe, else ``SiteConfig.selectors``), or
+- the network has gone quiet (Stagehand's settled-DOM heuristic, which ignores
+  stalled ad iframes; Playwright ``networkidle`` otherwise),
+
+and never waits longer than the domain's cap. ``ReadyTimes`` keeps recent
+ready times per domain; the cap is a multiple of their 90th percentile,
+clamped to ``readiness_min_wait_seconds``..``readiness_max_wait_seconds``, so
+fast sites stop paying a slow site's worst case. Domains without enough
+samples get the maximum.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import settings
+from ..config.sites import SiteType, get_site_config
+from .json_store import JsonStore
+from .page_fingerprint import url_template
+from .selector_induction import get_selector_recipes
+from .telemetry import percentile, telemetry
+from .url_utils import extract_domain
+
+# Samples kept per domain and needed before the cap adapts
+MAX_SAMPLES = 20
+MIN_SAMPLES = 3
+CAP_MULTIPLIER = 1.5
+
+_SELECTORS_READY_JS = """
+(selectors) => selectors.every(sel => {
+  let el = null;
+  try { el = document.querySelector(sel); } catch (e) { return false; }
+  return !!el && (el.textContent || el.getAttribute('content') || '').trim().length > 0;
+})
+"""
+
+
+class ReadyTimes:
+    """Recent ready times per domain persisted in ``ready_times.json``."""
+
+    def __init__(self, store: Optional[JsonStore] = None):
+        self._store = store or JsonStore("ready_times.json")
+
+    def record(self, domain: str, seconds: float) -> None:
+        if not domain:
+            return
+        with self._store.transaction() as data:
+            samples = data.setdefault(domain, [])
+            samples.append(round(seconds, 3))
+            del samples[:-MAX_SAMPLES]
+
+    def cap_for(self, domain: str) -> float:
+        """Longest readiness wait worth paying on ``domain``, in seconds."""
+        samples = self._store.load().get(domain) or []
+        if len(samples) < MIN_SAMPLES:
+            return settings.readiness_max_wait_seconds
+        cap = percentile(samples, 0.9) * CAP_MULTIPLIER
+        return min(settings.readiness_max_wait_seconds, max(settings.readiness_min_wait_seconds, cap))
+
+
+def ready_selectors(url: str) -> List[str]:
+    """Title/price selectors that indicate product content has rendered."""
+    domain = extract_domain(url)
+    recipe = get_selector_recipes().get(domain, url_template(url)) if domain else None
+    selectors: Dict[str, Any] = (recipe or {}).get("selectors") or {}
+    if not selectors:
+        config = get_site_config(url)
+        if config.site_type != SiteType.GENERIC:
+            selectors = {
+                "name": config.selectors.get("product_title"),
+                "price": config.selectors.get("price_current"),
+            }
+    return [sel for sel in (selectors.get("name"), selectors.get("price")) if sel]
+
+
+async def _network_quiet(page: Any, timeout_s: float) -> None:
+    settle = getattr(page, "_wait_for_settled_dom", None)
+    if settle is not None:
+        await settle(int(timeout_s * 1000))
+    else:
+        await page.wait_for_load_state("networkidle", timeout=int(timeout_s * 1000))
+
+
+async def wait_until_ready(page: Any, url: str, cap_s: Optional[float] = None) -> str:
+    """Wait for product content or network quiet, at most the domain's cap.
+
+    Returns how readiness was decided: "selectors", "network_idle" or "timeout".
+    """
+    domain = extract_domain(url)
+    cap_s = cap_s if cap_s is not None else get_ready_times().cap_for(domain)
+    started = time.monotonic()
+
+    waiters = {asyncio.ensure_future(_network_quiet(page, cap_s)): "network_idle"}
+    selectors = ready_selectors(url)
+    if selectors:
+        waiter = page.wait_for_function(_SELECTORS_READY_JS, arg=selectors, timeout=int(cap_s * 1000))
+        waiters[asyncio.ensure_future(waiter)] = "selectors"
+
+    outcome = "timeout"
+    pending = set(waiters)
+    try:
+        while pending and outcome == "timeout":
+            remaining = cap_s - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    outcome = waiters[task]
+                    break
+    finally:
+        for task in pending:
+            task.cancel()
+
+    elapsed = time.monotonic() - started
+    if outcome != "timeout" and elapsed >= cap_s * 0.98:
+        # The settled-DOM guard resolves at its timeout instead of raising
+        outcome = "timeout"
+    telemetry.incr(f"readiness.{outcome}")
+    telemetry.observe("readiness.wait_s", elapsed)
+    get_ready_times().record(domain, elapsed)
+    return outcome
+
+
+_ready_times: Optional[ReadyTimes] = None
+
+
+def get_ready_times() -> ReadyTimes:
+    """Return the process-wide ready-time store."""
+    global _ready_times
+    if _ready_times is None:
+        _ready_times = ReadyTimes()
+    return _ready_times
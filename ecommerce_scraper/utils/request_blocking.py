@@ -0,0 +1,122 @@
+"""Request blocking and page-load accounting for Stagehand navigation.
+
+Product pages pull in images, video, fonts, trackers and ad scripts that the
+extraction never looks at. ``apply`` installs a block list on the page through
+CDP ``Network.setBlockedURLs``, so matching requests are cancelled inside the
+browser itself; routing requests through Playwright would add a round trip to
+the (remote) browser for every request.
+
+The list combines URL patterns for the resource types in
+``settings.blocked_resource_types`` with ``TRACKER_DOMAINS``. Sites that need
+some of them to render prices can opt out per ``SiteConfig``
+(``allow_resource_types`` / ``allow_request_domains``).
+
+``record_page_load`` adds the navigation's load time and transferred bytes
+(Resource Timing, so cross-origin responses without Timing-Allow-Origin count
+as 0) to telemetry.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+from ..config.settings import settings
+from ..config.sites import get_site_config
+from .telemetry import telemetry
+
+# File extensions standing in for resource types (CDP block patterns match URLs)
+RESOURCE_TYPE_EXTENSIONS: Dict[str, Tuple[str, ...]] = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "media": ("mp4", "webm", "m3u8", "mp3", "ogg", "wav", "mov"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "stylesheet": ("css",),
+}
+
+# Analytics, tag managers, ad networks and session recorders
+TRACKER_DOMAINS: Tuple[str, ...] = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "analytics.tiktok.com",
+    "ct.pinterest.com",
+    "sc-static.net",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "fullstory.com",
+    "mouseflow.com",
+    "quantserve.com",
+    "scorecardresearch.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "adnxs.com",
+    "adsrvr.org",
+    "rubiconproject.com",
+    "pubmatic.com",
+    "openx.net",
+    "moatads.com",
+    "doubleverify.com",
+    "nr-data.net",
+    "cdn.segment.com",
+    "yandex.ru",
+)
+
+_PAGE_LOAD_JS = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0];
+  const resources = performance.getEntriesByType('resource');
+  const bytes = resources.reduce((sum, r) => sum + (r.transferSize || 0), nav ? nav.transferSize || 0 : 0);
+  return { bytes, requests: resources.length + 1 };
+}
+"""
+
+
+def _resource_types() -> List[str]:
+    return [t.strip().lower() for t in (settings.blocked_resource_types or "").split(",") if t.strip()]
+
+
+def blocked_url_patterns(url: str) -> List[str]:
+    """CDP block patterns for a navigation to ``url``, minus the site's allow-overrides."""
+    config = get_site_config(url)
+    allowed_types = {t.lower() for t in config.allow_resource_types}
+    allowed_domains = tuple(d.lower() for d in config.allow_request_domains)
+
+    patterns: List[str] = []
+    for resource_type in _resource_types():
+        if resource_type in allowed_types:
+            continue
+        for ext in RESOURCE_TYPE_EXTENSIONS.get(resource_type, ()):
+            patterns.extend((f"*.{ext}", f"*.{ext}?*"))
+    if settings.block_tracker_domains:
+        for domain in TRACKER_DOMAINS:
+            if any(domain == a or domain.endswith("." + a) for a in allowed_domains):
+                continue
+            patterns.extend((f"*://{domain}/*", f"*://*.{domain}/*"))
+    return patterns
+
+
+async def apply(page: Any, url: str) -> int:
+    """Install the block list for ``url`` on the page; number of patterns."""
+    patterns = blocked_url_patterns(url)
+    await page.send_cdp("Network.enable")
+    await page.send_cdp("Network.setBlockedURLs", {"urls": patterns})
+    return len(patterns)
+
+
+async def record_page_load(page: Any, load_s: float) -> None:
+    """Add load time and bytes transferred for the current navigation to telemetry."""
+    telemetry.observe("navigate.load_s", load_s)
+    stats = await page.evaluate(_PAGE_LOAD_JS)
+    if stats:
+        telemetry.observe("navigate.bytes", stats.get("bytes", 0))
+        telemetry.observe("navigate.requests", stats.get("requests", 0))
+        telemetry.incr("navigate.bytes_total", stats.get("bytes", 0))
@@ -0,0 +1,160 @@
+"""Concurrent retailer research: Perplexity plus direct searches on known retailers.
+
+A single Perplexity call often returns comparison sites or dead links. Known
+retailers can instead be asked directly: ``site_search_candidate`` runs
+``utils.site_search.search_site`` for one configured retailer and returns its
+best match as a research candidate with a match score.
+
+``CandidateStream`` runs research sources concurrently and merges what they
+return by domain (a scored site-search match replaces an unscored candidate
+for the same domain that has not been handed out yet). Callers ``wait`` until
+the first ``k`` high-confidence candidates arrive or every source finished,
+``take`` what is there to start extraction, and take late arrivals between
+retailers while the slower sources keep running.
+
+Usage:
+    stream = CandidateStream(limit=5)
+    stream.submit("perplexity", research_fn)
+    for config in fanout_retailers():
+        stream.submit("site_search", site_search_candidate, config, query)
+    stream.wait(first_k=3, timeout=20)
+    retailers = stream.take()
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config.settings import settings
+from ..config.sites import SITE_CONFIGS, SiteConfig
+from .site_search import search_site
+from .telemetry import telemetry
+from .url_utils import extract_domain
+
+
+def fanout_retailers(keys: Optional[str] = None) -> List[SiteConfig]:
+    """Configured retailers with a search URL, limited to ``keys`` (default ``fanout_retailers``) when set."""
+    keys = settings.fanout_retailers if keys is None else keys
+    wanted = {key.strip().lower() for key in keys.split(",") if key.strip()}
+    return [
+        config
+        for key, config in SITE_CONFIGS.items()
+        if config.search_url_pattern and (not wanted or str(getattr(key, "value", key)).lower() in wanted)
+    ]
+
+
+def site_search_candidate(config: SiteConfig, query: str) -> List[Dict[str, Any]]:
+    """The retailer's best on-site match for ``query`` as a research candidate ([] when none)."""
+    match = search_site(config.base_url, query)
+    if match is None:
+        return []
+    return [{
+        "vendor": config.name,
+        "url": match["url"],
+        "price": match["price"],
+        "notes": f"On-site search match: {match['name']}",
+        "score": match["score"],
+    }]
+
+
+class CandidateStream:
+    """Research candidates from concurrent sources, deduplicated by domain as they arrive."""
+
+    def __init__(self, limit: int, max_workers: Optional[int] = None):
+        self._limit = limit
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.fanout_max_workers, thread_name_prefix="research"
+        )
+        self._cond = threading.Condition()
+        self._queued: Dict[str, Dict[str, Any]] = {}
+        self._taken: set = set()
+        self._pending = 0
+        self._futures: List[Future] = []
+        self._closed = False
+
+    @property
+    def pending(self) -> bool:
+        """Whether any source is still running."""
+        with self._cond:
+            return self._pending > 0
+
+    def submit(self, source: str, fn: Callable[..., List[Dict[str, Any]]], *args: Any) -> None:
+        """Run ``fn(*args)`` in the pool; the retailer dicts it returns join the stream."""
+        with self._cond:
+            if self._closed:
+                return
+            self._pending += 1
+        # Keep the caller's deadline scope in the worker
+        future = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        self._futures.append(future)
+        future.add_done_callback(lambda f: self._collect(source, f))
+
+    def _collect(self, source: str, future: Future) -> None:
+        if future.cancelled():
+            telemetry.incr(f"research.{source}.cancelled")
+            candidates = []
+        else:
+            try:
+                candidates = future.result() or []
+            except Exception:
+                telemetry.incr(f"research.{source}.error")
+                candidates = []
+        with self._cond:
+            for candidate in candidates if not self._closed else []:
+                if isinstance(candidate, dict):
+                    self._offer({**candidate, "source": source})
+            self._pending -= 1
+            self._cond.notify_all()
+        telemetry.incr(f"research.{source}.candidates", len(candidates))
+
+    def _offer(self, candidate: Dict[str, Any]) -> None:
+        url = candidate.get("url") or ""
+        key = extract_domain(url) if url.startswith("http") else ""
+        # Candidates without a usable URL are kept (the flow skips them), one per vendor
+        key = key or f"vendor:{str(candidate.get('vendor') or '').strip().lower()}"
+        if key in self._taken:
+            return
+        existing = self._queued.get(key)
+        if existing is None or (candidate.get("score") or 0) > (existing.get("score") or 0):
+            self._queued[key] = candidate
+
+    def _confident(self) -> int:
+        taken = len(self._taken)
+        queued = sum(1 for c in self._queued.values() if (c.get("score") or 0) >= settings.fanout_min_score)
+        return taken + queued
+
+    def wait(self, first_k: Optional[int] = None, timeout: Optional[float] = None) -> None:
+        """Block until ``first_k`` high-confidence candidates exist or every source finished."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._pending == 0 or (first_k is not None and self._confident() >= first_k),
+                timeout,
+            )
+
+    def take(self) -> List[Dict[str, Any]]:
+        """Candidates not handed out yet, highest match score first, up to the limit."""
+        with self._cond:
+            # sorted() is stable: unscored candidates keep their source's order
+            ranked = sorted(self._queued.items(), key=lambda item: -(item[1].get("score") or 0))
+            fresh = []
+            for key, candidate in ranked:
+                if len(self._taken) >= self._limit:
+                    break
+                self._taken.add(key)
+                del self._queued[key]
+                fresh.append(candidate)
+            return fresh
+
+    def close(self) -> None:
+        """Cancel calls that have not started and accept no new ones.
+
+        Calls already running finish in the background; their candidates are ignored.
+        """
+        with self._cond:
+            self._closed = True
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
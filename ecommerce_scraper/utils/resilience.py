@@ -0,0 +1,214 @@
+"""Circuit breakers and retry budgets for external dependencies.
+
+Each dependency (Browserbase, Perplexity, the LLM provider, Scrappey) gets one
+process-wide ``CircuitBreaker`` and one ``RetryBudget``:
+
+- The breaker opens after ``CIRCUIT_FAILURE_THRESHOLD`` consecutive failures
+  and rejects calls immediately with ``CircuitOpenError``. After
+  ``CIRCUIT_RESET_TIMEOUT_SECONDS`` it lets a limited number of half-open trial
+  calls through; a successful trial closes it again, a failed one re-opens it.
+- The budget caps retries to a fraction of first attempts (``RETRY_BUDGET_RATIO``)
+  so retries cannot multiply into a storm during a provider incident.
+
+The flow itself has a ``FLOW`` budget shared by every search in the process:
+per-retailer and research retries draw from it, so it can end retries before
+``ProductSearchState.max_retries`` is reached (denials are counted in
+``ProductSearchState.retries_denied``).
+
+Usage:
+  breaker = get_circuit_breaker(BROWSERBASE)
+  breaker.before_call()          # raises CircuitOpenError when open
+  ...
+  breaker.record_success() / breaker.record_failure()
+
+  budget = get_retry_budget(PERPLEXITY)
+  budget.record_request()
+  if budget.try_acquire(): retry()
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from ..config.settings import settings
+from .telemetry import telemetry
+
+# Dependency names
+BROWSERBASE = "browserbase"
+PERPLEXITY = "perplexity"
+LLM_PROVIDER = "llm"
+SCRAPPEY = "scrappey"
+FLOW = "flow"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the dependency's circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open trial calls."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_s: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials_in_flight = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_s:
+            self._state = HALF_OPEN
+            self._trials_in_flight = 0
+
+    def allows_requests(self) -> bool:
+        """Whether a call would currently be let through (without reserving a trial)."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                return False
+            if self._state == HALF_OPEN:
+                return self._trials_in_flight < self.half_open_max_calls
+            return True
+
+    def before_call(self) -> None:
+        """Admit a call or raise ``CircuitOpenError``; reserves a trial slot when half-open."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._trials_in_flight < self.half_open_max_calls:
+                self._trials_in_flight += 1
+                telemetry.incr(f"circuit.{self.name}.trial")
+                return
+            retry_in = max(0.0, self.reset_timeout_s - (time.monotonic() - self._opened_at))
+        telemetry.incr(f"circuit.{self.name}.rejected")
+        raise CircuitOpenError(f"{self.name} circuit is open; failing fast (next trial in {retry_in:.0f}s)")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                telemetry.incr(f"circuit.{self.name}.closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._trials_in_flight = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    telemetry.incr(f"circuit.{self.name}.opened")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trials_in_flight = 0
+
+    def release(self) -> None:
+        """Give back a half-open trial slot without recording an outcome (e.g. on cancellation)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials_in_flight > 0:
+                self._trials_in_flight -= 1
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` through the breaker; any exception counts as a failure."""
+        self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+class RetryBudget:
+    """Token bucket allowing retries in proportion to first attempts.
+
+    Every first attempt deposits ``ratio`` tokens (capped at ``max_tokens``);
+    every retry withdraws one. The bucket starts with ``min_tokens`` so a
+    quiet process can still retry a transient failure.
+    """
+
+    def __init__(self, name: str, ratio: float = 0.2, min_tokens: float = 3.0, max_tokens: float = 20.0):
+        self.name = name
+        self.ratio = ratio
+        self.max_tokens = max(max_tokens, min_tokens)
+        self._tokens = float(min_tokens)
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Withdraw one retry token; False when the budget is exhausted."""
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                telemetry.incr(f"retry_budget.{self.name}.retries")
+                return True
+        telemetry.incr(f"retry_budget.{self.name}.exhausted")
+        return False
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            return self._tokens
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_budgets: Dict[str, RetryBudget] = {}
+_registry_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for a dependency."""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=settings.circuit_failure_threshold,
+                reset_timeout_s=settings.circuit_reset_timeout_seconds,
+                half_open_max_calls=settings.circuit_half_open_max_calls,
+            )
+        return breaker
+
+
+def get_retry_budget(name: str) -> RetryBudget:
+    """Return the process-wide retry budget for a dependency."""
+    with _registry_lock:
+        budget = _budgets.get(name)
+        if budget is None:
+            budget = _budgets[name] = RetryBudget(
+                name,
+                ratio=settings.retry_budget_ratio,
+                min_tokens=settings.retry_budget_min_tokens,
+            )
+        return budget
+
+
+def resilience_snapshot() -> Dict[str, Any]:
+    """Current breaker states and remaining retry tokens, for result metadata."""
+    with _registry_lock:
+        breakers = dict(_breakers)
+        budgets = dict(_budgets)
+    return {
+        "circuits": {name: breaker.state for name, breaker in breakers.items()},
+        "retry_tokens": {name: round(budget.tokens, 2) for name, budget in budgets.items()},
+    }
@@ -0,0 +1,168 @@
+"""Persistent per-domain retailer health scoreboard.
+
+Every extraction + validation attempt records its outcome per domain:
+validation pass, extraction latency, and whether the page was a soft-404 or
+blocked. Before extraction the flow orders ``state.retailers`` by expected
+value (likely to pass, rarely blocked or dead, fast, and cheap) and skips
+domains whose pass rate has fallen below ``RETAILER_SKIP_THRESHOLD``. Skipped domains get one probe again
+after ``RETAILER_SKIP_HOURS`` so a recovered site is not excluded forever.
+
+Usage:
+  health = get_retailer_health()
+  ordered, skipped = health.rank(retailers)
+  health.record_attempt("argos.co.uk", passed=True, latency_s=42.0)
+"""
+
+from __future__ import annotations
+
+import re
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.settings import settings
+from .json_store import JsonStore
+from .url_utils import extract_domain
+
+# Recent latencies kept per domain for the median
+LATENCY_WINDOW = 20
+# Beta prior for the pass rate: an unseen domain scores PRIOR_PASS_RATE
+PRIOR_PASS_RATE = 0.5
+PRIOR_WEIGHT = 2.0
+# Latency at which the speed factor halves (seconds)
+REFERENCE_LATENCY_S = 60.0
+
+_BLOCK_PATTERNS = re.compile(
+    r"captcha|access denied|forbidden|\b403\b|blocked|bot detection|cloudflare|are you a robot|unusual traffic",
+    re.I,
+)
+# Page-level phrases only: tool errors such as "element not found" are not soft-404s
+_SOFT_404_PATTERNS = re.compile(
+    r"\b404\b|soft-404|page (?:was )?not found|page (?:could not|cannot|can't) be found"
+    r"|looking for something|not a functioning page|no longer available",
+    re.I,
+)
+
+
+def classify_failure(errors: Optional[List[str]]) -> Optional[str]:
+    """Classify extraction errors as ``"blocked"``, ``"soft_404"`` or None."""
+    text = " ".join(str(e) for e in (errors or []))
+    if not text:
+        return None
+    if _BLOCK_PATTERNS.search(text):
+        return "blocked"
+    if _SOFT_404_PATTERNS.search(text):
+        return "soft_404"
+    return None
+
+
+def parse_price(price: Any) -> Optional[float]:
+    """Parse a GBP price string such as ``"£1,299.00"``; None when unparseable."""
+    if isinstance(price, (int, float)):
+        return float(price) if price > 0 else None
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(price or ""))
+    if not match:
+        return None
+    try:
+        value = float(match.group(0).replace(",", ""))
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+class RetailerHealth:
+    """Scoreboard of per-domain outcomes persisted in ``retailer_health.json``."""
+
+    def __init__(self, store: Optional[JsonStore] = None):
+        self._store = store or JsonStore("retailer_health.json")
+
+    def record_attempt(
+        self,
+        domain: str,
+        *,
+        passed: bool,
+        latency_s: Optional[float] = None,
+        failure: Optional[str] = None,
+    ) -> None:
+        """Record one extraction + validation attempt for ``domain``."""
+        if not domain:
+            return
+        with self._store.transaction() as data:
+            entry = data.setdefault(domain, {"attempts": 0, "passed": 0, "soft_404": 0, "blocked": 0, "latencies": []})
+            entry["attempts"] += 1
+            entry["passed"] += 1 if passed else 0
+            if failure in ("soft_404", "blocked"):
+                entry[failure] += 1
+            if latency_s is not None:
+                entry["latencies"] = (entry["latencies"] + [round(latency_s, 2)])[-LATENCY_WINDOW:]
+            entry["last_attempt"] = time.time()
+
+    def stats(self, domain: str) -> Dict[str, Any]:
+        """Pass rate, median latency, soft-404 rate and block rate for ``domain``."""
+        entry = self._store.load().get(domain) or {}
+        attempts = entry.get("attempts", 0)
+        latencies = entry.get("latencies") or []
+        return {
+            "attempts": attempts,
+            "pass_rate": (entry.get("passed", 0) + PRIOR_PASS_RATE * PRIOR_WEIGHT) / (attempts + PRIOR_WEIGHT),
+            "median_latency_s": statistics.median(latencies) if latencies else None,
+            "soft_404_rate": entry.get("soft_404", 0) / attempts if attempts else 0.0,
+            "block_rate": entry.get("blocked", 0) / attempts if attempts else 0.0,
+            "last_attempt": entry.get("last_attempt"),
+        }
+
+    def should_skip(self, domain: str) -> bool:
+        """True when the domain has a poor track record and is not due a re-probe."""
+        stats = self.stats(domain)
+        if stats["attempts"] < settings.retailer_health_min_attempts:
+            return False
+        if stats["pass_rate"] >= settings.retailer_skip_threshold:
+            return False
+        last_attempt = stats["last_attempt"] or 0
+        return time.time() - last_attempt < settings.retailer_skip_hours * 3600
+
+    def expected_value(
+        self,
+        retailer: Dict[str, Any],
+        cheapest: Optional[float] = None,
+        priciest: Optional[float] = None,
+    ) -> float:
+        """Score a research candidate: pass probability x reachability x speed x cheapness.
+
+        Reachability discounts domains that block us or serve dead pages, which
+        are more likely to fail again than a domain whose products merely failed
+        validation. A candidate without a price counts as the ``priciest`` priced
+        one, so it never outranks a priced candidate on price alone.
+        """
+        stats = self.stats(extract_domain(retailer.get("url") or ""))
+        reachability = (1.0 - stats["block_rate"]) * (1.0 - stats["soft_404_rate"])
+        latency = stats["median_latency_s"]
+        speed = REFERENCE_LATENCY_S / (REFERENCE_LATENCY_S + latency) if latency is not None else 0.5
+        price = parse_price(retailer.get("price")) or priciest
+        cheapness = (cheapest / price) if (price and cheapest) else 0.5
+        return stats["pass_rate"] * reachability * speed * cheapness
+
+    def rank(self, retailers: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split retailers into (ordered by expected value, skipped as unhealthy)."""
+        kept: List[Dict[str, Any]] = []
+        skipped: List[Dict[str, Any]] = []
+        for retailer in retailers:
+            domain = extract_domain(retailer.get("url") or "")
+            (skipped if domain and self.should_skip(domain) else kept).append(retailer)
+        prices = [p for p in (parse_price(r.get("price")) for r in kept) if p]
+        cheapest = min(prices) if prices else None
+        priciest = max(prices) if prices else None
+        # Stable sort keeps the research order for ties
+        kept.sort(key=lambda r: self.expected_value(r, cheapest, priciest), reverse=True)
+        return kept, skipped
+
+
+_health: Optional[RetailerHealth] = None
+
+
+def get_retailer_health() -> RetailerHealth:
+    """Return the process-wide retailer health scoreboard."""
+    global _health
+    if _health is None:
+        _health = RetailerHealth()
+    return _health
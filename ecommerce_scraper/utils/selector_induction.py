@@ -0,0 +1,204 @@
+"""Selector induction: learned per-retailer extraction recipes.
+
+After a successful LLM extraction of a single product page, ``induce``
+locates the DOM nodes holding the extracted name and price and derives short,
+stable CSS selectors for them (test ids / itemprop / stable ids first, then
+tag + stable classes scoped by ancestors). Recipes are stored per domain and
+URL template together with the page-template fingerprint they were learned on.
+
+On later visits ``extract`` applies the recipe deterministically,
+without an LLM call, provided the page fingerprint still matches and the values
+look like a product name and a price; otherwise the recipe is invalidated. For
+known retailers without a learned recipe, the hand-written ``SiteConfig.selectors``
+(``product_title`` / ``price_current``) are tried as a seed recipe on product
+pages (never on search results, nor on URLs outside ``product_url_pattern``).
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from ..config.sites import SiteType, get_site_config
+from .json_store import JsonStore
+from .page_fingerprint import is_search_results, page_fingerprint, url_template
+from .retailer_health import parse_price
+from .telemetry import telemetry
+from .url_utils import extract_domain
+
+_PRICE_RE = re.compile(r"[£$€]\s?\d[\d,]*(?:\.\d{1,2})?|\d[\d,]*\.\d{2}")
+
+# Finds the smallest element containing each target text and builds a selector
+# whose first match is that element.
+_INDUCE_JS = """
+(targets) => {
+  const norm = s => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+  const squash = s => norm(s).replace(/\\s/g, '');
+  const ATTRS = ['data-testid', 'data-test', 'data-test-id', 'data-qa', 'data-automation', 'data-auto-id', 'itemprop'];
+  const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'HTML', 'BODY', 'HEAD']);
+  const stableClass = c => c && c.length < 40 && !/\\d/.test(c) && !/^(active|selected|hidden|show|open|visible)$/.test(c);
+  const part = el => {
+    for (const a of ATTRS) {
+      const v = el.getAttribute(a);
+      if (v && !/\\d{3,}/.test(v) && !v.includes('"')) return `[${a}="${v}"]`;
+    }
+    if (el.id && !/\\d/.test(el.id)) return '#' + CSS.escape(el.id);
+    const classes = [...el.classList].filter(stableClass).slice(0, 2).map(c => '.' + CSS.escape(c)).join('');
+    return el.tagName.toLowerCase() + classes;
+  };
+  const selectorFor = el => {
+    let sel = part(el);
+    let node = el;
+    for (let depth = 0; depth < 4; depth++) {
+      try { if (document.querySelector(sel) === el) return sel; } catch (e) { return null; }
+      node = node.parentElement;
+      if (!node || node === document.body) break;
+      sel = part(node) + ' ' + sel;
+    }
+    return null;
+  };
+  const find = (text, match) => {
+    const target = match(text);
+    if (!target) return null;
+    let best = null, bestLen = Infinity;
+    for (const el of document.body.querySelectorAll('*')) {
+      if (SKIP.has(el.tagName)) continue;
+      const t = match(el.textContent);
+      if (!t || t.length >= bestLen || t.length > target.length * 3 + 20) continue;
+      if (t.includes(target)) { best = el; bestLen = t.length; }
+    }
+    return best;
+  };
+  const out = {};
+  const nameEl = find(targets.name, norm);
+  const priceEl = find(targets.price, squash);
+  out.name = nameEl ? selectorFor(nameEl) : null;
+  out.price = priceEl ? selectorFor(priceEl) : null;
+  return out;
+}
+"""
+
+_APPLY_JS = """
+(selectors) => {
+  const out = {};
+  for (const [key, sel] of Object.entries(selectors)) {
+    let el = null;
+    try { el = document.querySelector(sel); } catch (e) {}
+    out[key] = el ? (el.getAttribute('content') || el.textContent || '').replace(/\\s+/g, ' ').trim() : null;
+  }
+  return out;
+}
+"""
+
+
+def _clean_price(text: Optional[str]) -> Optional[str]:
+    match = _PRICE_RE.search(text or "")
+    return match.group(0).replace(" ", "") if match else None
+
+
+def _plausible(values: Dict[str, Optional[str]]) -> Optional[Dict[str, str]]:
+    """Name + price when the applied recipe produced believable values."""
+    name = (values.get("name") or "").strip()
+    price = _clean_price(values.get("price"))
+    if not (3 <= len(name) <= 300) or not price:
+        return None
+    return {"name": name, "price": price}
+
+
+def _seed_selectors(url: str) -> Optional[Dict[str, str]]:
+    """Hand-written SiteConfig hints for known retailers, if any."""
+    config = get_site_config(url)
+    if config.site_type == SiteType.GENERIC or is_search_results(url):
+        return None
+    # Patterns are written for the config's storefront; match regional ones by path
+    storefront_url = urlparse(url)._replace(netloc=urlparse(config.base_url).netloc).geturl()
+    if config.product_url_pattern and not re.match(config.product_url_pattern, storefront_url):
+        return None
+    title = config.selectors.get("product_title")
+    price = config.selectors.get("price_current")
+    return {"name": title, "price": price} if title and price else None
+
+
+class SelectorRecipes:
+    """Learned name/price selectors persisted in ``selector_recipes.json``."""
+
+    def __init__(self, store: Optional[JsonStore] = None):
+        self._store = store or JsonStore("selector_recipes.json")
+
+    def get(self, domain: str, template: str) -> Optional[Dict[str, Any]]:
+        return (self._store.load().get(domain) or {}).get(template)
+
+    def put(self, domain: str, template: str, fingerprint: str, selectors: Dict[str, str]) -> None:
+        with self._store.transaction() as data:
+            data.setdefault(domain, {})[template] = {
+                "fingerprint": fingerprint,
+                "selectors": selectors,
+                "learned_at": time.time(),
+            }
+
+    def invalidate(self, domain: str, template: str) -> None:
+        with self._store.transaction() as data:
+            (data.get(domain) or {}).pop(template, None)
+
+    async def extract(self, page: Any) -> Optional[Dict[str, str]]:
+        """Apply the recipe for the current page; None when there is no usable recipe."""
+        url = page.url or ""
+        domain, template = extract_domain(url), url_template(url)
+        if not domain:
+            return None
+        recipe = self.get(domain, template)
+        if recipe is not None:
+            if recipe.get("fingerprint") != await page_fingerprint(page):
+                # The page template changed since the recipe was learned
+                self.invalidate(domain, template)
+                telemetry.incr("selector_recipe.stale")
+                return None
+            selectors = recipe.get("selectors") or {}
+        else:
+            selectors = _seed_selectors(url)
+            if selectors is None:
+                telemetry.incr("selector_recipe.miss")
+                return None
+
+        values = _plausible(await page.evaluate(_APPLY_JS, selectors))
+        if values is None:
+            if recipe is not None:
+                self.invalidate(domain, template)
+                telemetry.incr("selector_recipe.stale")
+            else:
+                telemetry.incr("selector_recipe.miss")
+            return None
+        telemetry.incr("selector_recipe.hit" if recipe is not None else "selector_recipe.seed_hit")
+        return {**values, "url": url}
+
+    async def induce(self, page: Any, product: Dict[str, Any]) -> bool:
+        """Learn name/price selectors from a product the LLM extracted on this page."""
+        name = product.get("name") or product.get("product_name")
+        price = product.get("price")
+        url = page.url or ""
+        domain = extract_domain(url)
+        if not (domain and name and price):
+            return False
+        selectors = await page.evaluate(_INDUCE_JS, {"name": str(name), "price": str(price)})
+        if not selectors or not selectors.get("name") or not selectors.get("price"):
+            return False
+        # Only keep recipes that reproduce what the LLM saw
+        values = _plausible(await page.evaluate(_APPLY_JS, selectors))
+        if values is None or parse_price(price) != parse_price(values["price"]):
+            return False
+        self.put(domain, url_template(url), await page_fingerprint(page), selectors)
+        telemetry.incr("selector_recipe.induced")
+        return True
+
+
+_recipes: Optional[SelectorRecipes] = None
+
+
+def get_selector_recipes() -> SelectorRecipes:
+    """Return the process-wide selector recipe store."""
+    global _recipes
+    if _recipes is None:
+        _recipes = SelectorRecipes()
+    return _recipes
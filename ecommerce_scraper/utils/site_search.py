@@ -0,0 +1,186 @@
+"""Direct on-site search for known retailers.
+
+Configured retailers declare ``SiteConfig.search_url_pattern`` (for example
+``https://www.asda.com/search/{query}``). Instead of having the extraction
+agent find the search box and type into it with LLM ``act`` calls,
+``search_site`` builds the results URL, fetches it without a browser, collects
+the product links on the page and picks the best match with a deterministic
+token-overlap ranking. Search pages are fetched with plain HTTP; a paid
+Scrappey call is only made for search templates where HTTP is known to be
+blocked (learned in ``utils.fetch_ladder.FetchTiers``), unless
+``SITE_SEARCH_SCRAPPEY_FALLBACK`` allows it after any HTTP miss.
+
+Unknown sites have no pattern; ``search_url`` returns None for them and the
+agent keeps searching on the page.
+
+Usage:
+    match = search_site(retailer_url, "Heinz Baked Beans 415g")
+    if match:
+        retailer_url = match["url"]
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote, quote_plus, urldefrag, urljoin, urlparse
+
+from ..config.settings import settings
+from ..config.sites import get_site_config
+from .fetch_ladder import HTTP, fetch_http, fetch_scrappey, format_price, get_fetch_tiers, offer_price, walk_json_ld
+from .telemetry import telemetry
+from .url_utils import extract_domain
+
+MAX_CANDIDATES = 60
+# Ancestors searched for a tile's price before giving up
+MAX_TILE_DEPTH = 5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_PRICE_RE = re.compile(r"([£$€])\s?(\d[\d,]*(?:\.\d{1,2})?)")
+_SYMBOL_CURRENCIES = {"£": "GBP", "$": "USD", "€": "EUR"}
+# Links in a results grid that are never products
+_NON_PRODUCT_PATH_RE = re.compile(r"/(search|account|login|basket|cart|checkout|help|store-locator)\b", re.I)
+
+
+def search_url(retailer_url: str, query: str) -> Optional[str]:
+    """The retailer's search results URL for ``query``; None for sites without a pattern."""
+    pattern = get_site_config(retailer_url).search_url_pattern
+    if not pattern or "{query}" not in pattern or not query.strip():
+        return None
+    # Query strings take '+' for spaces, path segments need percent-encoding
+    in_query = "?" in pattern.split("{query}", 1)[0]
+    url = pattern.replace("{query}", quote_plus(query.strip()) if in_query else quote(query.strip(), safe=""))
+    # Regional storefronts (amazon.co.uk for an amazon.com pattern) share the search path
+    retailer = urlparse(retailer_url)
+    if retailer.netloc and extract_domain(url) != extract_domain(retailer_url):
+        url = urlparse(url)._replace(scheme=retailer.scheme, netloc=retailer.netloc).geturl()
+    return url
+
+
+# --- Parsing results pages ---
+def _tile_price(link: Any) -> Optional[str]:
+    """Price shown in the smallest ancestor of ``link`` that is still a single product tile."""
+    element = link
+    for _ in range(MAX_TILE_DEPTH):
+        if element is None:
+            break
+        hrefs = {a["href"] for a in element.find_all("a", href=True)} if element.name != "a" else set()
+        if len(hrefs) > 2:
+            # Grown past the tile into the grid
+            break
+        match = _PRICE_RE.search(element.get_text(" "))
+        if match:
+            return format_price(match.group(2).replace(",", ""), _SYMBOL_CURRENCIES[match.group(1)])
+        element = element.parent
+    return None
+
+
+def search_candidates(html: str, page_url: str) -> List[Dict[str, Any]]:
+    """Product links (name, url, price when shown) on a search results page, in page order."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    domain = extract_domain(page_url)
+    config = get_site_config(page_url)
+    product_pattern = config.product_url_pattern
+    config_host = urlparse(config.base_url).netloc
+    found: Dict[str, Dict[str, Any]] = {}
+
+    def add(name: Any, href: Any, price: Optional[str]) -> None:
+        if not isinstance(name, str) or not isinstance(href, str):
+            return
+        url = urldefrag(urljoin(page_url, href))[0]
+        name = " ".join(name.split())
+        if not (3 <= len(name) <= 300) or extract_domain(url) != domain or url == page_url:
+            return
+        if _NON_PRODUCT_PATH_RE.search(urlparse(url).path):
+            return
+        # Patterns are written for the config's storefront; match regional ones by path
+        if product_pattern and not re.match(product_pattern, urlparse(url)._replace(netloc=config_host).geturl()):
+            return
+        entry = found.get(url)
+        if entry is None:
+            if len(found) < MAX_CANDIDATES:
+                found[url] = {"name": name, "url": url, "price": price}
+            return
+        # Image and title links share a URL; keep the most descriptive name
+        if len(name) > len(entry["name"]):
+            entry["name"] = name
+        entry["price"] = entry["price"] or price
+
+    # Structured data first: clean names and canonical product URLs
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or script.get_text() or "")
+        except ValueError:
+            continue
+        for node in walk_json_ld(data):
+            add(node.get("name"), node.get("url"), offer_price(node.get("offers")))
+
+    for link in soup.find_all("a", href=True):
+        name = link.get("title") or link.get("aria-label") or link.get_text(" ")
+        add(name, link["href"], _tile_price(link))
+    return list(found.values())
+
+
+# --- Ranking ---
+def _tokens(text: str) -> set:
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+def match_score(query: str, name: str) -> float:
+    """How well a result name matches the query, 0..1 (query coverage weighs most)."""
+    wanted, offered = _tokens(query), _tokens(name)
+    if not wanted or not offered:
+        return 0.0
+    shared = wanted & offered
+    recall = len(shared) / len(wanted)
+    precision = len(shared) / len(offered)
+    # Sizes and model numbers must agree: "415g" and "200g" are different products
+    wanted_numbers = {t for t in wanted if any(ch.isdigit() for ch in t)}
+    offered_numbers = {t for t in offered if any(ch.isdigit() for ch in t)}
+    if wanted_numbers and offered_numbers and not wanted_numbers & offered_numbers:
+        recall *= 0.5
+    return round(0.8 * recall + 0.2 * precision, 4)
+
+
+def best_match(query: str, candidates: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Highest-scoring candidate at or above ``site_search_min_score``.
+
+    Ties go to candidates showing a price, then to the one listed first.
+    """
+    ranked = sorted(
+        ({**candidate, "score": match_score(query, candidate["name"])} for candidate in candidates),
+        key=lambda c: (-c["score"], c["price"] is None),
+    )
+    if ranked and ranked[0]["score"] >= settings.site_search_min_score:
+        return ranked[0]
+    return None
+
+
+def search_site(retailer_url: str, query: str) -> Optional[Dict[str, Any]]:
+    """Best match for ``query`` on the retailer's own search page; None when unknown or no match."""
+    url = search_url(retailer_url, query)
+    if url is None:
+        return None
+    candidates: List[Dict[str, Any]] = []
+    # Search pages learn their own tier (a different URL template from product pages)
+    tiers = get_fetch_tiers()
+    learned = tiers.tier(url)
+    if tiers.start_tier(url) == HTTP:
+        html = fetch_http(url)
+        if html:
+            candidates = search_candidates(html, url)
+            if learned != HTTP:
+                tiers.record(url, HTTP)
+        else:
+            # Blocked or failing: later searches on this template may use Scrappey
+            tiers.escalate(url, HTTP)
+    http_blocked = learned not in (None, HTTP)
+    if not candidates and settings.scrappey_api_key and (http_blocked or settings.site_search_scrappey_fallback):
+        html = fetch_scrappey(url)
+        candidates = search_candidates(html, url) if html else []
+    match = best_match(query, candidates)
+    telemetry.incr("site_search.hit" if match else "site_search.miss")
+    return match
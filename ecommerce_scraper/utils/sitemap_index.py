@@ -0,0 +1,327 @@
+"""Local product-URL index built from retailers' sitemaps.
+
+Asking an LLM where a product is sold on every monitoring run is slow and
+costly. Retailers publish their product URLs in sitemaps, and product URL
+slugs carry the product name (``/groceries/product/heinz-baked-beans-415g/...``).
+``SitemapIndex.refresh`` streams a retailer's sitemaps and keeps an inverted
+index from slug tokens to product URLs, so the research step can answer
+candidate URLs locally (``sitemap_candidates``) in milliseconds.
+
+- Sitemaps are found in ``robots.txt`` (``/sitemap.xml`` otherwise) and
+  streamed: gzip is decompressed on the fly and XML is parsed incrementally
+  with each entry cleared after use, so memory stays flat on sitemaps with
+  millions of URLs.
+- Refreshes are incremental: child sitemaps whose ``lastmod`` has not changed
+  since the last crawl are skipped, and known URLs only get their ``lastmod``
+  updated.
+- The index is a SQLite file in the cache directory (``urls`` plus a
+  ``postings`` table keyed by token), which stays on disk and answers token
+  lookups from its primary-key index.
+
+Usage:
+    python -m ecommerce_scraper.utils.sitemap_index refresh --retailers asda,tesco
+    python -m ecommerce_scraper.utils.sitemap_index lookup "heinz baked beans 415g"
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import math
+import re
+import sqlite3
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import requests
+
+from ..config.settings import settings
+from ..config.sites import SiteConfig, get_site_config
+from .deadline import cap_timeout
+from .fetch_ladder import http_session
+from .research_fanout import fanout_retailers
+from .site_search import match_score
+from .telemetry import telemetry
+from .url_utils import extract_domain
+
+BATCH_SIZE = 5000
+# Candidate URLs scored per lookup after the token pre-filter
+MAX_LOOKUP_ROWS = 200
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# URL path words that say nothing about the product
+_STOP_TOKENS = {"p", "product", "products", "dp", "itm", "ip", "html", "htm", "en", "gb", "uk", "groceries", "shop", "www"}
+_PRODUCT_PATH_RE = re.compile(r"/(p|product|products|dp|itm|ip)/|\d{5,}", re.I)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    domain TEXT NOT NULL,
+    lastmod TEXT
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    url_id INTEGER NOT NULL,
+    PRIMARY KEY (token, url_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sitemaps (
+    url TEXT PRIMARY KEY,
+    lastmod TEXT,
+    crawled_at REAL
+);
+"""
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in dict.fromkeys(_TOKEN_RE.findall(text.lower())) if t not in _STOP_TOKENS]
+
+
+def slug_tokens(url: str) -> List[str]:
+    """Words of a URL's path, e.g. ``['heinz', 'baked', 'beans', '415g', '910000']``."""
+    return _tokens(unquote(urlparse(url).path))
+
+
+def looks_like_product(url: str, config: SiteConfig) -> bool:
+    """Whether a sitemap URL is a product page (the config's pattern, else path hints)."""
+    if config.product_url_pattern:
+        config_host = urlparse(config.base_url).netloc
+        return bool(re.match(config.product_url_pattern, urlparse(url)._replace(netloc=config_host).geturl()))
+    return bool(_PRODUCT_PATH_RE.search(urlparse(url).path))
+
+
+# --- Streaming sitemaps ---
+def discover_sitemaps(base_url: str) -> List[str]:
+    """Sitemaps listed in the site's robots.txt, else the conventional /sitemap.xml."""
+    parsed = urlparse(base_url)
+    root = f"{parsed.scheme}://{parsed.netloc}"
+    try:
+        response = http_session().get(f"{root}/robots.txt", timeout=cap_timeout(settings.fetch_http_timeout_seconds))
+        lines = response.text.splitlines() if response.status_code == 200 else []
+    except requests.exceptions.RequestException:
+        lines = []
+    found = [line.split(":", 1)[1].strip() for line in lines if line.lower().startswith("sitemap:")]
+    return found or [f"{root}/sitemap.xml"]
+
+
+def _local_name(tag: str) -> Tuple[str, str]:
+    namespace, _, name = tag.rpartition("}")
+    return namespace, name
+
+
+def iter_sitemap(url: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """Stream ``(kind, loc, lastmod)`` entries of one sitemap; kind is "sitemap" or "url"."""
+    timeout = cap_timeout(settings.sitemap_timeout_seconds, "sitemap fetch")
+    with http_session().get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        # Let the buffered reader see EOF instead of a closed file
+        response.raw.auto_close = False
+        stream: Any = io.BufferedReader(response.raw, buffer_size=64 * 1024)
+        # .xml.gz files are served as gzip bodies, not gzip transfer encoding
+        if stream.peek(2)[:2] == b"\x1f\x8b":
+            stream = gzip.GzipFile(fileobj=stream)
+        root = namespace = None
+        loc = lastmod = None
+        for event, element in ET.iterparse(stream, events=("start", "end")):
+            if root is None:
+                root = element
+                namespace = _local_name(element.tag)[0]
+                continue
+            if event != "end":
+                continue
+            element_namespace, name = _local_name(element.tag)
+            # image:loc and friends share the local name; only the sitemap namespace counts
+            if element_namespace != namespace:
+                continue
+            if name == "loc":
+                loc = (element.text or "").strip()
+            elif name == "lastmod":
+                lastmod = (element.text or "").strip() or None
+            elif name in ("url", "sitemap"):
+                if loc:
+                    yield name, loc, lastmod
+                loc = lastmod = None
+                # Drop parsed entries so memory does not grow with the sitemap
+                root.clear()
+
+
+# --- Index ---
+class SitemapIndex:
+    """Inverted index from URL slug tokens to product URLs in ``sitemap_index.sqlite3``."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else Path(settings.cache_dir) / "sitemap_index.sqlite3"
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _add(self, batch: List[Tuple[str, Optional[str]]], domain: str) -> int:
+        """Insert URLs (and their postings) in one transaction; returns how many were new."""
+        conn = self._conn()
+        added = 0
+        with conn:
+            for url, lastmod in batch:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO urls (url, domain, lastmod) VALUES (?, ?, ?)", (url, domain, lastmod)
+                )
+                if cursor.rowcount:
+                    added += 1
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO postings (token, url_id) VALUES (?, ?)",
+                        [(token, cursor.lastrowid) for token in slug_tokens(url)],
+                    )
+                elif lastmod:
+                    # Same URL, same slug tokens: only the lastmod can change
+                    conn.execute("UPDATE urls SET lastmod = ? WHERE url = ?", (lastmod, url))
+        return added
+
+    def _sitemap_lastmod(self, url: str) -> Optional[str]:
+        row = self._conn().execute("SELECT lastmod FROM sitemaps WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def _mark_crawled(self, url: str, lastmod: Optional[str]) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sitemaps (url, lastmod, crawled_at) VALUES (?, ?, ?)",
+                (url, lastmod, time.time()),
+            )
+
+    def refresh(self, config: SiteConfig) -> Dict[str, int]:
+        """Crawl the retailer's sitemaps into the index, skipping unchanged child sitemaps."""
+        domain = extract_domain(config.base_url)
+        stats: Counter = Counter()
+        queue = deque((url, None) for url in discover_sitemaps(config.base_url))
+        crawled = set()
+        batch: List[Tuple[str, Optional[str]]] = []
+        while queue and stats["urls"] < settings.sitemap_max_urls_per_retailer:
+            sitemap_url, sitemap_lastmod = queue.popleft()
+            if sitemap_url in crawled:
+                continue
+            crawled.add(sitemap_url)
+            try:
+                for kind, loc, lastmod in iter_sitemap(sitemap_url):
+                    if kind == "sitemap":
+                        if lastmod and self._sitemap_lastmod(loc) == lastmod:
+                            stats["sitemaps_unchanged"] += 1
+                        else:
+                            queue.append((loc, lastmod))
+                        continue
+                    if extract_domain(loc) != domain or not looks_like_product(loc, config):
+                        continue
+                    batch.append((loc, lastmod))
+                    stats["urls"] += 1
+                    if len(batch) >= BATCH_SIZE:
+                        stats["added"] += self._add(batch, domain)
+                        batch = []
+                    if stats["urls"] >= settings.sitemap_max_urls_per_retailer:
+                        stats["truncated"] = 1
+                        break
+            except (requests.exceptions.RequestException, ET.ParseError, OSError, EOFError):
+                # Retried on the next refresh: the lastmod is only stored for complete crawls
+                stats["sitemaps_failed"] += 1
+                continue
+            if batch:
+                stats["added"] += self._add(batch, domain)
+                batch = []
+            if not stats["truncated"]:
+                self._mark_crawled(sitemap_url, sitemap_lastmod)
+            stats["sitemaps"] += 1
+        telemetry.incr("sitemap_index.urls_added", stats["added"])
+        return dict(stats)
+
+    def lookup(self, query: str, domain: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Indexed product URLs whose slug best matches ``query``, best first."""
+        tokens = _tokens(query)
+        if not tokens or not self.path.exists():
+            return []
+        placeholders = ",".join("?" * len(tokens))
+        domain_clause = "AND u.domain = ?" if domain else ""
+        # Pre-filter on shared tokens in SQL, then score the survivors like site search does
+        rows = self._conn().execute(
+            f"""
+            SELECT u.url, u.domain FROM postings p JOIN urls u ON u.id = p.url_id
+            WHERE p.token IN ({placeholders}) {domain_clause}
+            GROUP BY p.url_id HAVING COUNT(*) >= ?
+            ORDER BY COUNT(*) DESC LIMIT {MAX_LOOKUP_ROWS}
+            """,
+            [*tokens, *([domain] if domain else []), math.ceil(len(tokens) / 2)],
+        ).fetchall()
+        scored = [
+            {"url": url, "domain": row_domain, "score": match_score(query, " ".join(slug_tokens(url)))}
+            for url, row_domain in rows
+        ]
+        scored.sort(key=lambda r: -r["score"])
+        return scored[:limit]
+
+
+_sitemap_index: Optional[SitemapIndex] = None
+
+
+def get_sitemap_index() -> SitemapIndex:
+    """Return the process-wide sitemap index."""
+    global _sitemap_index
+    if _sitemap_index is None:
+        _sitemap_index = SitemapIndex()
+    return _sitemap_index
+
+
+def sitemap_candidates(query: str) -> List[Dict[str, Any]]:
+    """Research candidates from the local index: the best match per retailer domain."""
+    best: Dict[str, Dict[str, Any]] = {}
+    for row in get_sitemap_index().lookup(query, limit=MAX_LOOKUP_ROWS):
+        if row["score"] < settings.site_search_min_score or row["domain"] in best:
+            continue
+        best[row["domain"]] = {
+            "vendor": get_site_config(row["url"]).name,
+            "url": row["url"],
+            "price": None,
+            "notes": "Sitemap index match",
+            "score": row["score"],
+        }
+    telemetry.incr("sitemap_index.hit" if best else "sitemap_index.miss")
+    return list(best.values())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build and query the local sitemap product-URL index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    refresh = commands.add_parser("refresh", help="Crawl retailers' sitemaps into the index")
+    refresh.add_argument("--retailers", default="", help="Comma-separated SITE_CONFIGS keys (default: FANOUT_RETAILERS)")
+    lookup = commands.add_parser("lookup", help="Find indexed product URLs for a query")
+    lookup.add_argument("query")
+    lookup.add_argument("--domain", default=None)
+    args = parser.parse_args()
+
+    index = get_sitemap_index()
+    if args.command == "lookup":
+        started = time.monotonic()
+        for row in index.lookup(args.query, args.domain):
+            print(f"{row['score']:.2f}  {row['url']}")
+        print(f"({(time.monotonic() - started) * 1000:.1f} ms)", file=sys.stderr)
+        return 0
+
+    for config in fanout_retailers(args.retailers or None):
+        stats = index.refresh(config)
+        print(f"{config.name}: {stats}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
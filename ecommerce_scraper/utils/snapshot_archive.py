@@ -0,0 +1,274 @@
+"""Content-addressed archive of fetched HTML for offline re-extraction.
+
+Raw pages used to be discarded after extraction, so improving a parser meant
+fetching everything again. Pages fetched by the plain HTTP and Scrappey tiers
+(see ``utils.fetch_ladder``) are now archived under ``<cache_dir>/snapshots``:
+
+- ``objects/ab/<sha256>.zst``: one compressed object per distinct body,
+  written once however often the same page is fetched (zstd; zlib ``.zz``
+  when the optional ``zstandard`` package is missing);
+- ``index.jsonl``: one line per fetch with the canonical URL, content hash,
+  fetch time and source tier.
+
+Only product pages are archived (see ``utils.fetch_ladder``). ``compact``
+drops index entries older than ``snapshot_retention_days`` and deletes the
+objects no remaining entry refers to; ``put`` runs it at most once a day, so
+the index and the scans in ``entries`` stay bounded.
+
+Objects are read through ``mmap``, so a backfill decompresses straight from the
+page cache. Run the deterministic extractors (JSON-LD/microdata/learned
+selectors and Scrappey's listing parser) over the archive in a process pool:
+
+Usage:
+    python -m ecommerce_scraper.utils.snapshot_archive --since 2026-10-01 --workers 8 --out reextracted.jsonl
+    python -m ecommerce_scraper.utils.snapshot_archive --compact
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from ..config.settings import settings
+from .negative_cache import canonical_url
+from .telemetry import telemetry
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+COMPRESSION_LEVEL = 6
+ZSTD_SUFFIX = ".zst"
+ZLIB_SUFFIX = ".zz"
+# Seconds between automatic compactions
+COMPACT_INTERVAL_S = 24 * 3600
+
+
+def _compress(data: bytes) -> bytes:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(data)
+    return zlib.compress(data, COMPRESSION_LEVEL)
+
+
+def _decompress(data: Any, suffix: str) -> bytes:
+    if suffix == ZSTD_SUFFIX:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst snapshots: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class SnapshotArchive:
+    """Compressed HTML objects deduplicated by SHA-256, indexed by URL and time."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root else Path(settings.cache_dir) / "snapshots"
+        self._index_path = self.root / "index.jsonl"
+        self._compacted_path = self.root / ".compacted"
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> Optional[Path]:
+        directory = self.root / "objects" / digest[:2]
+        for suffix in (ZSTD_SUFFIX, ZLIB_SUFFIX):
+            path = directory / f"{digest}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    def put(self, url: str, html: str, source: str = "") -> str:
+        """Archive one fetch of ``url``; returns the content hash."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        # Compress outside the lock; skipped when the content is already archived
+        compressed = _compress(data) if self._object_path(digest) is None else None
+        entry = {"url": canonical_url(url), "sha256": digest, "fetched_at": time.time(), "source": source}
+        # Held until the index references the object, so compact() cannot delete it in between
+        with self._lock:
+            if self._object_path(digest) is None:
+                if compressed is None:
+                    compressed = _compress(data)
+                directory = self.root / "objects" / digest[:2]
+                directory.mkdir(parents=True, exist_ok=True)
+                suffix = ZSTD_SUFFIX if zstandard is not None else ZLIB_SUFFIX
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(compressed)
+                os.replace(tmp_path, directory / f"{digest}{suffix}")
+                telemetry.incr("snapshots.stored")
+                telemetry.incr("snapshots.bytes_raw", len(data))
+                telemetry.incr("snapshots.bytes_stored", len(compressed))
+            else:
+                telemetry.incr("snapshots.deduplicated")
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self._index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        self._maybe_compact()
+        return digest
+
+    def _maybe_compact(self) -> None:
+        if settings.snapshot_retention_days <= 0:
+            return
+        try:
+            last = self._compacted_path.stat().st_mtime
+        except FileNotFoundError:
+            last = 0.0
+        if time.time() - last >= COMPACT_INTERVAL_S:
+            self.compact()
+
+    def compact(self, retention_days: Optional[float] = None) -> Dict[str, int]:
+        """Drop index entries past the retention period and the objects only they referenced."""
+        days = settings.snapshot_retention_days if retention_days is None else retention_days
+        cutoff = time.time() - days * 86400 if days > 0 else None
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            kept = list(self.entries(since=cutoff))
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for entry in kept:
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(tmp_path, self._index_path)
+            referenced = {entry.get("sha256") for entry in kept}
+            removed = 0
+            for path in (self.root / "objects").glob("*/*"):
+                if path.suffix in (ZSTD_SUFFIX, ZLIB_SUFFIX) and path.stem not in referenced:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+            self._compacted_path.touch()
+        telemetry.incr("snapshots.compacted_objects", removed)
+        return {"entries": len(kept), "objects_removed": removed}
+
+    def read(self, digest: str) -> str:
+        """HTML for a content hash, decompressed from a memory map of the object."""
+        path = self._object_path(digest)
+        if path is None:
+            raise KeyError(digest)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _decompress(mapped, path.suffix).decode("utf-8")
+
+    def entries(
+        self,
+        url: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Index entries, oldest first, optionally for one URL and a time range."""
+        if not self._index_path.exists():
+            return
+        key = canonical_url(url) if url else None
+        with open(self._index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if key and entry.get("url") != key:
+                    continue
+                if since is not None and entry.get("fetched_at", 0) < since:
+                    continue
+                if until is not None and entry.get("fetched_at", 0) >= until:
+                    continue
+                yield entry
+
+    def latest(self, entries: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """The newest entry per URL."""
+        newest: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            newest[entry["url"]] = entry
+        return iter(newest.values())
+
+
+_archive: Optional[SnapshotArchive] = None
+
+
+def get_snapshot_archive() -> SnapshotArchive:
+    """Return the process-wide snapshot archive."""
+    global _archive
+    if _archive is None:
+        _archive = SnapshotArchive()
+    return _archive
+
+
+# --- Re-extraction ---
+_scrappey: Any = None
+
+
+def reextract(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the deterministic extractors over one archived snapshot (process-pool worker)."""
+    global _scrappey
+    from ..config.sites import SITE_CONFIGS, get_site_config
+    from ..tools.scrappey_tool import ScrappeyTool
+    from .fetch_ladder import parse_products
+
+    url = entry["url"]
+    result = {**entry}
+    try:
+        html = get_snapshot_archive().read(entry["sha256"])
+        if _scrappey is None:
+            _scrappey = ScrappeyTool()
+        result["products"] = parse_products(html, url)
+        config = get_site_config(url)
+        vendor = next((key for key, value in SITE_CONFIGS.items() if value is config), "")
+        result["listing_products"] = _scrappey.parse_products_html(html, vendor, "")
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def reextract_all(entries: Iterable[Dict[str, Any]], workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Re-extract snapshots in a process pool, yielding results in input order."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(reextract, entries, chunksize=16)
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Re-run deterministic extractors over archived HTML snapshots")
+    parser.add_argument("--url", help="Only snapshots of this URL")
+    parser.add_argument("--since", help="ISO date/time; only snapshots fetched at or after it")
+    parser.add_argument("--until", help="ISO date/time; only snapshots fetched before it")
+    parser.add_argument("--all", action="store_true", help="Every snapshot, not just the newest per URL")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--out", default="", help="Write JSON lines here instead of stdout")
+    parser.add_argument("--compact", action="store_true", help="Apply SNAPSHOT_RETENTION_DAYS and exit")
+    args = parser.parse_args()
+
+    archive = get_snapshot_archive()
+    if args.compact:
+        result = archive.compact()
+        print(f"Kept {result['entries']} index entries, removed {result['objects_removed']} objects", file=sys.stderr)
+        return 0
+    entries = archive.entries(args.url, _timestamp(args.since), _timestamp(args.until))
+    entries = list(entries if args.all else archive.latest(entries))
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    found = errors = 0
+    try:
+        for result in reextract_all(entries, args.workers):
+            found += bool(result.get("products") or result.get("listing_products"))
+            errors += "error" in result
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if args.out:
+            out.close()
+    print(f"Re-extracted {len(entries)} snapshots: {found} with products, {errors} errors", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
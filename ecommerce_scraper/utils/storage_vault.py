@@ -0,0 +1,114 @@
+"""Per-domain browser storage state (cookies + localStorage) kept across runs.
+
+Every Stagehand session starts with an empty browser, so retailers that need
+cookie consent, a delivery postcode or a store choice (``SiteConfig``
+``requires_cookie_consent`` / ``has_location_selection``) ask again on every
+visit. The vault saves the cookies and localStorage belonging to a retailer
+domain after a successful extraction and restores them into a new browser
+context before the first navigation to that domain:
+
+- cookies via ``context.add_cookies``;
+- localStorage via an init script that fills it for the matching origin
+  before the site's own scripts run.
+
+Entries expire after ``storage_vault_ttl_hours``; callers refresh an entry
+when consent banners show up again on a restored domain (the saved consent
+was rejected or has lapsed).
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from ..config.settings import settings
+from .json_store import JsonStore
+from .telemetry import telemetry
+
+_RESTORE_LOCAL_STORAGE_JS = """
+(() => {
+  const origins = %s;
+  const items = origins[location.origin];
+  if (!items) return;
+  try {
+    for (const { name, value } of items) {
+      if (localStorage.getItem(name) === null) localStorage.setItem(name, value);
+    }
+  } catch (e) {}
+})();
+"""
+
+
+def _belongs_to(host: str, domain: str) -> bool:
+    host = (host or "").lower().lstrip(".")
+    return host == domain or host.endswith("." + domain)
+
+
+class StorageVault:
+    """Storage state per retailer domain persisted in ``storage_state.json``."""
+
+    def __init__(self, store: Optional[JsonStore] = None):
+        self._store = store or JsonStore("storage_state.json")
+
+    def get(self, domain: str) -> Optional[Dict[str, Any]]:
+        entry = self._store.load().get(domain)
+        if not entry:
+            return None
+        if entry.get("saved_at", 0) + settings.storage_vault_ttl_hours * 3600 <= time.time():
+            return None
+        return entry
+
+    def put(self, domain: str, cookies: List[Dict[str, Any]], origins: List[Dict[str, Any]]) -> None:
+        if not domain or not (cookies or origins):
+            return
+        with self._store.transaction() as data:
+            data[domain] = {"cookies": cookies, "origins": origins, "saved_at": time.time()}
+
+    def invalidate(self, domain: str) -> None:
+        with self._store.transaction() as data:
+            data.pop(domain, None)
+
+    async def save(self, context: Any, domain: str) -> bool:
+        """Capture the context's cookies/localStorage for ``domain``."""
+        state = await context.storage_state()
+        cookies = [c for c in state.get("cookies", []) if _belongs_to(c.get("domain", ""), domain)]
+        origins = [
+            o for o in state.get("origins", [])
+            if _belongs_to(urlparse(o.get("origin", "")).hostname or "", domain)
+        ]
+        if not (cookies or origins):
+            return False
+        self.put(domain, cookies, origins)
+        telemetry.incr("storage_vault.saved")
+        return True
+
+    async def restore(self, context: Any, domain: str) -> bool:
+        """Load the saved state for ``domain`` into the context; False when none."""
+        entry = self.get(domain)
+        if entry is None:
+            telemetry.incr("storage_vault.miss")
+            return False
+        if entry.get("cookies"):
+            await context.add_cookies(entry["cookies"])
+        origins = {
+            o["origin"]: o.get("localStorage", [])
+            for o in entry.get("origins", [])
+            if o.get("origin") and o.get("localStorage")
+        }
+        if origins:
+            await context.add_init_script(script=_RESTORE_LOCAL_STORAGE_JS % json.dumps(origins))
+        telemetry.incr("storage_vault.restored")
+        return True
+
+
+_vault: Optional[StorageVault] = None
+
+
+def get_storage_vault() -> StorageVault:
+    """Return the process-wide storage vault."""
+    global _vault
+    if _vault is None:
+        _vault = StorageVault()
+    return _vault
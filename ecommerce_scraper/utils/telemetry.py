@@ -0,0 +1,81 @@
+"""In-process telemetry: counters and timing samples.
+
+A single module-level ``telemetry`` registry collects counters (cache hits,
+hedges fired, ...) and timing samples (request latency, page load time, ...).
+The flow attaches ``telemetry.snapshot()`` to the search result metadata.
+
+Usage:
+  from ecommerce_scraper.utils.telemetry import telemetry
+  telemetry.incr("schema_cache.hit")
+  telemetry.observe("latency.perplexity", 1.82)
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Iterable, Optional
+
+
+def percentile(samples: Iterable[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (``q`` in 0..1) of ``samples``; None when empty."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Telemetry:
+    """Thread-safe counters and bounded timing windows."""
+
+    def __init__(self, max_samples: int = 500):
+        self._lock = threading.Lock()
+        self._max_samples = max_samples
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._timings: Dict[str, Deque[float]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            window = self._timings.get(name)
+            if window is None:
+                window = self._timings[name] = deque(maxlen=self._max_samples)
+            window.append(float(value))
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def samples(self, name: str) -> list:
+        with self._lock:
+            return list(self._timings.get(name, ()))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus count/p50/p95/max for each timing series."""
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: list(window) for name, window in self._timings.items()}
+        summary = {}
+        for name, values in timings.items():
+            if not values:
+                continue
+            summary[name] = {
+                "count": len(values),
+                "p50": round(percentile(values, 0.5), 4),
+                "p95": round(percentile(values, 0.95), 4),
+                "max": round(max(values), 4),
+            }
+        return {"counters": counters, "timings": summary}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+# Global telemetry registry
+telemetry = Telemetry()
@@ -0,0 +1,188 @@
+"""Compact, token-bounded serialization of tool results for agents.
+
+Tool results are appended to the agent's context on every iteration, so their
+size is paid again on each following LLM call. ``compact_json``:
+
+- writes compact JSON (no indentation, UTF-8 kept as is);
+- optionally projects dicts onto the fields the agent needs;
+- drops repeated items from lists;
+- caps the output at ``max_tokens`` (approximate): long strings are shortened
+  first (URLs are kept whole), then the largest list is cut, with explicit
+  truncation markers so the agent knows data was left out. Whatever still
+  does not fit is dropped item by item and field by field, so the output is
+  always valid JSON.
+
+Usage:
+  from ecommerce_scraper.utils.tool_output import compact_json
+  return compact_json(products, fields=("name", "price", "url"))
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, List, Optional
+
+from ..config.settings import settings
+from .dom_pruning import CHARS_PER_TOKEN
+from .telemetry import telemetry
+
+# Strings longer than this are shortened before any list is cut
+MAX_STRING_CHARS = 300
+TRUNCATED = "…[truncated]"
+# Fields never shortened: a cut URL is useless to navigate to
+URL_FIELDS = ("url", "href")
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _item_key(item: Any) -> str:
+    return json.dumps(item, sort_keys=True, default=str)
+
+
+def project(data: Any, fields: Iterable[str]) -> Any:
+    """Keep only ``fields`` in every dict (recursing into lists)."""
+    keep = set(fields)
+    if isinstance(data, list):
+        return [project(item, keep) for item in data]
+    if isinstance(data, dict):
+        return {key: value for key, value in data.items() if key in keep}
+    return data
+
+
+def dedupe(data: Any) -> Any:
+    """Drop repeated items from lists, at any depth (first occurrence wins)."""
+    if isinstance(data, dict):
+        return {key: dedupe(value) for key, value in data.items()}
+    if isinstance(data, list):
+        seen = set()
+        unique: List[Any] = []
+        for item in data:
+            key = _item_key(item)
+            if key not in seen:
+                seen.add(key)
+                unique.append(dedupe(item))
+        return unique
+    return data
+
+
+def _is_url_field(key: Any) -> bool:
+    return isinstance(key, str) and (key.lower() in URL_FIELDS or key.lower().endswith("_url"))
+
+
+def _shorten_strings(data: Any, limit: int) -> Any:
+    if isinstance(data, str):
+        return data if len(data) <= limit else data[:limit] + TRUNCATED
+    if isinstance(data, dict):
+        return {
+            key: value if _is_url_field(key) else _shorten_strings(value, limit)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [_shorten_strings(item, limit) for item in data]
+    return data
+
+
+def _largest_list(data: Any) -> Optional[List[Any]]:
+    """The top-level list, or the largest list value of a top-level dict."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        lists = [value for value in data.values() if isinstance(value, list)]
+        return max(lists, key=lambda value: len(_dumps(value)), default=None)
+    return None
+
+
+def _cut_list(data: Any, max_chars: int) -> Any:
+    """Keep as many leading items of the largest list as fit, plus a marker item."""
+    items = _largest_list(data)
+    if not items:
+        return data
+    original = list(items)
+
+    def with_items(count: int) -> Any:
+        kept = original[:count] + [f"…[{len(original) - count} more items truncated]"]
+        if isinstance(data, list):
+            return kept
+        return {key: (kept if value is items else value) for key, value in data.items()}
+
+    low, high = 0, len(original)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if len(_dumps(with_items(middle))) <= max_chars:
+            low = middle
+        else:
+            high = middle - 1
+    return with_items(low)
+
+
+def _is_marker(item: Any) -> bool:
+    return isinstance(item, str) and item.startswith("…[") and item.endswith("truncated]")
+
+
+def _drop_until_fits(data: Any, max_chars: int) -> Any:
+    """Drop trailing list items, then the largest dict fields, until ``data`` fits."""
+    if len(_dumps(data)) <= max_chars:
+        return data
+    if isinstance(data, list):
+        items = list(data)
+        # Keep the truncation marker at the end while dropping the items before it
+        marker = [items.pop()] if items and _is_marker(items[-1]) else []
+        while len(items) > 1 and len(_dumps(items + marker)) > max_chars:
+            items.pop()
+        if items and len(_dumps(items + marker)) > max_chars:
+            items = [_drop_until_fits(items[0], max_chars - len(_dumps(marker)) - 2)]
+        if len(_dumps(items + marker)) > max_chars:
+            items = [] if len(_dumps(marker)) > max_chars else marker
+            return items
+        return items + marker
+    if isinstance(data, dict):
+        fields = dict(data)
+        while fields and len(_dumps(fields)) > max_chars:
+            largest = max(fields, key=lambda key: len(_dumps(fields[key])))
+            value = fields[largest]
+            if isinstance(value, (list, dict)) and value:
+                overflow = len(_dumps(fields)) - max_chars
+                smaller = _drop_until_fits(value, len(_dumps(value)) - overflow)
+                if len(_dumps(smaller)) < len(_dumps(value)):
+                    fields[largest] = smaller
+                    continue
+            del fields[largest]
+        return fields
+    if isinstance(data, str):
+        return data[: max(0, max_chars - len(TRUNCATED) - 2)] + TRUNCATED
+    return None
+
+
+def compact_json(
+    data: Any,
+    fields: Optional[Iterable[str]] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """Serialize ``data`` for an agent: projected, de-duplicated, compact and capped.
+
+    ``max_tokens`` defaults to ``settings.tool_output_max_tokens``; 0 disables
+    the cap.
+    """
+    if max_tokens is None:
+        max_tokens = settings.tool_output_max_tokens
+    if fields:
+        data = project(data, fields)
+    data = dedupe(data)
+    text = _dumps(data)
+    if not max_tokens or len(text) <= max_tokens * CHARS_PER_TOKEN:
+        return text
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    telemetry.incr("tool_output.truncated")
+    telemetry.incr("tool_output.chars_dropped", len(text))
+    data = _shorten_strings(data, MAX_STRING_CHARS)
+    text = _dumps(data)
+    if len(text) > max_chars:
+        data = _cut_list(data, max_chars)
+        text = _dumps(data)
+    if len(text) > max_chars:
+        text = _dumps(_drop_until_fits(data, max_chars))
+    telemetry.incr("tool_output.chars_dropped", -len(text))
+    return text
@@ -0,0 +1,166 @@
+"""Per-retailer macros distilled from successful agent trajectories.
+
+While the extraction agent works on a retailer, ``SimplifiedStagehandTool``
+records its successful operations. When the retailer's products then pass
+validation, the trajectory is compiled into a macro: observe calls and
+exploratory extracts are dropped, and the product query / retailer URL are
+replaced by ``{product_query}``, ``{product_query_url}`` and ``{retailer_url}``
+placeholders. Trajectories that navigate to a hard-coded URL or act on
+hard-coded product text only work for the query they were recorded on and are
+not compiled.
+
+On the next search the flow replays the macro for that domain directly
+(navigate -> act ... -> extract) and hands control to the agent only when a
+step fails or no products come back. Macros that keep failing are dropped.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote_plus
+
+from .json_store import JsonStore
+from .telemetry import telemetry
+
+MACRO_OPERATIONS = ("navigate", "act", "extract")
+# Parameters recorded into macros, most specific first
+MACRO_PARAMETERS = ("retailer_url", "product_query_url", "product_query")
+_PLACEHOLDER_RE = re.compile(r"\{(?:%s)\}" % "|".join(MACRO_PARAMETERS))
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Query words too common to mark an instruction as product-specific
+_COMMON_WORDS = {"and", "for", "the", "with", "new", "pack", "set"}
+
+
+def macro_params(product_query: str, retailer_url: str) -> Dict[str, str]:
+    return {
+        "retailer_url": retailer_url,
+        "product_query_url": quote_plus(product_query),
+        "product_query": product_query,
+    }
+
+
+def _parameterize(value: Any, params: Dict[str, str]) -> Any:
+    if not isinstance(value, str):
+        return value
+    for name in MACRO_PARAMETERS:
+        literal = params.get(name)
+        if literal:
+            value = re.sub(re.escape(literal), "{" + name + "}", value, flags=re.I)
+    return value
+
+
+def _fill(value: Any, params: Dict[str, str]) -> Any:
+    if not isinstance(value, str):
+        return value
+    for name in MACRO_PARAMETERS:
+        value = value.replace("{" + name + "}", params.get(name, ""))
+    return value
+
+
+def _query_words(product_query: str) -> set:
+    return {word for word in _WORD_RE.findall(product_query.lower()) if len(word) >= 3} - _COMMON_WORDS
+
+
+def _portable(step: Dict[str, Any], params: Dict[str, str]) -> bool:
+    """Whether a parameterized step works for other queries on the same retailer."""
+    if step["operation"] == "navigate":
+        url = step.get("url", "")
+        return url == "{retailer_url}" or "{product_query}" in url or "{product_query_url}" in url
+    if step["operation"] == "act":
+        text = " ".join(str(step.get(key, "")) for key in ("action", "instruction"))
+        words = set(_WORD_RE.findall(_PLACEHOLDER_RE.sub(" ", text).lower()))
+        return not words & _query_words(params.get("product_query", ""))
+    return True
+
+
+def compile_macro(trajectory: List[Dict[str, Any]], params: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+    """Turn a recorded trajectory into parameterized steps ending in one extract."""
+    steps = [
+        {key: _parameterize(value, params) for key, value in step.items() if value not in (None, "", {})}
+        for step in trajectory
+        if step.get("operation") in MACRO_OPERATIONS and not step.get("variables")
+    ]
+    extract_positions = [i for i, step in enumerate(steps) if step["operation"] == "extract"]
+    if not extract_positions:
+        return None
+    last_extract = extract_positions[-1]
+    # Only the final extract produced the accepted products
+    steps = [s for i, s in enumerate(steps[: last_extract + 1]) if s["operation"] != "extract" or i == last_extract]
+    # Collapse immediate repeats (agents often re-issue the same navigate/act)
+    compiled: List[Dict[str, Any]] = []
+    for step in steps:
+        if not compiled or compiled[-1] != step:
+            compiled.append(step)
+    if compiled[0]["operation"] != "navigate":
+        return None
+    if not all(_portable(step, params) for step in compiled):
+        telemetry.incr("macro.rejected")
+        return None
+    return compiled
+
+
+class MacroStore:
+    """Compiled macros per domain persisted in ``macros.json``."""
+
+    def __init__(self, store: Optional[JsonStore] = None):
+        self._store = store or JsonStore("macros.json")
+
+    def get(self, domain: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._store.load().get(domain)
+        return entry.get("steps") if entry else None
+
+    def record(self, domain: str, steps: List[Dict[str, Any]]) -> None:
+        """Store a macro compiled from a trajectory that passed validation."""
+        if not domain or not steps:
+            return
+        with self._store.transaction() as data:
+            entry = data.get(domain)
+            if entry and entry.get("steps") == steps:
+                entry["successes"] = entry.get("successes", 0) + 1
+            else:
+                data[domain] = {"steps": steps, "successes": 1, "failures": 0}
+            data[domain]["updated_at"] = time.time()
+        telemetry.incr("macro.recorded")
+
+    def mark(self, domain: str, succeeded: bool) -> None:
+        """Record the outcome of a replay; drop macros that fail more than they work."""
+        with self._store.transaction() as data:
+            entry = data.get(domain)
+            if not entry:
+                return
+            key = "successes" if succeeded else "failures"
+            entry[key] = entry.get(key, 0) + 1
+            if entry.get("failures", 0) > entry.get("successes", 0):
+                del data[domain]
+                telemetry.incr("macro.dropped")
+
+
+def run_macro(tool: Any, steps: List[Dict[str, Any]], params: Dict[str, str]) -> Optional[Any]:
+    """Replay macro steps through the Stagehand tool; parsed extract output or None on failure."""
+    result: Any = None
+    for step in steps:
+        kwargs = {key: _fill(value, params) for key, value in step.items()}
+        try:
+            result = tool._run(**kwargs)
+        except Exception:
+            return None
+        if not isinstance(result, str) or result.startswith("Error"):
+            return None
+    try:
+        return json.loads(result)
+    except (TypeError, ValueError):
+        return None
+
+
+_macros: Optional[MacroStore] = None
+
+
+def get_macro_store() -> MacroStore:
+    """Return the process-wide macro store."""
+    global _macros
+    if _macros is None:
+        _macros = MacroStore()
+    return _macros
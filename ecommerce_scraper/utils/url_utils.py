@@ -69,6 +69,22 @@ def extract_base_url(url: str) -> str:
     return f"{parsed.scheme}://{parsed.netloc}"
 
 
+def extract_domain(url: str) -> str:
+    """Extract the registrable host of a URL (lowercased, without ``www.``).
+
+    Args:
+        url: Full URL
+
+    Returns:
+        Domain such as ``argos.co.uk``; empty string when the URL has no host
+    """
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
 def is_product_url(url: str) -> bool:
     """Check if URL is a product page.
     
@@ -0,0 +1,162 @@
+"""Pool of headless Chrome WebDrivers for the Selenium fallback tool.
+
+Starting Chrome through Selenium takes seconds, and the crewai-tools
+``SeleniumScrapingTool`` started one per agent at construction (whether or not
+the agent ever fell back to Selenium) and never quit it. The pool starts
+drivers lazily on first checkout and hands them back out between calls:
+
+- at most ``selenium_pool_size`` drivers are checked out at once; callers
+  wait up to ``selenium_acquire_timeout_seconds`` for a free one;
+- an idle driver is health-checked before reuse and replaced when dead;
+- a driver is retired after ``selenium_driver_max_uses`` checkouts (memory
+  growth) or when an error escapes its checkout.
+
+Usage:
+    with get_webdriver_pool().driver() as driver:
+        driver.get(url)
+"""
+
+from __future__ import annotations
+
+import atexit
+import importlib.util
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+from ..config.settings import settings
+from .telemetry import telemetry
+
+CHROME_ARGS = [
+    "--headless=new",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--window-size=1366,900",
+    "--blink-settings=imagesEnabled=false",
+]
+
+
+def selenium_available() -> bool:
+    """Whether the optional ``selenium`` package is installed (without importing it)."""
+    return importlib.util.find_spec("selenium") is not None
+
+
+def _chrome_driver() -> Any:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    for arg in CHROME_ARGS:
+        options.add_argument(arg)
+    options.page_load_strategy = "eager"  # return at DOMContentLoaded
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(settings.selenium_page_load_timeout_seconds)
+    return driver
+
+
+class _PooledDriver:
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.uses = 0
+
+
+class WebDriverPool:
+    """Lazily created, reused WebDrivers with a concurrency cap."""
+
+    def __init__(
+        self,
+        size: int,
+        max_uses: int,
+        factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self._factory = factory or _chrome_driver
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: List[_PooledDriver] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Check out a healthy driver; it is returned (or retired) on exit."""
+        timeout = settings.selenium_acquire_timeout_seconds if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            telemetry.incr("webdriver_pool.exhausted")
+            raise TimeoutError(f"No WebDriver available within {timeout:g}s")
+        pooled: Optional[_PooledDriver] = None
+        try:
+            pooled = self._checkout()
+            pooled.uses += 1
+            yield pooled.driver
+        except Exception:
+            # The page or browser may be in any state; do not hand it out again
+            if pooled is not None:
+                self._quit(pooled)
+                pooled = None
+            raise
+        finally:
+            if pooled is not None:
+                self._checkin(pooled)
+            self._slots.release()
+
+    def _checkout(self) -> _PooledDriver:
+        while True:
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                telemetry.incr("webdriver_pool.created")
+                return _PooledDriver(self._factory())
+            if self._healthy(pooled):
+                telemetry.incr("webdriver_pool.reused")
+                return pooled
+            telemetry.incr("webdriver_pool.unhealthy")
+            self._quit(pooled)
+
+    def _checkin(self, pooled: _PooledDriver) -> None:
+        if pooled.uses >= self.max_uses:
+            telemetry.incr("webdriver_pool.retired")
+            self._quit(pooled)
+            return
+        try:
+            pooled.driver.delete_all_cookies()
+        except Exception:
+            self._quit(pooled)
+            return
+        with self._lock:
+            self._idle.append(pooled)
+
+    @staticmethod
+    def _healthy(pooled: _PooledDriver) -> bool:
+        try:
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(pooled: _PooledDriver) -> None:
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Quit all idle drivers."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._quit(pooled)
+
+
+_pool: Optional[WebDriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_webdriver_pool() -> WebDriverPool:
+    """Return the process-wide WebDriver pool (drivers are quit at exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WebDriverPool(settings.selenium_pool_size, settings.selenium_driver_max_uses)
+            atexit.register(_pool.close)
+        return _pool
@@ -6,6 +6,8 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 import re
+import threading
+import time
 from pydantic import BaseModel, Field
 
 from crewai import Flow, Crew
@@ -18,9 +20,32 @@ from ..agents.product_search_validation_agent import ProductSearchValidationAgen
 from ..schemas.product_search_result import ProductSearchResult, ProductSearchItem
 from ..tools.simplified_stagehand_tool import SimplifiedStagehandTool
 from ..ai_logging.error_logger import get_error_logger
+from ..config.settings import settings
+from ..utils.deadline import ABANDON_GRACE_SECONDS, Deadline, DeadlineExceeded, run_with_deadline
+from ..utils.fetch_ladder import BROWSER, demote, fetch_products
+from ..utils.research_fanout import CandidateStream, fanout_retailers, site_search_candidate
+from ..utils.negative_cache import BLOCKED, COMPARISON_SITE, SOFT_404, get_negative_cache
+from ..utils.retailer_health import classify_failure, get_retailer_health
+from ..utils.sitemap_index import sitemap_candidates
+from ..utils.site_search import search_site, search_url
+from ..utils.trajectory_macros import compile_macro, get_macro_store, macro_params, run_macro
+from ..utils.url_utils import extract_domain
+from ..utils.resilience import BROWSERBASE, FLOW, get_circuit_breaker, get_retry_budget, resilience_snapshot
+from ..utils.telemetry import telemetry
 
 logger = logging.getLogger(__name__)
 
+# Share of the remaining query budget granted to each step. Per-retailer steps
+# first divide the remaining budget by the number of retailers left, so one slow
+# retailer cannot starve the others.
+STEP_BUDGET_SHARES = {
+    "research": 0.3,
+    "extraction": 0.55,
+    "validation": 0.35,
+    "feedback": 0.1,
+}
+PER_RETAILER_STEPS = {"extraction", "validation", "feedback"}
+
 
 class ProductSearchState(BaseModel):
     """State management for product search flow."""
@@ -28,8 +53,12 @@ class ProductSearchState(BaseModel):
     # Input parameters
     product_query: str = Field("", description="Product to search for")
     max_retailers: int = Field(5, description="Maximum retailers to search")
-    max_retries: int = Field(3, description="Maximum retry attempts per retailer")
+    # Retries also draw on the process-wide flow retry budget (RETRY_BUDGET_RATIO),
+    # so a retailer can get fewer than max_retries attempts when other searches
+    # have spent it; each denied retry is counted in retries_denied.
+    max_retries: int = Field(3, description="Maximum attempts per retailer (capped by the flow retry budget)")
     session_id: str = Field("", description="Session identifier")
+    deadline_seconds: float = Field(0.0, description="Time budget for the whole search in seconds (0 uses settings)")
     
     # Flow state
     current_retailer_index: int = Field(0, description="Current retailer being processed")
@@ -54,6 +83,8 @@ class ProductSearchState(BaseModel):
     retailers_searched: int = Field(0, description="Number of retailers searched")
     total_attempts: int = Field(0, description="Total attempts made")
     success_rate: float = Field(0.0, description="Success rate of searches")
+    deadline_exceeded: bool = Field(False, description="Whether the search stopped early on its deadline")
+    retries_denied: int = Field(0, description="Retries skipped because the flow retry budget was spent")
 
 
 class ProductSearchFlow(Flow[ProductSearchState]):
@@ -78,6 +109,17 @@ class ProductSearchFlow(Flow[ProductSearchState]):
         # Shared tools and session management
         self._stagehand_tool = None
         self._shared_session_id = None
+        # (worker, tool) pairs left to steps that outran their deadline
+        self._abandoned_tools: List[Any] = []
+
+        # Query deadline, created in initialize_search
+        self._deadline: Optional[Deadline] = None
+
+        # Latency and failure class of the latest extraction, for retailer health
+        self._last_extraction: Dict[str, Any] = {}
+
+        # Research sources still running while extraction starts
+        self._research_stream: Optional[CandidateStream] = None
     
     def _safe_parse_json(self, result: Any, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Parse CrewAI result to JSON dict safely, salvaging when needed.
@@ -203,6 +245,46 @@ class ProductSearchFlow(Flow[ProductSearchState]):
             return []
         return []
 
+    def _create_research_crew(self) -> Crew:
+        """Crew running the ResearchAgent's Perplexity research task."""
+        research_task = self._get_research_agent().create_retailer_research_task(
+            product_query=self.state.product_query,
+            max_retailers=self.state.max_retailers,
+            session_id=self.state.session_id
+        )
+        return Crew(
+            agents=[self._get_research_agent().get_agent()],
+            tasks=[research_task],
+            verbose=self.verbose
+        )
+
+    def _perplexity_research(self, research_crew: Crew) -> List[Dict[str, Any]]:
+        """Run the research crew (a CandidateStream source) and parse its retailers.
+
+        Research only calls Perplexity, so a crew outliving its deadline on the
+        stream thread must not take the Stagehand tool extraction is using.
+        """
+        try:
+            result = self._run_in_step("research", research_crew.kickoff, shares_tool=False)
+        except DeadlineExceeded:
+            return []
+        except Exception as e:
+            self.error_logger.error(f"Retailer research failed: {str(e)}", exc_info=True)
+            raise
+
+        # Prefer pydantic output when available
+        if hasattr(result, 'pydantic') and getattr(result, 'pydantic') is not None:
+            research_data = result.pydantic.model_dump()
+        else:
+            # Parse research results safely
+            research_data = self._safe_parse_json(result, default={"retailers": []})
+
+        # Prefer pydantic `retailers` when present, else parse raw output
+        retailers = research_data.get('retailers')
+        if isinstance(retailers, list) and retailers:
+            return retailers
+        return self._parse_retailers_from_raw(research_data)
+
     def _get_stagehand_tool(self):
         """Get or create shared Stagehand tool instance."""
         if self._stagehand_tool is None:
@@ -215,10 +297,7 @@ class ProductSearchFlow(Flow[ProductSearchState]):
     def _get_research_agent(self) -> ResearchAgent:
         """Get or create ResearchAgent instance."""
         if self._research_agent is None:
-            self._research_agent = ResearchAgent(
-                stagehand_tool=self._get_stagehand_tool(),
-                verbose=self.verbose
-            )
+            self._research_agent = ResearchAgent(verbose=self.verbose)
         return self._research_agent
     
     def _get_extraction_agent(self) -> ExtractionAgent:
@@ -239,13 +318,283 @@ class ProductSearchFlow(Flow[ProductSearchState]):
             )
         return self._validation_agent
 
+    # --- Deadline helpers ---
+    def _step_deadline(self, step: str) -> Deadline:
+        """Carve this step's share out of the remaining query budget."""
+        share = STEP_BUDGET_SHARES.get(step, 0.25)
+        retailers_left = 1
+        if step in PER_RETAILER_STEPS:
+            retailers_left = max(1, len(self.state.retailers) - self.state.current_retailer_index)
+        budget = self._deadline.remaining() / retailers_left * share
+        # The child deadline is still capped by whatever remains of the query budget
+        return self._deadline.child(max(budget, settings.min_step_seconds), label=step)
+
+    def _deadline_expired(self) -> bool:
+        """Whether the query deadline is spent (records it on the state)."""
+        if self._deadline is not None and self._deadline.expired():
+            self.state.deadline_exceeded = True
+        return self.state.deadline_exceeded
+
+    def _kickoff(self, crew: Crew, step: str) -> Any:
+        """Run ``crew.kickoff()`` bounded by the step's deadline.
+
+        Raises DeadlineExceeded when the step (or the whole query) runs out of time;
+        the step deadline is cancelled so in-flight tool and LLM calls fail fast.
+        """
+        return self._run_in_step(step, crew.kickoff)
+
+    def _run_in_step(self, step: str, fn: Any, *args: Any, shares_tool: bool = True) -> Any:
+        """Run ``fn(*args)`` bounded by the step's deadline (see ``_kickoff``).
+
+        ``shares_tool`` says whether ``fn`` drives the shared Stagehand tool; if it
+        is still running after the deadline, later steps get a fresh tool.
+        """
+        if self._deadline is None:
+            return fn(*args)
+        try:
+            return run_with_deadline(fn, self._step_deadline(step), *args)
+        except DeadlineExceeded as e:
+            if e.worker is not None and shares_tool:
+                self._abandon_stagehand_tool(e.worker)
+            self._deadline_expired()
+            raise
+
+    def _abandon_stagehand_tool(self, worker: threading.Thread) -> None:
+        """Leave the shared tool to a step still running past its deadline.
+
+        The orphaned worker keeps driving that tool's page, trajectory and memo
+        (and its agents' LLM calls), so later steps get a fresh tool, browser
+        session and agents. The old tool is closed in ``close_resources``.
+        """
+        if self._stagehand_tool is not None:
+            self._abandoned_tools.append((worker, self._stagehand_tool))
+        self._stagehand_tool = None
+        self._shared_session_id = None
+        self._extraction_agent = None
+        self._validation_agent = None
+        telemetry.incr("deadline.abandoned_steps")
+
+    def _deadline_error(self, step: str) -> Dict[str, Any]:
+        """Step result used once the query deadline is spent."""
+        self.state.deadline_exceeded = True
+        if self.verbose:
+            self.console.print(f"[red]⏱️ Search deadline exceeded during {step}; finalizing with partial results[/red]")
+        return {"action": "error", "error": f"Search deadline exceeded during {step}", "deadline_exceeded": True}
+
+    # --- Research stream helpers ---
+    def _research_wait_timeout(self) -> Optional[float]:
+        """How long to wait for research sources: the research step's share of the budget."""
+        return self._step_deadline("research").remaining() if self._deadline is not None else None
+
+    def _more_retailers(self) -> bool:
+        """Whether a retailer is left to extract, after taking in late research candidates."""
+        stream = self._research_stream
+        if stream is not None:
+            exhausted = self.state.current_retailer_index >= len(self.state.retailers)
+            if exhausted and stream.pending and not self._deadline_expired():
+                stream.wait(timeout=self._research_wait_timeout())
+            late = self._prioritize_retailers(stream.take())
+            if late:
+                self.state.retailers.extend(late)
+                if self.verbose:
+                    self.console.print(f"[green]✅ Research added {len(late)} more retailers[/green]")
+            if not stream.pending:
+                self._close_research_stream()
+        return self.state.current_retailer_index < len(self.state.retailers)
+
+    def _acquire_flow_retry(self, reason: str) -> bool:
+        """Take a token from the flow retry budget, recording the retry it denies."""
+        if get_retry_budget(FLOW).try_acquire():
+            return True
+        self.state.retries_denied += 1
+        telemetry.incr("flow.retry_denied")
+        if self.verbose:
+            self.console.print(f"[yellow]⚠️ Flow retry budget spent; skipping {reason} retry[/yellow]")
+        return False
+
+    def _close_research_stream(self) -> None:
+        if self._research_stream is not None:
+            self._research_stream.close()
+            self._research_stream = None
+
+    # --- Retailer selection, macros and outcome tracking ---
+    def _drop_known_bad_retailers(self, retailers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop retailers whose URL or domain is in the cross-run negative cache."""
+        if not settings.enable_negative_cache or not retailers:
+            return retailers
+        cache = get_negative_cache()
+        kept = []
+        for retailer in retailers:
+            url = retailer.get('url') or ''
+            reason = cache.lookup(url) if url.startswith('http') else None
+            if reason is None:
+                kept.append(retailer)
+                continue
+            telemetry.incr("negative_cache.hit")
+            if reason == COMPARISON_SITE:
+                # Remember it so the research prompt excludes it next time
+                cache.add_domain(extract_domain(url), COMPARISON_SITE)
+            if self.verbose:
+                self.console.print(f"[yellow]⏭️ Skipping {retailer.get('vendor', 'Unknown')} ({reason})[/yellow]")
+        return kept
+
+    def _prioritize_retailers(self, retailers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop known-bad retailers, then order by expected value and skip unhealthy domains."""
+        retailers = self._drop_known_bad_retailers(retailers)
+        if not settings.enable_retailer_health or not retailers:
+            return retailers
+        try:
+            ordered, skipped = get_retailer_health().rank(retailers)
+        except Exception as e:
+            self.error_logger.error(f"Retailer health ranking failed: {e}", exc_info=True)
+            return retailers
+        if skipped:
+            telemetry.incr("retailer_health.skipped", len(skipped))
+            if self.verbose:
+                names = ", ".join(r.get('vendor', 'Unknown') for r in skipped)
+                self.console.print(f"[yellow]⏭️ Skipping unhealthy retailers: {names}[/yellow]")
+        return ordered
+
+    def _note_extraction(
+        self,
+        started: float,
+        extraction_data: Optional[Dict[str, Any]] = None,
+        macro: bool = False,
+        tier: Optional[str] = None,
+    ) -> None:
+        """Remember how the latest extraction went until validation records it."""
+        self._last_extraction = {
+            "latency_s": time.monotonic() - started,
+            "failure": classify_failure((extraction_data or {}).get('errors')),
+            "macro": macro,
+            # Fetch ladder tier that produced the products (None for browser extractions)
+            "tier": tier,
+            # Agent tool calls recorded since start_recording (empty for macro replays)
+            "trajectory": self._get_stagehand_tool().stop_recording(),
+        }
+
+    def _run_fetch_ladder(self, retailer_url: str, probe: bool = False):
+        """Try the cheap fetch tiers for the retailer; (tier, products), [] when the agent is needed.
+
+        ``probe`` ignores the learned tier and starts from plain HTTP (see ``fetch_products``).
+        """
+        if not settings.enable_fetch_ladder:
+            return BROWSER, []
+        try:
+            return self._run_in_step("extraction", fetch_products, retailer_url, probe, shares_tool=False)
+        except DeadlineExceeded:
+            return BROWSER, []
+        except Exception as e:
+            self.error_logger.error(f"Fetch ladder failed for {retailer_url}: {e}", exc_info=True)
+            return BROWSER, []
+
+    def _search_url(self, retailer_url: str) -> Optional[str]:
+        """The known retailer's search results URL for the query, or None."""
+        if not settings.enable_direct_site_search:
+            return None
+        return search_url(retailer_url, self.state.product_query)
+
+    def _run_site_search(self, retailer_url: str) -> Optional[str]:
+        """Product URL of the best match on the retailer's own search page, or None."""
+        if not self._search_url(retailer_url):
+            return None
+        try:
+            match = self._run_in_step(
+                "extraction", search_site, retailer_url, self.state.product_query, shares_tool=False
+            )
+        except DeadlineExceeded:
+            return None
+        except Exception as e:
+            self.error_logger.error(f"Site search failed for {retailer_url}: {e}", exc_info=True)
+            return None
+        if not match or match["url"] == retailer_url:
+            return None
+        if self.verbose:
+            self.console.print(f"[cyan]🔎 Site search matched {match['name']} (score {match['score']:.2f})[/cyan]")
+        return match["url"]
+
+    def _run_retailer_macro(self, retailer_url: str) -> List[Dict[str, Any]]:
+        """Replay the recorded macro for the retailer's domain; [] when absent or failed."""
+        if not settings.enable_retailer_macros:
+            return []
+        domain = extract_domain(retailer_url)
+        steps = get_macro_store().get(domain)
+        if not steps:
+            return []
+        telemetry.incr("macro.replayed")
+        params = macro_params(self.state.product_query, retailer_url)
+        try:
+            data = self._run_in_step("extraction", run_macro, self._get_stagehand_tool(), steps, params)
+        except DeadlineExceeded:
+            data = None
+        if isinstance(data, dict):
+            data = data.get('products') or data.get('items') or [data]
+        products = [p for p in (data or []) if isinstance(p, dict) and p.get('name') and p.get('price')]
+        if not products:
+            # Hand the retailer to the agent
+            telemetry.incr("macro.failed")
+            get_macro_store().mark(domain, False)
+            return []
+        for product in products:
+            product.setdefault('url', retailer_url)
+            product.setdefault('website', domain)
+        return products
+
+    def _record_retailer_outcome(self, retailer_url: str, passed: bool) -> None:
+        """Feed the macro store, negative cache and retailer health scoreboard (best effort)."""
+        outcome, self._last_extraction = self._last_extraction, {}
+        failure = outcome.get("failure")
+        if outcome.get("tier") and not passed:
+            # A cheap tier gave products that failed validation: skip it next time
+            try:
+                demote(retailer_url, outcome["tier"])
+            except Exception as e:
+                self.error_logger.error(f"Failed to update fetch tier: {e}", exc_info=True)
+        if settings.enable_retailer_macros:
+            try:
+                domain = extract_domain(retailer_url)
+                if outcome.get("macro"):
+                    get_macro_store().mark(domain, passed)
+                elif passed and outcome.get("trajectory"):
+                    params = macro_params(self.state.product_query, retailer_url)
+                    get_macro_store().record(domain, compile_macro(outcome["trajectory"], params))
+            except Exception as e:
+                self.error_logger.error(f"Failed to update retailer macro: {e}", exc_info=True)
+        if settings.enable_negative_cache and failure and not passed:
+            try:
+                if failure == BLOCKED:
+                    get_negative_cache().add_domain(extract_domain(retailer_url), BLOCKED)
+                elif failure == SOFT_404:
+                    get_negative_cache().add_url(retailer_url, SOFT_404)
+            except Exception as e:
+                self.error_logger.error(f"Failed to update negative cache: {e}", exc_info=True)
+        if not settings.enable_retailer_health:
+            return
+        try:
+            get_retailer_health().record_attempt(
+                extract_domain(retailer_url),
+                passed=passed,
+                latency_s=outcome.get("latency_s"),
+                failure=outcome.get("failure"),
+            )
+        except Exception as e:
+            self.error_logger.error(f"Failed to record retailer health: {e}", exc_info=True)
+
     # --- Resource cleanup ---
     def close_resources(self):
         """Close external resources like Browserbase/Stagehand sessions."""
+        self._close_research_stream()
+        abandoned, self._abandoned_tools = self._abandoned_tools, []
+        for worker, tool in abandoned:
+            # Give the orphaned step a moment to finish before pulling its browser away
+            worker.join(ABANDON_GRACE_SECONDS)
+            self._close_stagehand_tool(tool)
+        tool, self._stagehand_tool = self._stagehand_tool, None
+        if tool is not None:
+            self._close_stagehand_tool(tool)
+
+    def _close_stagehand_tool(self, tool: SimplifiedStagehandTool) -> None:
         try:
-            tool = self._stagehand_tool
-            if tool is None:
-                return
             # Close async tool.close() safely from sync context
             try:
                 loop = asyncio.get_running_loop()
@@ -260,8 +609,6 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 asyncio.run(tool.close())
         except Exception as e:
             self.error_logger.error(f"Failed to close Stagehand session: {e}", exc_info=True)
-        finally:
-            self._stagehand_tool = None
 
     def _generate_targeted_feedback(self, validation_data: Dict[str, Any]):
         """Generate targeted feedback for both ResearchAgent and ExtractionAgent."""
@@ -287,7 +634,7 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 verbose=self.verbose
             )
 
-            result = feedback_crew.kickoff()
+            result = self._kickoff(feedback_crew, "feedback")
 
             # Prefer pydantic output; otherwise salvage JSON safely
             if hasattr(result, 'pydantic') and getattr(result, 'pydantic') is not None:
@@ -323,6 +670,10 @@ class ProductSearchFlow(Flow[ProductSearchState]):
             # Set shared session ID from state (populated by kickoff)
             self._shared_session_id = self.state.session_id
 
+            # Start the query deadline; steps take their share of what remains
+            budget = self.state.deadline_seconds or settings.search_deadline_seconds
+            self._deadline = Deadline(budget, label="query") if budget > 0 else None
+
             if self.verbose:
                 self.console.print("[green]✅ Product search initialized[/green]")
 
@@ -340,41 +691,30 @@ class ProductSearchFlow(Flow[ProductSearchState]):
             if self.verbose:
                 self.console.print(f"[blue]🔬 Researching Retailers[/blue]")
             
-            # Create retailer research task
-            research_task = self._get_research_agent().create_retailer_research_task(
-                product_query=self.state.product_query,
-                max_retailers=self.state.max_retailers,
-                session_id=self.state.session_id
-            )
-
-            # Create and execute research crew
-            research_crew = Crew(
-                agents=[self._get_research_agent().get_agent()],
-                tasks=[research_task],
-                verbose=self.verbose
-            )
-            
-            result = research_crew.kickoff()
-
-            # Prefer pydantic output when available
-            if hasattr(result, 'pydantic') and getattr(result, 'pydantic') is not None:
-                research_data = result.pydantic.model_dump()
-            else:
-                # Parse research results safely
-                research_data = self._safe_parse_json(result, default={"retailers": []})
-            
-            # Prefer pydantic `retailers` when present, else parse raw output
-            retailers = research_data.get('retailers')
-            if isinstance(retailers, list) and retailers:
-                self.state.retailers = retailers
-            else:
-                self.state.retailers = self._parse_retailers_from_raw(research_data)
+            sources = {source.strip() for source in settings.research_sources.split(",")}
+            stream = CandidateStream(limit=self.state.max_retailers)
+            if "perplexity" in sources:
+                stream.submit("perplexity", self._perplexity_research, self._create_research_crew())
+            if "sitemap" in sources:
+                stream.submit("sitemap", sitemap_candidates, self.state.product_query)
+            if "site_search" in sources:
+                for config in fanout_retailers():
+                    stream.submit("site_search", site_search_candidate, config, self.state.product_query)
+            self._research_stream = stream
+
+            # Start extracting once the first confident matches are in; slower sources join later
+            stream.wait(first_k=settings.fanout_first_k, timeout=self._research_wait_timeout())
+            if self._deadline_expired():
+                return self._deadline_error("research")
+            self.state.retailers = self._prioritize_retailers(stream.take())
             
             if self.verbose:
                 self.console.print(f"[green]✅ Found {len(self.state.retailers)} retailers[/green]")
             
             return {"action": "extract_products", "retailers_found": len(self.state.retailers)}
-            
+
+        except DeadlineExceeded:
+            return self._deadline_error("research")
         except Exception as e:
             error_msg = f"Retailer research failed: {str(e)}"
             self.error_logger.error(error_msg, exc_info=True)
@@ -386,9 +726,12 @@ class ProductSearchFlow(Flow[ProductSearchState]):
         try:
             if research_result.get("action") == "error":
                 return {"action": "error", "error": research_result.get("error")}
+
+            if self._deadline_expired():
+                return {"action": "finalize", "reason": "deadline_exceeded"}
             
             # Check if we have retailers to search
-            if not self.state.retailers or self.state.current_retailer_index >= len(self.state.retailers):
+            if not self._more_retailers():
                 return {"action": "finalize", "reason": "no_more_retailers"}
             
             current_retailer = self.state.retailers[self.state.current_retailer_index]
@@ -400,19 +743,68 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 self.state.current_retailer_index += 1
                 self.state.current_attempt = 1
                 self.state.retailers_searched += 1
-                if self.state.current_retailer_index >= len(self.state.retailers):
+                if not self._more_retailers():
                     return {"action": "finalize", "reason": "no_more_retailers"}
                 return {"action": "extract_products", "skipped": retailer_name}
             
+            if self.state.current_attempt == 1:
+                get_retry_budget(FLOW).record_request()
+
             if self.verbose:
                 self.console.print(f"[blue]📦 Extracting from {retailer_name}[/blue]")
+
+            # Cheapest first: static HTML (plain HTTP, then Scrappey) needs no browser
+            started = time.monotonic()
+            if self.state.current_attempt == 1:
+                tier, ladder_products = self._run_fetch_ladder(retailer_url)
+                if not ladder_products:
+                    # Not a (static) product page: look the product up on a known retailer's search page
+                    match_url = self._run_site_search(retailer_url)
+                    if match_url:
+                        current_retailer['url'] = retailer_url = match_url
+                        # The match came from static HTML: probe it rather than trust a learned browser tier
+                        tier, ladder_products = self._run_fetch_ladder(retailer_url, probe=True)
+                if ladder_products:
+                    self._note_extraction(started, tier=tier)
+                    self.state.current_retailer_products = ladder_products
+                    self.state.total_attempts += 1
+                    if self.verbose:
+                        self.console.print(f"[green]✅ Extracted {len(ladder_products)} products via {tier} fetch[/green]")
+                    return {
+                        "action": "validate_products",
+                        "products_extracted": len(ladder_products),
+                        "retailer": retailer_name,
+                        "tier": tier,
+                    }
+
+            # Everything below needs the browser: fail fast while Browserbase is down
+            if not get_circuit_breaker(BROWSERBASE).allows_requests():
+                return {"action": "error", "error": "Browserbase circuit is open; skipping remaining extraction"}
+
+            # Known retailer: replay its recorded macro before spending agent turns
+            started = time.monotonic()
+            if self.state.current_attempt == 1:
+                macro_products = self._run_retailer_macro(retailer_url)
+                if macro_products:
+                    self._note_extraction(started, macro=True)
+                    self.state.current_retailer_products = macro_products
+                    self.state.total_attempts += 1
+                    if self.verbose:
+                        self.console.print(f"[green]✅ Extracted {len(macro_products)} products via recorded macro[/green]")
+                    return {
+                        "action": "validate_products",
+                        "products_extracted": len(macro_products),
+                        "retailer": retailer_name,
+                        "macro": True,
+                    }
             
             # Create extraction task
             extraction_task = self._get_extraction_agent().create_product_search_extraction_task(
                 product_query=self.state.product_query,
                 retailer=retailer_name,
                 retailer_url=retailer_url,
-                session_id=self.state.session_id
+                session_id=self.state.session_id,
+                search_url=self._search_url(retailer_url)
             )
             
             # Create and execute extraction crew
@@ -422,13 +814,25 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 verbose=self.verbose
             )
             
-            result = extraction_crew.kickoff()
+            started = time.monotonic()
+            self._get_stagehand_tool().start_recording()
+            try:
+                result = self._kickoff(extraction_crew, "extraction")
+            except DeadlineExceeded:
+                self._note_extraction(started)
+                if self._deadline_expired():
+                    return {"action": "finalize", "reason": "deadline_exceeded"}
+                # Only this retailer's budget ran out: move on with no products
+                self.state.current_retailer_products = []
+                self.state.total_attempts += 1
+                return {"action": "validate_products", "products_extracted": 0, "retailer": retailer_name, "step_timeout": True}
 
             if hasattr(result, 'pydantic') and getattr(result, 'pydantic') is not None:
                 extraction_data = result.pydantic.model_dump()
             else:
                 # Parse extraction results safely
                 extraction_data = self._safe_parse_json(result, default={"products": []})
+            self._note_extraction(started, extraction_data)
             
             # Store current retailer products
             self.state.current_retailer_products = extraction_data.get('products', [])
@@ -459,8 +863,17 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 self.state.current_retailer_index = len(self.state.retailers)
                 return {"action": "route_after_validation", "validation_passed": False}
 
+            if extraction_result.get("reason") == "deadline_exceeded" or self._deadline_expired():
+                return self._deadline_error("extraction")
+
             if extraction_result.get("action") == "error":
                 return {"action": "error", "error": extraction_result.get("error")}
+
+            # Extraction ran out of its step budget: nothing to validate
+            if extraction_result.get("step_timeout"):
+                current_url = self.state.retailers[self.state.current_retailer_index].get('url', '')
+                self._record_retailer_outcome(current_url, passed=False)
+                return {"action": "route_after_validation", "validation_passed": False}
             
             current_retailer = self.state.retailers[self.state.current_retailer_index]
             retailer_name = current_retailer.get('vendor', 'Unknown')
@@ -470,7 +883,7 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 self.state.current_retailer_index += 1
                 self.state.current_attempt = 1
                 self.state.retailers_searched += 1
-                if self.state.current_retailer_index >= len(self.state.retailers):
+                if not self._more_retailers():
                     return {"action": "finalize", "reason": "no_more_retailers"}
                 return {"action": "extract_products", "skipped": retailer_name}
             
@@ -495,7 +908,14 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 verbose=self.verbose
             )
             
-            result = validation_crew.kickoff()
+            try:
+                result = self._kickoff(validation_crew, "validation")
+            except DeadlineExceeded:
+                if self._deadline_expired():
+                    return self._deadline_error("validation")
+                # Validation budget ran out: give up on this retailer instead of retrying
+                self.state.current_attempt = self.state.max_retries
+                return {"action": "route_after_validation", "validation_passed": False}
 
             if hasattr(result, 'pydantic') and getattr(result, 'pydantic') is not None:
                 validation_data = result.pydantic.model_dump()
@@ -508,6 +928,7 @@ class ProductSearchFlow(Flow[ProductSearchState]):
             self.state.validated_products.extend(validated_products)
 
             validation_passed = validation_data.get('validation_passed', False)
+            self._record_retailer_outcome(product_url, passed=bool(validation_passed))
 
             # Store validation feedback for potential retries
             self.state.validation_feedback = validation_data.get('feedback', {})
@@ -530,7 +951,7 @@ class ProductSearchFlow(Flow[ProductSearchState]):
     def route_after_validation(self, validation_result: Dict[str, Any]) -> str:
         """Route after validation based on results and retry logic."""
         try:
-            if validation_result.get("action") == "error":
+            if validation_result.get("action") == "error" or self._deadline_expired():
                 return "finalize"
             
             validation_passed = validation_result.get("validation_passed", False)
@@ -545,9 +966,9 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 if self.verbose:
                     self.console.print("[yellow]⏭️ No products extracted; moving to next retailer[/yellow]")
                 
-                if self.state.current_retailer_index >= len(self.state.retailers):
+                if not self._more_retailers():
                     # If we exhausted all retailers and found nothing overall, route to feedback-driven research retry
-                    if not self.state.validated_products:
+                    if not self.state.validated_products and self._acquire_flow_retry("research"):
                         if self.verbose:
                             self.console.print("[magenta]🧭 No products found from any retailer; triggering feedback-driven research retry[/magenta]")
                         return "retry_research_with_feedback"
@@ -555,15 +976,20 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 else:
                     return "extract_products"
             
-            # If validation passed or we've reached max retries, move to next retailer
-            if validation_passed or self.state.current_attempt >= self.state.max_retries:
+            # If validation passed, we've reached max retries or the shared retry budget
+            # is spent, move to next retailer
+            if (
+                validation_passed
+                or self.state.current_attempt >= self.state.max_retries
+                or not self._acquire_flow_retry("retailer")
+            ):
                 # Move to next retailer
                 self.state.current_retailer_index += 1
                 self.state.current_attempt = 1
                 self.state.retailers_searched += 1
                 
                 # Check if we have more retailers to process
-                if self.state.current_retailer_index >= len(self.state.retailers):
+                if not self._more_retailers():
                     return "finalize"
                 else:
                     return "extract_products"
@@ -612,6 +1038,9 @@ class ProductSearchFlow(Flow[ProductSearchState]):
             if self.verbose:
                 self.console.print(f"[blue]🔬 Retry Research with Feedback (Attempt {self.state.current_attempt})[/blue]")
 
+            if self._deadline_expired():
+                return self._deadline_error("research retry")
+
             # Ensure targeted feedback exists (avoid None)
             if not self.state.targeted_feedback:
                 self.state.targeted_feedback = {
@@ -636,7 +1065,7 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 verbose=self.verbose
             )
 
-            result = research_crew.kickoff()
+            result = self._run_in_step("research", research_crew.kickoff, shares_tool=False)
 
             if hasattr(result, 'pydantic') and getattr(result, 'pydantic') is not None:
                 research_data = result.pydantic.model_dump()
@@ -648,6 +1077,7 @@ class ProductSearchFlow(Flow[ProductSearchState]):
             improved_retailers = research_data.get('retailers')
             if not isinstance(improved_retailers, list):
                 improved_retailers = self._parse_retailers_from_raw(research_data)
+            improved_retailers = self._prioritize_retailers(improved_retailers)
             if improved_retailers:
                 # Replace current item and append rest
                 self.state.retailers[self.state.current_retailer_index] = improved_retailers[0]
@@ -660,6 +1090,8 @@ class ProductSearchFlow(Flow[ProductSearchState]):
 
             return {"action": "extract_products", "research_improved": True}
 
+        except DeadlineExceeded:
+            return self._deadline_error("research retry")
         except Exception as e:
             error_msg = f"Research retry with feedback failed: {str(e)}"
             self.error_logger.error(error_msg, exc_info=True)
@@ -672,6 +1104,9 @@ class ProductSearchFlow(Flow[ProductSearchState]):
             if self.verbose:
                 self.console.print(f"[yellow]🔄 Retry Extraction with Feedback (Attempt {self.state.current_attempt})[/yellow]")
 
+            if self._deadline_expired():
+                return {"action": "finalize", "reason": "deadline_exceeded"}
+
             current_retailer = self.state.retailers[self.state.current_retailer_index]
             retailer_name = current_retailer.get('vendor', 'Unknown')
 
@@ -690,7 +1125,8 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 retailer_url=retailer_url,
                 validation_feedback=extraction_feedback,
                 attempt_number=self.state.current_attempt,
-                session_id=self.state.session_id
+                session_id=self.state.session_id,
+                search_url=self._search_url(retailer_url)
             )
 
             # Create and execute extraction crew
@@ -700,13 +1136,24 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                 verbose=self.verbose
             )
 
-            result = extraction_crew.kickoff()
+            started = time.monotonic()
+            self._get_stagehand_tool().start_recording()
+            try:
+                result = self._kickoff(extraction_crew, "extraction")
+            except DeadlineExceeded:
+                self._note_extraction(started)
+                if self._deadline_expired():
+                    return {"action": "finalize", "reason": "deadline_exceeded"}
+                self.state.current_retailer_products = []
+                self.state.total_attempts += 1
+                return {"action": "validate_products", "products_extracted": 0, "step_timeout": True}
 
             if hasattr(result, 'pydantic') and getattr(result, 'pydantic') is not None:
                 extraction_data = result.pydantic.model_dump()
             else:
                 # Parse extraction results safely
                 extraction_data = self._safe_parse_json(result, default={"products": []})
+            self._note_extraction(started, extraction_data)
 
             # Store current retailer products
             self.state.current_retailer_products = extraction_data.get('products', [])
@@ -735,7 +1182,7 @@ class ProductSearchFlow(Flow[ProductSearchState]):
     @router(route_after_research_retry)
     def route_research_retry_to_extraction(self, research_retry_result: Dict[str, Any]) -> str:
         """Route research retry result to extraction."""
-        if research_retry_result.get("action") == "error":
+        if research_retry_result.get("action") == "error" or self._deadline_expired():
             return "finalize"
 
         # Proceed to extraction with improved research
@@ -758,6 +1205,7 @@ class ProductSearchFlow(Flow[ProductSearchState]):
         try:
             if self.verbose:
                 self.console.print(f"[blue]🎯 Finalizing Product Search[/blue]")
+            self._close_research_stream()
             
             # Convert validated products to search results format
             search_results = []
@@ -784,6 +1232,10 @@ class ProductSearchFlow(Flow[ProductSearchState]):
                     "retailers_searched": self.state.retailers_searched,
                     "total_attempts": self.state.total_attempts,
                     "success_rate": self.state.success_rate,
+                    "deadline_exceeded": self.state.deadline_exceeded,
+                    "retries_denied": self.state.retries_denied,
+                    "telemetry": telemetry.snapshot(),
+                    "resilience": resilience_snapshot(),
                     "completed_at": datetime.now().isoformat()
                 }
             }
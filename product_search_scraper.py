@@ -225,7 +225,8 @@ class ProductSearchScraper:
     def search_product(self,
                       product_query: str,
                       max_retailers: int = 5,
-                      max_retries: int = 3) -> ProductSearchResult:
+                      max_retries: int = 3,
+                      deadline_seconds: Optional[float] = None) -> ProductSearchResult:
         """
         Search for a specific product across UK retailers using AI-powered research.
 
@@ -233,6 +234,7 @@ class ProductSearchScraper:
             product_query: The specific product to search for
             max_retailers: Maximum number of retailers to search
             max_retries: Maximum retry attempts per retailer
+            deadline_seconds: Optional time budget for the whole search (defaults to settings)
 
         Returns:
             ProductSearchResult with found products and metadata
@@ -254,6 +256,8 @@ class ProductSearchScraper:
                 "max_retries": max_retries,
                 "session_id": self.session_id
             }
+            if deadline_seconds:
+                flow_inputs["deadline_seconds"] = deadline_seconds
             
             if self.verbose:
                 self.console.print(f"[cyan]🔄 Starting Product Search Flow execution...[/cyan]")
@@ -274,7 +278,8 @@ class ProductSearchScraper:
                         "session_id": self.session_id,
                         "retailers_searched": getattr(flow.state, 'retailers_searched', 0),
                         "total_attempts": getattr(flow.state, 'total_attempts', 0),
-                        "success_rate": getattr(flow.state, 'success_rate', 0.0)
+                        "success_rate": getattr(flow.state, 'success_rate', 0.0),
+                        "deadline_exceeded": getattr(flow.state, 'deadline_exceeded', False)
                     }
                 }
             else:
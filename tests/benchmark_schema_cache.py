@@ -0,0 +1,57 @@
+"""Micro-benchmark for the compiled extraction schema cache.
+
+Run:
+  python -m tests.benchmark_schema_cache
+
+Compares the per-extract schema overhead of SimplifiedStagehandTool with the
+cache (``_create_dynamic_schema``) against compiling the models every call
+(``_build_dynamic_schema``), for the schema shapes agents commonly send. No
+browser or API calls are made.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+os.environ.setdefault("BROWSERBASE_API_KEY", "benchmark")
+os.environ.setdefault("BROWSERBASE_PROJECT_ID", "benchmark")
+
+from ecommerce_scraper.tools.simplified_stagehand_tool import SimplifiedStagehandTool  # noqa: E402
+from ecommerce_scraper.utils.telemetry import telemetry  # noqa: E402
+
+SCHEMAS = [
+    {"name": "Product", "fields": {"name": "str", "price": "str", "url": "optional_url"}},
+    {"name": "Product", "fields": {"name": "str", "price": "str", "image": "optional_url", "description": "optional_str"}},
+    {"fields": {"title": "str", "price": "str"}, "name": "Listing", "is_list": False},
+]
+ITERATIONS = 2000
+
+
+def time_per_call(fn, iterations: int = ITERATIONS) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(SCHEMAS[i % len(SCHEMAS)])
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> None:
+    tool = SimplifiedStagehandTool()
+    telemetry.reset()
+
+    uncached_s = time_per_call(tool._build_dynamic_schema)
+    cached_s = time_per_call(tool._create_dynamic_schema)
+
+    print(json.dumps({
+        "iterations": ITERATIONS,
+        "uncached_us_per_extract": round(uncached_s * 1e6, 1),
+        "cached_us_per_extract": round(cached_s * 1e6, 1),
+        "speedup": round(uncached_s / cached_s, 1) if cached_s else None,
+        "cache_hits": telemetry.counter("schema_cache.hit"),
+        "cache_misses": telemetry.counter("schema_cache.miss"),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
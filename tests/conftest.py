@@ -0,0 +1,14 @@
+"""Shared pytest setup: placeholder credentials and a throwaway cache directory.
+
+Settings are read at import time, so the environment is prepared before any
+``ecommerce_scraper`` module is imported. Nothing here opens a browser or
+calls an API.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("BROWSERBASE_API_KEY", "test")
+os.environ.setdefault("BROWSERBASE_PROJECT_ID", "test")
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="ecommerce-scraper-tests-")
@@ -0,0 +1,31 @@
+"""Tests for the local browser slot limit."""
+
+import asyncio
+
+from ecommerce_scraper.utils.browser_backend import LocalBrowserSlots
+
+
+def test_slots_limit_and_release():
+    async def scenario():
+        slots = LocalBrowserSlots(1)
+        assert await slots.acquire()
+        assert not await slots.acquire(timeout=0.05)
+        slots.release()
+        assert await slots.acquire(timeout=0.05)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_wait_does_not_leak_the_slot():
+    async def scenario():
+        slots = LocalBrowserSlots(1)
+        assert await slots.acquire()
+        waiter = asyncio.ensure_future(slots.acquire(timeout=1))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        # The slot frees up while the cancelled waiter's thread is still blocked on it
+        slots.release()
+        await asyncio.sleep(0.2)
+        assert await slots.acquire(timeout=0.05)
+
+    asyncio.run(scenario())
@@ -0,0 +1,52 @@
+"""Tests for deadline budgets and running blocking calls under them."""
+
+import threading
+
+import pytest
+
+from ecommerce_scraper.utils import deadline as deadline_module
+from ecommerce_scraper.utils.deadline import Deadline, DeadlineExceeded, check_deadline, run_with_deadline
+
+
+def test_child_is_capped_by_parent():
+    parent = Deadline(1, label="query")
+    assert parent.child(60, label="step").remaining() <= 1
+    parent.cancel()
+    assert parent.child(60, label="step").expired()
+
+
+def test_run_with_deadline_returns_result():
+    assert run_with_deadline(lambda a, b: a + b, Deadline(5), 1, 2) == 3
+
+
+def test_run_with_deadline_reraises_errors():
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        run_with_deadline(fail, Deadline(5))
+
+
+def test_cooperative_call_is_not_reported_as_abandoned(monkeypatch):
+    monkeypatch.setattr(deadline_module, "ABANDON_GRACE_SECONDS", 1.0)
+
+    def cooperative():
+        while True:
+            check_deadline("loop")
+
+    with pytest.raises(DeadlineExceeded) as info:
+        run_with_deadline(cooperative, Deadline(0.05, label="step"))
+    assert info.value.worker is None
+
+
+def test_stuck_call_is_reported_with_its_worker(monkeypatch):
+    monkeypatch.setattr(deadline_module, "ABANDON_GRACE_SECONDS", 0.05)
+    release = threading.Event()
+
+    with pytest.raises(DeadlineExceeded) as info:
+        run_with_deadline(release.wait, Deadline(0.05, label="step"))
+    worker = info.value.worker
+    assert worker is not None and worker.is_alive()
+    release.set()
+    worker.join(1)
+    assert not worker.is_alive()
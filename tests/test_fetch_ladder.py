@@ -0,0 +1,113 @@
+"""Tests for static product parsing and learned fetch tiers."""
+
+import time
+
+import pytest
+
+from ecommerce_scraper.utils import fetch_ladder
+from ecommerce_scraper.utils.fetch_ladder import BROWSER, HTTP, SCRAPPEY, FetchTiers, parse_products
+from ecommerce_scraper.utils.json_store import JsonStore
+
+PRODUCT_URL = "https://www.asda.com/groceries/product/heinz-beans/910000"
+SEARCH_URL = "https://www.asda.com/search/heinz%20beans"
+
+JSON_LD_PAGE = """<html><head><script type="application/ld+json">
+{"@context": "https://schema.org", "@type": "Product", "name": "Heinz Baked Beans 415g",
+ "offers": {"@type": "Offer", "price": "1.40", "priceCurrency": "GBP"}}
+</script></head><body></body></html>"""
+
+
+@pytest.fixture
+def tiers(tmp_path, monkeypatch):
+    store = FetchTiers(JsonStore("fetch_tiers.json", directory=str(tmp_path)))
+    monkeypatch.setattr(fetch_ladder, "_fetch_tiers", store)
+    return store
+
+
+def test_parse_products_json_ld():
+    products = parse_products(JSON_LD_PAGE, PRODUCT_URL)
+    assert products == [{"name": "Heinz Baked Beans 415g", "price": "£1.40", "url": PRODUCT_URL, "website": "asda.com"}]
+
+
+def test_parse_products_json_ld_graph_and_low_price():
+    html = """<script type="application/ld+json">{"@graph": [{"@type": "WebPage"},
+      {"@type": ["Product"], "name": "Widget Deluxe", "offers": [{"lowPrice": 9.5, "priceCurrency": "EUR"}]}]}</script>"""
+    assert parse_products(html, PRODUCT_URL)[0]["price"] == "€9.50"
+
+
+def test_parse_products_microdata():
+    html = """<div itemscope itemtype="https://schema.org/Product">
+      <h1 itemprop="name">Lego Castle Set</h1>
+      <meta itemprop="priceCurrency" content="GBP"><span itemprop="price" content="49.99">£49.99</span></div>"""
+    assert parse_products(html, "https://shop.example.com/p/1") == [
+        {"name": "Lego Castle Set", "price": "£49.99", "url": "https://shop.example.com/p/1", "website": "shop.example.com"}
+    ]
+
+
+def test_parse_products_ignores_pages_without_products():
+    assert parse_products("<html><body><h1>Access denied</h1></body></html>", "https://shop.example.com/p/1") == []
+    assert parse_products('<script type="application/ld+json">{not json</script>', "https://shop.example.com/p/1") == []
+
+
+def test_start_tier_defaults_to_http(tiers):
+    assert tiers.tier(PRODUCT_URL) is None
+    assert tiers.start_tier(PRODUCT_URL) == HTTP
+
+
+def test_record_is_per_url_template(tiers):
+    tiers.record(SEARCH_URL, BROWSER)
+    assert tiers.tier(SEARCH_URL) == BROWSER
+    assert tiers.tier("https://www.asda.com/search/lego") == BROWSER
+    # Product pages on the same domain are unaffected
+    assert tiers.tier(PRODUCT_URL) is None
+    assert tiers.start_tier(PRODUCT_URL) == HTTP
+
+
+def test_start_tier_reprobes_after_expiry(tiers, monkeypatch):
+    tiers.record(PRODUCT_URL, SCRAPPEY)
+    assert tiers.start_tier(PRODUCT_URL) == SCRAPPEY
+    monkeypatch.setattr(time, "time", lambda: 10**12)
+    assert tiers.start_tier(PRODUCT_URL) == HTTP
+
+
+def test_escalate_moves_one_tier_up(tiers):
+    tiers.escalate(PRODUCT_URL, HTTP)
+    assert tiers.tier(PRODUCT_URL) == SCRAPPEY
+    tiers.escalate(PRODUCT_URL, SCRAPPEY)
+    assert tiers.tier(PRODUCT_URL) == BROWSER
+    tiers.escalate(PRODUCT_URL, BROWSER)
+    assert tiers.tier(PRODUCT_URL) == BROWSER
+
+
+def test_legacy_domain_entries_are_replaced(tmp_path):
+    store = JsonStore("fetch_tiers.json", directory=str(tmp_path))
+    with store.transaction() as data:
+        data["asda.com"] = {"tier": BROWSER, "updated_at": time.time()}
+    tiers = FetchTiers(store)
+    assert tiers.tier(PRODUCT_URL) is None
+    tiers.record(PRODUCT_URL, HTTP)
+    assert tiers.tier(PRODUCT_URL) == HTTP
+
+
+def test_search_page_miss_does_not_pin_product_pages(tiers, monkeypatch):
+    pages = {SEARCH_URL: "<html><body>results</body></html>", PRODUCT_URL: JSON_LD_PAGE}
+    monkeypatch.setattr(fetch_ladder, "fetch_http", lambda url: pages[url])
+    monkeypatch.setattr(fetch_ladder.settings, "scrappey_api_key", "")
+    monkeypatch.setattr(fetch_ladder.settings, "enable_product_api_discovery", False)
+    monkeypatch.setattr(fetch_ladder.settings, "enable_snapshot_archive", False)
+
+    assert fetch_ladder.fetch_products(SEARCH_URL) == (BROWSER, [])
+    tier, products = fetch_ladder.fetch_products(PRODUCT_URL)
+    assert tier == HTTP
+    assert products[0]["name"] == "Heinz Baked Beans 415g"
+
+
+def test_probe_ignores_learned_browser_tier(tiers, monkeypatch):
+    monkeypatch.setattr(fetch_ladder, "fetch_http", lambda url: JSON_LD_PAGE)
+    monkeypatch.setattr(fetch_ladder.settings, "enable_product_api_discovery", False)
+    monkeypatch.setattr(fetch_ladder.settings, "enable_snapshot_archive", False)
+    tiers.record(PRODUCT_URL, BROWSER)
+
+    assert fetch_ladder.fetch_products(PRODUCT_URL) == (BROWSER, [])
+    assert fetch_ladder.fetch_products(PRODUCT_URL, True)[0] == HTTP
+    assert tiers.tier(PRODUCT_URL) == HTTP
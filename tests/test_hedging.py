@@ -0,0 +1,47 @@
+"""Tests for request hedging."""
+
+import threading
+
+from ecommerce_scraper.utils.hedging import Hedger
+
+
+def test_disabled_hedger_just_calls():
+    assert Hedger("t").call(lambda a, b: a * b, 3, 4) == 12
+
+
+def test_rejected_results_are_not_latency_samples():
+    hedger = Hedger("t", enabled=True)
+    assert hedger.call(lambda: 503, accept=lambda status: status < 500) == 503
+    assert hedger.stats()["samples"] == 0
+    assert hedger.call(lambda: 200, accept=lambda status: status < 500) == 200
+    assert hedger.stats()["samples"] == 1
+
+
+def test_hedge_skips_rejected_primary():
+    hedger = Hedger("t", enabled=True, min_samples=1, min_delay_s=0.01, max_hedge_rate=1.0)
+    hedger.call(lambda: 200)
+    release = threading.Event()
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(1)
+            return 503
+        release.set()
+        return 200
+
+    assert hedger.call(flaky, accept=lambda status: status < 500) == 200
+
+
+def test_both_attempts_rejected_returns_result():
+    hedger = Hedger("t", enabled=True, min_samples=1, min_delay_s=0.01, max_hedge_rate=1.0)
+    hedger.call(lambda: 200)
+    barrier = threading.Barrier(2, timeout=1)
+
+    def slow_failure():
+        barrier.wait()
+        return 429
+
+    assert hedger.call(slow_failure, accept=lambda status: status < 500 and status != 429) == 429
+    assert hedger.stats()["samples"] == 1
@@ -0,0 +1,37 @@
+"""Tests for the atomic JSON document store."""
+
+from ecommerce_scraper.utils.json_store import JsonStore
+
+
+def test_missing_file_loads_empty(tmp_path):
+    assert JsonStore("missing.json", directory=str(tmp_path)).load() == {}
+
+
+def test_transaction_persists_across_instances(tmp_path):
+    store = JsonStore("store.json", directory=str(tmp_path))
+    with store.transaction() as data:
+        data["argos.co.uk"] = {"attempts": 3}
+    assert JsonStore("store.json", directory=str(tmp_path)).load() == {"argos.co.uk": {"attempts": 3}}
+    # Only the document is left behind, no temp files
+    assert [p.name for p in tmp_path.iterdir()] == ["store.json"]
+
+
+def test_load_returns_a_copy(tmp_path):
+    store = JsonStore("store.json", directory=str(tmp_path))
+    store.load()["key"] = "value"
+    assert store.load() == {}
+
+
+def test_corrupt_or_non_object_file_loads_empty(tmp_path):
+    (tmp_path / "corrupt.json").write_text("{not json", encoding="utf-8")
+    (tmp_path / "list.json").write_text("[1, 2]", encoding="utf-8")
+    assert JsonStore("corrupt.json", directory=str(tmp_path)).load() == {}
+    assert JsonStore("list.json", directory=str(tmp_path)).load() == {}
+
+
+def test_corrupt_file_is_replaced_on_write(tmp_path):
+    (tmp_path / "store.json").write_text("{not json", encoding="utf-8")
+    store = JsonStore("store.json", directory=str(tmp_path))
+    with store.transaction() as data:
+        data["ok"] = True
+    assert JsonStore("store.json", directory=str(tmp_path)).load() == {"ok": True}
@@ -0,0 +1,56 @@
+"""Tests for the cross-run negative cache."""
+
+import pytest
+
+from ecommerce_scraper.utils import negative_cache as module
+from ecommerce_scraper.utils.json_store import JsonStore
+from ecommerce_scraper.utils.negative_cache import (
+    BLOCKED,
+    COMPARISON_SITE,
+    SOFT_404,
+    NegativeCache,
+    canonical_url,
+    is_comparison_site,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return NegativeCache(JsonStore("negative_cache.json", directory=str(tmp_path)))
+
+
+def test_canonical_url_drops_fragment_and_trailing_slash():
+    assert canonical_url("https://shop.example.com/p/1/#reviews") == canonical_url("https://shop.example.com/p/1")
+
+
+def test_comparison_sites_match_subdomains():
+    assert is_comparison_site("pricerunner.com")
+    assert is_comparison_site("uk.pricerunner.com")
+    assert not is_comparison_site("notpricerunner.com")
+
+
+def test_lookup_reports_url_and_domain_reasons(cache):
+    cache.add_url("https://shop.example.com/p/1", SOFT_404)
+    cache.add_domain("www.blocked.example.com", BLOCKED)
+    assert cache.lookup("https://shop.example.com/p/1/") == SOFT_404
+    assert cache.lookup("https://shop.example.com/p/2") is None
+    assert cache.lookup("https://blocked.example.com/anything") == BLOCKED
+    assert cache.lookup("https://www.pricerunner.com/x") == COMPARISON_SITE
+
+
+def test_entries_expire_after_ttl(cache, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(module.time, "time", lambda: now)
+    cache.add_url("https://shop.example.com/p/1", SOFT_404)
+    monkeypatch.setattr(module.time, "time", lambda: now + module.settings.negative_cache_ttl_hours * 3600 + 1)
+    assert cache.lookup("https://shop.example.com/p/1") is None
+    assert cache.excluded_urls() == []
+
+
+def test_exclusion_prompt_lists_active_entries(cache):
+    assert cache.exclusion_prompt() == ""
+    cache.add_domain("blocked.example.com", BLOCKED)
+    cache.add_url("https://shop.example.com/p/1", SOFT_404)
+    prompt = cache.exclusion_prompt()
+    assert "Excluded domains: blocked.example.com" in prompt
+    assert "- " + canonical_url("https://shop.example.com/p/1") in prompt
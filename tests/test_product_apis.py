@@ -0,0 +1,130 @@
+"""Tests for learning and calling retailers' product JSON endpoints."""
+
+import json
+
+import pytest
+
+from ecommerce_scraper.utils import product_apis
+from ecommerce_scraper.utils.json_store import JsonStore
+from ecommerce_scraper.utils.product_apis import ProductApis, _match, endpoint_template
+
+PAGE_1 = "https://www.shop.example.com/product/heinz-beans/1234567"
+PAGE_2 = "https://www.shop.example.com/product/lego-castle/7654321"
+API_1 = "https://api.shop.example.com/v2/products/1234567?fields=all"
+API_2 = "https://api.shop.example.com/v2/products/7654321?fields=all"
+
+
+def _payload(name, pence):
+    return {"data": {"product": {"title": name, "pricing": {"now": pence, "currency": "GBP"}}}}
+
+
+@pytest.fixture
+def apis(tmp_path):
+    return ProductApis(JsonStore("product_apis.json", directory=str(tmp_path)))
+
+
+def test_endpoint_template_replaces_page_values():
+    assert endpoint_template(API_1, PAGE_1) == ("https://api.shop.example.com/v2/products/{p2}?fields=all", True)
+    template, parameterized = endpoint_template("https://api.shop.example.com/basket?x=1", PAGE_1)
+    assert not parameterized
+    assert template == "https://api.shop.example.com/basket?x=1"
+
+
+def test_endpoint_template_query_values_and_braces():
+    template, parameterized = endpoint_template(
+        "https://shop.example.com/api/price?sku=SKU12345&f={a}", "https://shop.example.com/p?sku=SKU12345"
+    )
+    assert parameterized
+    assert template == "https://shop.example.com/api/price?sku={q_sku}&f=%7Ba%7D"
+
+
+def test_match_finds_name_and_price_in_pence():
+    paths = _match(_payload("Heinz Baked Beans 415g", 140), "heinz baked beans 415g", 1.40)
+    assert paths == {
+        "name_path": ["data", "product", "title"],
+        "price_path": ["data", "product", "pricing", "now"],
+        "price_scale": 0.01,
+    }
+
+
+def test_match_requires_price_in_the_named_object():
+    feed = {"viewed": [{"title": "Heinz Baked Beans 415g"}], "prices": [{"amount": "1.40"}]}
+    assert _match(feed, "heinz baked beans 415g", 1.40) is None
+    assert _match({"title": "Something else", "price": 1.40}, "heinz baked beans 415g", 1.40) is None
+
+
+def test_learned_endpoint_needs_confirmation_on_a_second_product(apis):
+    apis.learn(PAGE_1, [{"url": API_1, "body": json.dumps(_payload("Heinz Baked Beans 415g", 140))}],
+               {"name": "Heinz Baked Beans 415g", "price": "£1.40"})
+    assert apis.get(PAGE_1) is None
+    assert apis.get(PAGE_2) is None
+
+    confirmed = apis.learn(PAGE_2, [{"url": API_2, "body": json.dumps(_payload("Lego Castle Set", 4999))}],
+                           {"name": "Lego Castle Set", "price": "£49.99"})
+    assert confirmed
+    assert apis.get(PAGE_2)["endpoint"] == "https://api.shop.example.com/v2/products/{p2}?fields=all"
+
+
+def test_feed_candidate_is_replaced_when_not_confirmed(apis):
+    feed_url = "https://api.shop.example.com/recently-viewed?id=1234567"
+    apis.learn(PAGE_1, [{"url": feed_url, "body": json.dumps({"items": [{"name": "Heinz Baked Beans 415g", "price": 1.4}]})}],
+               {"name": "Heinz Baked Beans 415g", "price": "£1.40"})
+    # The second page's own endpoint call answers with a different product
+    feed_2 = "https://api.shop.example.com/recently-viewed?id=7654321"
+    apis.learn(PAGE_2, [
+        {"url": feed_2, "body": json.dumps({"items": [{"name": "Heinz Baked Beans 415g", "price": 1.4}]})},
+        {"url": API_2, "body": json.dumps(_payload("Lego Castle Set", 4999))},
+    ], {"name": "Lego Castle Set", "price": "£49.99"})
+    assert apis.get(PAGE_2) is None
+    assert apis._entry(PAGE_2)["endpoint"] == "https://api.shop.example.com/v2/products/{p2}?fields=all"
+
+
+class _Response:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class _Session:
+    def __init__(self, payload):
+        self.payload = payload
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return _Response(self.payload)
+
+
+def _confirmed(apis):
+    apis.learn(PAGE_1, [{"url": API_1, "body": json.dumps(_payload("Heinz Baked Beans 415g", 140))}],
+               {"name": "Heinz Baked Beans 415g", "price": "£1.40"})
+    apis.learn(PAGE_2, [{"url": API_2, "body": json.dumps(_payload("Lego Castle Set", 4999))}],
+               {"name": "Lego Castle Set", "price": "£49.99"})
+
+
+def test_fetch_reads_product_from_endpoint(apis, monkeypatch):
+    _confirmed(apis)
+    page_3 = "https://www.shop.example.com/product/kindle/5550001"
+    session = _Session(_payload("Kindle Paperwhite", 9999))
+    monkeypatch.setattr(product_apis, "http_session", lambda: session)
+    products = apis.fetch(page_3)
+    assert session.urls == ["https://api.shop.example.com/v2/products/5550001?fields=all"]
+    assert products[0]["name"] == "Kindle Paperwhite"
+    assert products[0]["price"] == "£99.99"
+    assert products[0]["url"] == page_3
+
+
+def test_fetch_invalidates_changed_payload(apis, monkeypatch):
+    _confirmed(apis)
+    monkeypatch.setattr(product_apis, "http_session", lambda: _Session({"error": "gone"}))
+    assert apis.fetch(PAGE_1) is None
+    assert apis._entry(PAGE_1) is None
+
+
+def test_fetch_without_template(apis):
+    assert apis.fetch(PAGE_1) is None
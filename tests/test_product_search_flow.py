@@ -0,0 +1,44 @@
+"""Tests for how the product search flow bounds its steps with deadlines."""
+
+import threading
+
+from ecommerce_scraper.utils import deadline as deadline_module
+from ecommerce_scraper.utils.deadline import Deadline
+from ecommerce_scraper.workflows import product_search_flow as module
+from ecommerce_scraper.workflows.product_search_flow import ProductSearchFlow
+
+
+class _StuckCrew:
+    """Research crew whose kickoff ignores cancellation until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def kickoff(self):
+        self.release.wait(5)
+        return None
+
+
+def test_research_past_its_deadline_leaves_extraction_tool_alone(monkeypatch):
+    monkeypatch.setattr(module.settings, "min_step_seconds", 0.0)
+    monkeypatch.setattr(deadline_module, "ABANDON_GRACE_SECONDS", 0.01)
+    flow = ProductSearchFlow(verbose=False)
+    flow._deadline = Deadline(0.3, label="query")
+    extraction_tool, extraction_agent = object(), object()
+    flow._stagehand_tool = extraction_tool
+    flow._shared_session_id = "session-in-use"
+    flow._extraction_agent = extraction_agent
+
+    crew = _StuckCrew()
+    outcome = {}
+    # Research runs on a stream thread while the main thread extracts
+    stream_thread = threading.Thread(target=lambda: outcome.update(retailers=flow._perplexity_research(crew)))
+    stream_thread.start()
+    stream_thread.join(5)
+    crew.release.set()
+
+    assert outcome["retailers"] == []
+    assert flow._stagehand_tool is extraction_tool
+    assert flow._shared_session_id == "session-in-use"
+    assert flow._extraction_agent is extraction_agent
+    assert flow._abandoned_tools == []
@@ -0,0 +1,76 @@
+"""Tests for merging concurrent research candidates."""
+
+import threading
+
+from ecommerce_scraper.utils.research_fanout import CandidateStream
+
+
+def _candidates(*items):
+    return lambda: list(items)
+
+
+def test_stream_merges_by_domain_and_ranks_by_score():
+    stream = CandidateStream(limit=5, max_workers=2)
+    stream.submit("perplexity", _candidates(
+        {"vendor": "ASDA", "url": "https://www.asda.com/p/1"},
+        {"vendor": "Tesco", "url": "https://www.tesco.com/p/2"},
+    ))
+    stream.submit("site_search", _candidates({"vendor": "ASDA", "url": "https://www.asda.com/p/9", "score": 0.9}))
+    stream.wait()
+    taken = stream.take()
+    assert [(c["vendor"], c["source"]) for c in taken] == [("ASDA", "site_search"), ("Tesco", "perplexity")]
+    assert not stream.pending
+    stream.close()
+
+
+def test_candidates_without_url_merge_per_vendor():
+    stream = CandidateStream(limit=5, max_workers=1)
+    stream.submit("perplexity", _candidates(
+        {"vendor": "Argos", "url": ""},
+        {"vendor": "argos ", "url": "n/a"},
+        {"vendor": "Boots", "url": None},
+    ))
+    stream.wait()
+    assert [c["vendor"] for c in stream.take()] == ["Argos", "Boots"]
+    stream.close()
+
+
+def test_taken_domains_are_not_offered_again_and_limit_applies():
+    stream = CandidateStream(limit=2, max_workers=1)
+    stream.submit("perplexity", _candidates({"vendor": "ASDA", "url": "https://www.asda.com/p/1"}))
+    stream.wait()
+    assert len(stream.take()) == 1
+    stream.submit("sitemap", _candidates(
+        {"vendor": "ASDA", "url": "https://www.asda.com/p/2", "score": 1.0},
+        {"vendor": "Tesco", "url": "https://www.tesco.com/p/2"},
+        {"vendor": "Ocado", "url": "https://www.ocado.com/p/2"},
+    ))
+    stream.wait()
+    assert [c["vendor"] for c in stream.take()] == ["Tesco"]
+    stream.close()
+
+
+def test_wait_returns_at_first_k_confident_candidates():
+    stream = CandidateStream(limit=5, max_workers=2)
+    release = threading.Event()
+    stream.submit("perplexity", lambda: release.wait(5) and [])
+    stream.submit("site_search", _candidates({"vendor": "ASDA", "url": "https://www.asda.com/p/1", "score": 0.95}))
+    stream.wait(first_k=1, timeout=5)
+    assert stream.pending
+    assert [c["vendor"] for c in stream.take()] == ["ASDA"]
+    release.set()
+    stream.close()
+
+
+def test_close_cancels_calls_not_started():
+    stream = CandidateStream(limit=5, max_workers=1)
+    release = threading.Event()
+    started = []
+    stream.submit("perplexity", lambda: release.wait(5) and [])
+    stream.submit("site_search", lambda: started.append(1) or [])
+    stream.close()
+    release.set()
+    stream.submit("sitemap", lambda: started.append(2) or [])
+    stream.wait(timeout=5)
+    assert started == []
+    assert not stream.pending
@@ -0,0 +1,21 @@
+from ecommerce_scraper.utils.resilience import RetryBudget
+from ecommerce_scraper.workflows.product_search_flow import ProductSearchFlow
+
+
+def test_retry_budget_earns_retries_from_first_attempts():
+    budget = RetryBudget("test", ratio=0.5, min_tokens=1.0)
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_acquire()
+
+
+def test_flow_counts_retries_denied_by_budget(monkeypatch):
+    budget = RetryBudget("flow", ratio=0.0, min_tokens=0.0)
+    monkeypatch.setattr(
+        "ecommerce_scraper.workflows.product_search_flow.get_retry_budget", lambda name: budget
+    )
+    flow = ProductSearchFlow(verbose=False)
+    assert not flow._acquire_flow_retry("retailer")
+    assert flow.state.retries_denied == 1
@@ -0,0 +1,74 @@
+"""Tests for failure classification and retailer ranking."""
+
+import pytest
+
+from ecommerce_scraper.utils.json_store import JsonStore
+from ecommerce_scraper.utils.retailer_health import RetailerHealth, classify_failure, parse_price
+
+
+@pytest.fixture
+def health(tmp_path):
+    return RetailerHealth(JsonStore("retailer_health.json", directory=str(tmp_path)))
+
+
+@pytest.mark.parametrize(
+    "errors, expected",
+    [
+        (["HTTP 404 for https://shop.example.com/p/1"], "soft_404"),
+        (["Page not found"], "soft_404"),
+        (["Sorry, this page can't be found"], "soft_404"),
+        (["Access denied - captcha required"], "blocked"),
+        (["Element not found: #add-to-basket"], None),
+        (["Selector not found after 30s"], None),
+        ([], None),
+        (None, None),
+    ],
+)
+def test_classify_failure(errors, expected):
+    assert classify_failure(errors) == expected
+
+
+def test_parse_price():
+    assert parse_price("£1,299.00") == 1299.0
+    assert parse_price(4.5) == 4.5
+    assert parse_price("free") is None
+    assert parse_price(0) is None
+
+
+def test_unpriced_retailer_does_not_outrank_expensive_one(health):
+    retailers = [
+        {"vendor": "Cheap", "url": "https://cheap.example.com/p", "price": "£10.00"},
+        {"vendor": "Unpriced", "url": "https://unpriced.example.com/p", "price": None},
+        {"vendor": "Pricey", "url": "https://pricey.example.com/p", "price": "£25.00"},
+    ]
+    ordered, skipped = health.rank(retailers)
+    assert skipped == []
+    assert [r["vendor"] for r in ordered] == ["Cheap", "Unpriced", "Pricey"]
+    cheapest, priciest = 10.0, 25.0
+    assert health.expected_value(retailers[1], cheapest, priciest) <= health.expected_value(retailers[2], cheapest, priciest)
+
+
+def test_rank_prefers_healthy_fast_domains(health, monkeypatch):
+    for _ in range(5):
+        health.record_attempt("slow.example.com", passed=False, latency_s=300)
+        health.record_attempt("fast.example.com", passed=True, latency_s=10)
+    retailers = [
+        {"vendor": "Slow", "url": "https://slow.example.com/p", "price": "£10"},
+        {"vendor": "Fast", "url": "https://fast.example.com/p", "price": "£10"},
+    ]
+    ordered, skipped = health.rank(retailers)
+    assert [r["vendor"] for r in ordered + skipped][0] == "Fast"
+
+
+def test_blocking_domain_ranks_below_one_that_failed_validation(health):
+    # Same pass record and latency; only the failure class differs
+    health.record_attempt("blocking.example.com", passed=False, latency_s=30, failure="blocked")
+    health.record_attempt("picky.example.com", passed=False, latency_s=30)
+    retailers = [
+        {"vendor": "Blocking", "url": "https://blocking.example.com/p", "price": "£10"},
+        {"vendor": "Picky", "url": "https://picky.example.com/p", "price": "£10"},
+    ]
+    ordered, skipped = health.rank(retailers)
+    assert skipped == []
+    assert [r["vendor"] for r in ordered] == ["Picky", "Blocking"]
+    assert health.expected_value(retailers[0]) == 0.0
@@ -0,0 +1,44 @@
+"""Tests for the compiled extraction schema LRU cache."""
+
+import pytest
+
+from ecommerce_scraper.tools import simplified_stagehand_tool as module
+from ecommerce_scraper.tools.simplified_stagehand_tool import SimplifiedStagehandTool, schema_cache_key
+
+PRODUCT = {"name": "Product", "fields": {"name": "str", "price": "str", "url": "optional_url"}}
+
+
+@pytest.fixture
+def tool(tmp_path):
+    module._schema_cache.clear()
+    yield SimplifiedStagehandTool(log_dir=str(tmp_path))
+    module._schema_cache.clear()
+
+
+def test_cache_key_ignores_key_order():
+    reordered = {"fields": {"url": "optional_url", "price": "str", "name": "str"}, "name": "Product"}
+    assert schema_cache_key(PRODUCT) == schema_cache_key(reordered)
+    assert schema_cache_key(PRODUCT) != schema_cache_key({**PRODUCT, "is_list": False})
+
+
+def test_same_definition_returns_cached_model(tool):
+    first = tool._create_dynamic_schema(PRODUCT)
+    assert tool._create_dynamic_schema(dict(PRODUCT)) is first
+    assert len(module._schema_cache) == 1
+
+
+def test_cache_evicts_least_recently_used(tool, monkeypatch):
+    monkeypatch.setattr(module, "SCHEMA_CACHE_SIZE", 2)
+    schemas = [{"name": f"Product{i}", "fields": {"name": "str"}} for i in range(3)]
+    first = tool._create_dynamic_schema(schemas[0])
+    tool._create_dynamic_schema(schemas[1])
+    # Touch the oldest so the second becomes the eviction candidate
+    tool._create_dynamic_schema(schemas[0])
+    tool._create_dynamic_schema(schemas[2])
+    assert list(module._schema_cache) == [schema_cache_key(schemas[0]), schema_cache_key(schemas[2])]
+    assert tool._create_dynamic_schema(schemas[0]) is first
+
+
+def test_default_fallback_is_not_cached(tool):
+    assert tool._create_dynamic_schema({"unexpected": True}) is module._DefaultProductList
+    assert not module._schema_cache
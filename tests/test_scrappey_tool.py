@@ -0,0 +1,54 @@
+"""Tests for which Scrappey request errors count against its circuit breaker."""
+
+import pytest
+import requests
+
+from ecommerce_scraper.tools import scrappey_tool as module
+from ecommerce_scraper.tools.scrappey_tool import ScrappeyTool
+from ecommerce_scraper.utils.resilience import CLOSED, OPEN, CircuitBreaker
+
+
+def _response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b"{}"
+    return response
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("scrappey", failure_threshold=2)
+    monkeypatch.setattr(module, "get_circuit_breaker", lambda name: breaker)
+    return breaker
+
+
+@pytest.mark.parametrize("status_code", [400, 404, 422])
+def test_client_errors_do_not_open_the_circuit(breaker, monkeypatch, status_code):
+    monkeypatch.setattr(module.requests, "post", lambda *args, **kwargs: _response(status_code))
+    tool = ScrappeyTool(api_key="test")
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            tool._post({"url": "https://shop.example.com/p/1"})
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.parametrize("status_code", [429, 503])
+def test_rate_limits_and_server_errors_open_the_circuit(breaker, monkeypatch, status_code):
+    monkeypatch.setattr(module.requests, "post", lambda *args, **kwargs: _response(status_code))
+    tool = ScrappeyTool(api_key="test")
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            tool._post({"url": "https://shop.example.com/p/1"})
+    assert breaker.state == OPEN
+
+
+def test_connection_errors_open_the_circuit(breaker, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise requests.ConnectionError("refused")
+
+    monkeypatch.setattr(module.requests, "post", refuse)
+    tool = ScrappeyTool(api_key="test")
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            tool._post({"url": "https://shop.example.com/p/1"})
+    assert breaker.state == OPEN
@@ -0,0 +1,31 @@
+"""Tests for when hand-written seed selectors apply."""
+
+from ecommerce_scraper.utils.page_fingerprint import is_search_results, url_template
+from ecommerce_scraper.utils.selector_induction import _plausible, _seed_selectors
+
+
+def test_url_template():
+    assert url_template("https://www.argos.co.uk/product/8349024?tag=x") == "www.argos.co.uk/product/*"
+    assert url_template("https://www.asda.com/") == "www.asda.com/"
+
+
+def test_is_search_results():
+    assert is_search_results("https://www.asda.com/search/heinz%20beans")
+    assert is_search_results("https://www.amazon.co.uk/s?k=kindle")
+    assert is_search_results("https://www.ebay.com/sch/i.html?_nkw=lego")
+    assert is_search_results("https://www.costco.com/CatalogSearch?keyword=tv")
+    assert not is_search_results("https://www.asda.com/groceries/product/heinz-beans/910000")
+    assert not is_search_results("https://www.amazon.co.uk/Kindle-Paperwhite/dp/B08KTZ8249")
+
+
+def test_seed_selectors_only_on_product_pages():
+    assert _seed_selectors("https://www.amazon.co.uk/Kindle-Paperwhite/dp/B08KTZ8249") is not None
+    assert _seed_selectors("https://www.amazon.co.uk/s?k=kindle") is None
+    # Outside Amazon's product_url_pattern
+    assert _seed_selectors("https://www.amazon.co.uk/gp/bestsellers/electronics") is None
+    assert _seed_selectors("https://shop.example.com/p/1") is None
+
+
+def test_plausible():
+    assert _plausible({"name": " Kindle ", "price": "Now £ 99.99"}) == {"name": "Kindle", "price": "£99.99"}
+    assert _plausible({"name": "Kindle", "price": "Out of stock"}) is None
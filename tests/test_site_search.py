@@ -0,0 +1,86 @@
+"""Tests for building retailer search URLs and ranking their results."""
+
+from ecommerce_scraper.utils.site_search import best_match, match_score, search_candidates, search_url
+
+RESULTS_PAGE = """<html><body><div class="grid">
+  <div class="tile"><a href="/groceries/product/heinz-beans-415g/910000">Heinz Baked Beans 415g</a><span>£1.40</span></div>
+  <div class="tile"><a href="/groceries/product/heinz-beans-200g/910001">Heinz Baked Beans 200g</a><span>£0.90</span></div>
+  <div class="tile"><a href="/search/beans?page=2">Next page</a></div>
+  <a href="https://www.tesco.com/groceries/product/1">Heinz Baked Beans 415g</a>
+</div></body></html>"""
+
+
+def test_search_url_path_pattern_percent_encodes():
+    assert search_url("https://www.asda.com/", "heinz beans 415g") == "https://www.asda.com/search/heinz%20beans%20415g"
+
+
+def test_search_url_query_pattern_uses_plus():
+    assert search_url("https://www.hamleys.com/", "lego castle") == "https://www.hamleys.com/search?q=lego+castle"
+
+
+def test_search_url_keeps_regional_storefront():
+    assert search_url("https://www.amazon.co.uk/", "kindle") == "https://www.amazon.co.uk/s?k=kindle"
+
+
+def test_search_url_unknown_site_or_empty_query():
+    assert search_url("https://shop.example.com/", "kindle") is None
+    assert search_url("https://www.asda.com/", "  ") is None
+
+
+def test_search_candidates_collects_product_tiles():
+    candidates = search_candidates(RESULTS_PAGE, "https://www.asda.com/search/heinz%20beans")
+    assert candidates == [
+        {"name": "Heinz Baked Beans 415g", "url": "https://www.asda.com/groceries/product/heinz-beans-415g/910000", "price": "£1.40"},
+        {"name": "Heinz Baked Beans 200g", "url": "https://www.asda.com/groceries/product/heinz-beans-200g/910001", "price": "£0.90"},
+    ]
+
+
+def test_search_candidates_applies_product_url_pattern():
+    html = """<a href="/Kindle-Paperwhite/dp/B08KTZ8249">Kindle Paperwhite</a><a href="/gp/help/contact">Contact us about Kindle</a>"""
+    candidates = search_candidates(html, "https://www.amazon.co.uk/s?k=kindle")
+    assert [c["url"] for c in candidates] == ["https://www.amazon.co.uk/Kindle-Paperwhite/dp/B08KTZ8249"]
+
+
+def test_match_score():
+    assert match_score("heinz beans 415g", "Heinz Baked Beans 415g") == 0.95
+    # Size mismatch halves query coverage
+    assert match_score("heinz beans 415g", "Heinz Baked Beans 200g") < match_score("heinz beans 415g", "Heinz Baked Beans")
+    assert match_score("heinz beans", "") == 0.0
+
+
+def test_best_match_prefers_score_then_price():
+    candidates = [
+        {"name": "Heinz Baked Beans 200g", "url": "a", "price": "£0.90"},
+        {"name": "Heinz Baked Beans 415g", "url": "b", "price": None},
+        {"name": "Heinz Baked Beans 415g", "url": "c", "price": "£1.40"},
+    ]
+    match = best_match("heinz beans 415g", candidates)
+    assert match["url"] == "c"
+    assert match["score"] == 0.95
+
+
+def test_best_match_below_threshold():
+    assert best_match("heinz beans 415g", [{"name": "Lego Castle", "url": "a", "price": None}]) is None
+    assert best_match("heinz beans", []) is None
+
+
+def test_scrappey_only_once_http_is_known_blocked(tmp_path, monkeypatch):
+    from ecommerce_scraper.utils import fetch_ladder, site_search
+    from ecommerce_scraper.utils.fetch_ladder import SCRAPPEY, FetchTiers
+    from ecommerce_scraper.utils.json_store import JsonStore
+
+    tiers = FetchTiers(JsonStore("fetch_tiers.json", directory=str(tmp_path)))
+    monkeypatch.setattr(fetch_ladder, "_fetch_tiers", tiers)
+    monkeypatch.setattr(site_search.settings, "scrappey_api_key", "key")
+    monkeypatch.setattr(site_search.settings, "site_search_scrappey_fallback", False)
+    monkeypatch.setattr(site_search, "fetch_http", lambda url: "")
+    scrappey_calls = []
+    monkeypatch.setattr(site_search, "fetch_scrappey", lambda url: scrappey_calls.append(url) or RESULTS_PAGE)
+
+    assert site_search.search_site("https://www.asda.com/", "heinz beans 415g") is None
+    assert scrappey_calls == []
+    assert tiers.tier("https://www.asda.com/search/heinz") == SCRAPPEY
+
+    match = site_search.search_site("https://www.asda.com/", "heinz beans 415g")
+    assert match["url"].endswith("/910000")
+    assert len(scrappey_calls) == 1
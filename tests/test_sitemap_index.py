@@ -0,0 +1,72 @@
+"""Tests for sitemap slug tokens, product URL filtering and the local index."""
+
+import pytest
+
+from ecommerce_scraper.config.sites import SiteConfig, SiteType
+from ecommerce_scraper.utils import sitemap_index as module
+from ecommerce_scraper.utils.sitemap_index import SitemapIndex, looks_like_product, slug_tokens
+
+GENERIC = SiteConfig(name="Shop", site_type=SiteType.GENERIC, base_url="https://www.shop.example.com")
+PATTERNED = SiteConfig(
+    name="Shop",
+    site_type=SiteType.GENERIC,
+    base_url="https://www.shop.example.com",
+    product_url_pattern=r"https://www\.shop\.example\.com/item/\d+",
+)
+
+
+def test_slug_tokens_drop_stop_words_and_duplicates():
+    url = "https://www.shop.example.com/groceries/p/heinz-baked-beans-415g/910000?ref=x"
+    assert slug_tokens(url) == ["heinz", "baked", "beans", "415g", "910000"]
+    assert slug_tokens("https://shop.example.com/p/Caf%C3%A9-caf%C3%A9") == ["caf"]
+
+
+@pytest.mark.parametrize(
+    "url, config, expected",
+    [
+        ("https://www.shop.example.com/p/heinz-beans", GENERIC, True),
+        ("https://www.shop.example.com/beans-1234567", GENERIC, True),
+        ("https://www.shop.example.com/about-us", GENERIC, False),
+        ("https://www.shop.example.com/item/42", PATTERNED, True),
+        # Regional storefronts are matched by path against the config's host
+        ("https://shop.example.co.uk/item/42", PATTERNED, True),
+        ("https://www.shop.example.com/p/heinz-beans", PATTERNED, False),
+    ],
+)
+def test_looks_like_product(url, config, expected):
+    assert looks_like_product(url, config) is expected
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SitemapIndex(str(tmp_path / "sitemap_index.sqlite3"))
+
+
+def test_lookup_before_refresh_is_empty(index):
+    assert index.lookup("heinz baked beans") == []
+
+
+def test_refresh_indexes_products_and_skips_unchanged_sitemaps(index, monkeypatch):
+    sitemaps = {
+        "https://www.shop.example.com/sitemap.xml": [
+            ("sitemap", "https://www.shop.example.com/sitemap-products.xml", "2026-10-01"),
+        ],
+        "https://www.shop.example.com/sitemap-products.xml": [
+            ("url", "https://www.shop.example.com/p/heinz-baked-beans-415g", None),
+            ("url", "https://www.shop.example.com/p/branston-baked-beans-410g", None),
+            ("url", "https://www.shop.example.com/about-us", None),
+            ("url", "https://other.example.com/p/heinz-baked-beans-415g", None),
+        ],
+    }
+    monkeypatch.setattr(module, "discover_sitemaps", lambda base_url: ["https://www.shop.example.com/sitemap.xml"])
+    monkeypatch.setattr(module, "iter_sitemap", lambda url: iter(sitemaps[url]))
+
+    stats = index.refresh(GENERIC)
+    assert stats["added"] == 2
+    results = index.lookup("Heinz Baked Beans 415g")
+    assert results[0]["url"] == "https://www.shop.example.com/p/heinz-baked-beans-415g"
+    assert results[0]["domain"] == "shop.example.com"
+    assert index.lookup("heinz beans", domain="elsewhere.example.com") == []
+
+    # The child sitemap's lastmod is unchanged, so it is not fetched again
+    assert index.refresh(GENERIC)["sitemaps_unchanged"] == 1
@@ -0,0 +1,86 @@
+"""Tests for the content-addressed HTML snapshot archive."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from ecommerce_scraper.utils import fetch_ladder
+from ecommerce_scraper.utils import snapshot_archive as module
+from ecommerce_scraper.utils.fetch_ladder import FetchTiers
+from ecommerce_scraper.utils.json_store import JsonStore
+from ecommerce_scraper.utils.snapshot_archive import SnapshotArchive
+
+URL = "https://www.asda.com/groceries/product/heinz-beans/910000"
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return SnapshotArchive(str(tmp_path / "snapshots"))
+
+
+def test_put_deduplicates_and_reads_back(archive):
+    first = archive.put(URL + "?utm_source=x", "<html>beans</html>", source="http")
+    second = archive.put(URL, "<html>beans</html>", source="scrappey")
+    assert first == second
+    assert archive.read(first) == "<html>beans</html>"
+    assert len(list((archive.root / "objects").glob("*/*"))) == 1
+    assert [e["source"] for e in archive.entries(URL)] == ["http", "scrappey"]
+    assert len(list(archive.latest(archive.entries()))) == 1
+
+
+def test_entries_time_range(archive):
+    archive.put(URL, "<html>1</html>")
+    now = time.time()
+    assert list(archive.entries(since=now + 60)) == []
+    assert len(list(archive.entries(until=now + 60))) == 1
+
+
+def test_compact_drops_old_entries_and_objects(archive):
+    archive.put(URL, "<html>old</html>")
+    fresh = archive.put(URL, "<html>new</html>")
+    lines = archive._index_path.read_text().splitlines()
+    old = json.loads(lines[0])
+    old["fetched_at"] -= 90 * 86400
+    archive._index_path.write_text(json.dumps(old) + "\n" + lines[1] + "\n")
+
+    assert archive.compact(retention_days=30) == {"entries": 1, "objects_removed": 1}
+    assert [e["sha256"] for e in archive.entries()] == [fresh]
+    with pytest.raises(KeyError):
+        archive.read(old["sha256"])
+
+
+
+def test_compact_during_put_keeps_the_new_object(archive, monkeypatch):
+    real_replace = module.os.replace
+    compactions = []
+
+    def replace_then_compact(src, dst):
+        real_replace(src, dst)
+        if not compactions and str(dst).endswith((module.ZSTD_SUFFIX, module.ZLIB_SUFFIX)):
+            # A compaction from another thread lands between the object write and the index append
+            compactions.append(threading.Thread(target=archive.compact, kwargs={"retention_days": 30}))
+            compactions[0].start()
+            compactions[0].join(0.2)
+
+    monkeypatch.setattr(module.os, "replace", replace_then_compact)
+    digest = archive.put(URL, "<html>beans</html>")
+    compactions[0].join(5)
+    assert archive.read(digest) == "<html>beans</html>"
+    assert [e["sha256"] for e in archive.entries()] == [digest]
+
+def test_fetch_ladder_archives_only_product_pages(tmp_path, monkeypatch):
+    archive = SnapshotArchive(str(tmp_path / "snapshots"))
+    monkeypatch.setattr("ecommerce_scraper.utils.snapshot_archive._archive", archive)
+    monkeypatch.setattr(fetch_ladder, "_fetch_tiers", FetchTiers(JsonStore("fetch_tiers.json", directory=str(tmp_path))))
+    monkeypatch.setattr(fetch_ladder, "fetch_http", lambda url: "<html><body>no structured data</body></html>")
+    monkeypatch.setattr(fetch_ladder.settings, "scrappey_api_key", "")
+    monkeypatch.setattr(fetch_ladder.settings, "enable_product_api_discovery", False)
+    monkeypatch.setattr(fetch_ladder.settings, "enable_snapshot_archive", True)
+
+    fetch_ladder.fetch_products("https://www.asda.com/search/heinz%20beans")
+    fetch_ladder.fetch_products("https://www.asda.com/")
+    assert list(archive.entries()) == []
+    fetch_ladder.fetch_products("https://shop.example.com/product/heinz-beans-415g")
+    assert [e["url"] for e in archive.entries()] == ["https://shop.example.com/product/heinz-beans-415g"]
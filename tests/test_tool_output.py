@@ -0,0 +1,44 @@
+"""Tests for compact, token-bounded tool output."""
+
+import json
+
+from ecommerce_scraper.utils.dom_pruning import CHARS_PER_TOKEN
+from ecommerce_scraper.utils.tool_output import TRUNCATED, compact_json, dedupe, project
+
+
+def test_project_and_dedupe():
+    data = [{"name": "A", "price": "£1", "sku": 1}, {"name": "A", "price": "£1", "sku": 1}]
+    assert dedupe(project(data, ("name", "price"))) == [{"name": "A", "price": "£1"}]
+
+
+def test_compact_json_small_output_unchanged():
+    assert compact_json({"name": "Bär", "items": [1, 1, 2]}, max_tokens=100) == '{"name":"Bär","items":[1,2]}'
+
+
+def test_compact_json_cuts_largest_list_with_marker():
+    products = [{"name": f"Product {i}", "price": f"£{i}.00"} for i in range(200)]
+    text = compact_json({"products": products, "page": 1}, max_tokens=100)
+    data = json.loads(text)
+    assert len(text) <= 100 * CHARS_PER_TOKEN
+    assert data["page"] == 1
+    assert data["products"][-1].endswith("more items truncated]")
+
+
+def test_compact_json_keeps_urls_whole():
+    url = "https://www.example.com/p/" + "x" * 500
+    data = json.loads(compact_json([{"url": url, "description": "y" * 500}], max_tokens=250))
+    assert data[0]["url"] == url
+    assert data[0]["description"].endswith(TRUNCATED)
+
+
+def test_compact_json_stays_valid_when_nothing_fits():
+    data = {"summary": {"a": "x" * 290, "b": "y" * 290, "c": ["z" * 290] * 3}}
+    for max_tokens in (1, 5, 50, 150):
+        text = compact_json(data, max_tokens=max_tokens)
+        json.loads(text)
+        assert len(text) <= max(max_tokens * CHARS_PER_TOKEN, len(TRUNCATED) + 2)
+
+
+def test_compact_json_zero_disables_cap():
+    data = ["x" * 1000]
+    assert compact_json(data, max_tokens=0) == json.dumps(data)
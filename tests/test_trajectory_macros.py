@@ -0,0 +1,88 @@
+"""Tests for compiling agent trajectories into replayable macros."""
+
+import json
+
+from ecommerce_scraper.utils.json_store import JsonStore
+from ecommerce_scraper.utils.trajectory_macros import MacroStore, compile_macro, macro_params, run_macro
+
+PARAMS = macro_params("Heinz Baked Beans", "https://www.asda.com/")
+
+
+def test_compile_macro_parameterizes_and_keeps_final_extract():
+    trajectory = [
+        {"operation": "navigate", "url": "https://www.asda.com/"},
+        {"operation": "observe", "instruction": "find the search box"},
+        {"operation": "act", "action": "type %product_query% into the search box", "variables": {"product_query": "x"}},
+        {"operation": "navigate", "url": "https://www.asda.com/search?q=Heinz+Baked+Beans"},
+        {"operation": "navigate", "url": "https://www.asda.com/search?q=Heinz+Baked+Beans"},
+        {"operation": "extract", "instruction": "extract the first product"},
+        {"operation": "act", "action": "click the first result"},
+        {"operation": "extract", "instruction": "extract Heinz Baked Beans products", "schema": None},
+    ]
+    assert compile_macro(trajectory, PARAMS) == [
+        {"operation": "navigate", "url": "{retailer_url}"},
+        {"operation": "navigate", "url": "{retailer_url}search?q={product_query_url}"},
+        {"operation": "act", "action": "click the first result"},
+        {"operation": "extract", "instruction": "extract {product_query} products"},
+    ]
+
+
+def test_compile_macro_needs_leading_navigate_and_an_extract():
+    assert compile_macro([{"operation": "navigate", "url": "https://www.asda.com/"}], PARAMS) is None
+    assert compile_macro([{"operation": "extract", "instruction": "extract products"}], PARAMS) is None
+
+
+def test_compile_macro_rejects_hard_coded_navigation():
+    trajectory = [
+        {"operation": "navigate", "url": "https://www.asda.com/"},
+        {"operation": "navigate", "url": "https://www.asda.com/groceries/product/heinz-beans/910000"},
+        {"operation": "extract", "instruction": "extract the product"},
+    ]
+    assert compile_macro(trajectory, PARAMS) is None
+
+
+def test_compile_macro_rejects_acts_on_product_text():
+    trajectory = [
+        {"operation": "navigate", "url": "https://www.asda.com/"},
+        {"operation": "act", "action": "click the 'Heinz' brand filter"},
+        {"operation": "extract", "instruction": "extract the products"},
+    ]
+    assert compile_macro(trajectory, PARAMS) is None
+
+
+class _FakeTool:
+    def __init__(self, results):
+        self.calls = []
+        self._results = iter(results)
+
+    def _run(self, **kwargs):
+        self.calls.append(kwargs)
+        return next(self._results)
+
+
+def test_run_macro_fills_placeholders_and_parses_output():
+    steps = [
+        {"operation": "navigate", "url": "{retailer_url}search?q={product_query_url}"},
+        {"operation": "extract", "instruction": "extract {product_query} products"},
+    ]
+    tool = _FakeTool(["Navigated", json.dumps([{"name": "Heinz Baked Beans"}])])
+    assert run_macro(tool, steps, PARAMS) == [{"name": "Heinz Baked Beans"}]
+    assert tool.calls[0]["url"] == "https://www.asda.com/search?q=Heinz+Baked+Beans"
+    assert tool.calls[1]["instruction"] == "extract Heinz Baked Beans products"
+
+
+def test_run_macro_stops_on_error():
+    tool = _FakeTool(["Error: navigation failed"])
+    assert run_macro(tool, [{"operation": "navigate", "url": "{retailer_url}"}, {"operation": "extract"}], PARAMS) is None
+    assert len(tool.calls) == 1
+
+
+def test_macro_store_drops_failing_macros(tmp_path):
+    store = MacroStore(JsonStore("macros.json", directory=str(tmp_path)))
+    steps = [{"operation": "navigate", "url": "{retailer_url}"}, {"operation": "extract"}]
+    store.record("asda.com", steps)
+    assert store.get("asda.com") == steps
+    store.mark("asda.com", succeeded=False)
+    assert store.get("asda.com") == steps
+    store.mark("asda.com", succeeded=False)
+    assert store.get("asda.com") is None
@@ -0,0 +1,115 @@
+"""Tests for the WebDriver pool with a fake driver factory (no browser)."""
+
+import threading
+
+import pytest
+
+from ecommerce_scraper.utils.webdriver_pool import WebDriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_calls = 0
+        self.cookies_cleared = 0
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return 1
+
+    def delete_all_cookies(self):
+        self.cookies_cleared += 1
+
+    def quit(self):
+        self.quit_calls += 1
+        self.alive = False
+
+
+@pytest.fixture
+def created():
+    return []
+
+
+@pytest.fixture
+def pool(created):
+    def factory():
+        created.append(FakeDriver())
+        return created[-1]
+
+    return WebDriverPool(size=2, max_uses=3, factory=factory)
+
+
+def test_checkout_and_return_reuses_the_driver(pool, created):
+    with pool.driver() as first:
+        pass
+    with pool.driver() as second:
+        pass
+    assert second is first
+    assert len(created) == 1
+    assert first.cookies_cleared == 2
+    assert first.quit_calls == 0
+
+
+def test_dead_idle_driver_is_replaced(pool, created):
+    with pool.driver() as first:
+        pass
+    first.alive = False
+    with pool.driver() as second:
+        assert second is not first
+    assert first.quit_calls == 1
+    assert len(created) == 2
+
+
+def test_driver_is_retired_after_max_uses(pool, created):
+    for _ in range(3):
+        with pool.driver():
+            pass
+    assert created[0].quit_calls == 1
+    with pool.driver() as driver:
+        assert driver is not created[0]
+
+
+def test_error_during_checkout_quits_the_driver(pool, created):
+    with pytest.raises(ValueError):
+        with pool.driver():
+            raise ValueError("page crashed")
+    assert created[0].quit_calls == 1
+    with pool.driver() as driver:
+        assert driver is created[1]
+
+
+def test_size_limits_concurrent_checkouts(pool, created):
+    both_checked_out = threading.Barrier(3)
+    release = threading.Event()
+
+    def hold():
+        with pool.driver():
+            both_checked_out.wait(5)
+            release.wait(5)
+
+    holders = [threading.Thread(target=hold) for _ in range(2)]
+    for holder in holders:
+        holder.start()
+    try:
+        both_checked_out.wait(5)
+        with pytest.raises(TimeoutError):
+            with pool.driver(timeout=0.05):
+                pass
+    finally:
+        release.set()
+        for holder in holders:
+            holder.join(5)
+    # Both slots are free again and the drivers are reused
+    with pool.driver(timeout=0.05), pool.driver(timeout=0.05):
+        pass
+    assert len(created) == 2
+
+
+def test_close_quits_idle_drivers(pool, created):
+    with pool.driver(), pool.driver():
+        pass
+    pool.close()
+    assert [driver.quit_calls for driver in created] == [1, 1]
+    with pool.driver() as driver:
+        assert driver is not created[0] and driver is not created[1]